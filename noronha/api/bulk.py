@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# Copyright Noronha Development Team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""API for running storage operations over many datasets and model versions at once"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from noronha.api.ds import DatasetAPI
+from noronha.api.main import NoronhaAPI
+from noronha.api.movers import ModelVersionAPI
+from noronha.api.utils import find_by_refs
+from noronha.bay.barrel import Barrel, DatasetBarrel, MoversBarrel
+from noronha.bay.warehouse import get_warehouse
+from noronha.common.annotations import validate
+from noronha.common.constants import WarehouseConst
+from noronha.common.errors import PrettyError
+from noronha.common.parser import split_file_filter
+from noronha.common.utils import run_blocking
+from noronha.db.ds import Dataset
+from noronha.db.model import Model
+from noronha.db.movers import ModelVersion
+
+
+class BulkAPI(NoronhaAPI):
+    
+    valid = NoronhaAPI.valid
+    
+    def __init__(self, *args, **kwargs):
+        
+        super().__init__(*args, **kwargs)
+        self.warehouses = {}
+    
+    def _find_docs(self, doc_cls, refs: list = None, file_filters: dict = None):
+        
+        docs, exact_refs = [], []
+        
+        for ref in refs or []:
+            pk, files = split_file_filter(ref)
+            model_name, name = pk.split(':', 1) if ':' in pk else (pk, None)
+            
+            if name == '*':  # every dataset or version of the model
+                matches = list(doc_cls.objects(model=Model.find_one(name=model_name)))
+                docs += matches
+                
+                if files is not None and file_filters is not None:
+                    file_filters.update({doc.get_pk(): files for doc in matches})
+            else:
+                exact_refs.append(ref)
+        
+        return docs + find_by_refs(doc_cls, exact_refs, file_filters)
+    
+    def _get_barrel(self, doc) -> Barrel:
+        
+        barrel_cls = DatasetBarrel if isinstance(doc, Dataset) else MoversBarrel
+        key = (barrel_cls.section, doc.lightweight)
+        
+        if key not in self.warehouses:  # connections are shared by all barrels of the same kind
+            self.warehouses[key] = get_warehouse(section=barrel_cls.section, lightweight=doc.lightweight, log=self.LOG)
+        
+        return barrel_cls(doc, warehouse=self.warehouses[key], log=self.LOG)
+    
+    def _run(self, items: list, operation, concurrency: int, key=None):
+        
+        key = key or (lambda doc: doc.get_pk())
+        succeeded, failed = [], {}
+        
+        async def run_one(item, semaphore):
+            
+            async with semaphore:
+                try:
+                    await operation(item)
+                except Exception as e:
+                    self.LOG.error("Failed on {}: {}".format(key(item), e))
+                    failed[key(item)] = PrettyError.parse_exc(e)
+                else:
+                    succeeded.append(key(item))
+        
+        async def run_all():
+            
+            semaphore = asyncio.Semaphore(concurrency)
+            await asyncio.gather(*[run_one(item, semaphore) for item in items])
+        
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))  # bounds blocking calls as well
+        
+        try:
+            loop.run_until_complete(run_all())
+        finally:
+            loop.close()
+        
+        return dict(succeeded=succeeded, failed=failed)
+    
+    @validate(concurrency=int)
+    def deploy(self, datasets: list = None, movers: list = None, path: str = None,
+               concurrency: int = WarehouseConst.BULK_CONCURRENCY):
+        
+        file_filters = {}
+        docs = self._find_docs(Dataset, datasets, file_filters) + self._find_docs(ModelVersion, movers, file_filters)
+        barrels = {doc.get_pk(): self._get_barrel(doc) for doc in docs}
+        path = path or os.getcwd()
+        
+        async def deploy_one(doc):
+            
+            dyr = os.path.join(path, doc.get_dir_name())
+            os.makedirs(dyr, exist_ok=True)
+            await barrels[doc.get_pk()].deploy_async(dyr, files=file_filters.get(doc.get_pk()))
+        
+        self.LOG.info("Deploying {} dataset(s) and model version(s) to {}".format(len(docs), path))
+        return self._run(docs, deploy_one, concurrency)
+    
+    @validate(concurrency=int)
+    def rm(self, datasets: list = None, movers: list = None, concurrency: int = WarehouseConst.BULK_CONCURRENCY):
+        
+        docs = self._find_docs(Dataset, datasets) + self._find_docs(ModelVersion, movers)
+        barrels = {doc.get_pk(): self._get_barrel(doc) for doc in docs}
+        
+        if len(docs) > 0:
+            self._decide(
+                "{} dataset(s) and model version(s) will be removed along with their files. Proceed?".format(len(docs)),
+                default=False,
+                interrupt=True
+            )
+        
+        async def rm_one(doc):  # same routine as removing a single record, e.g.: trainings stop referring to it
+            
+            remove = DatasetAPI.remove if isinstance(doc, Dataset) else ModelVersionAPI.remove
+            await run_blocking(remove, doc, barrels[doc.get_pk()])
+        
+        return self._run(docs, rm_one, concurrency)
@@ -16,7 +16,9 @@
 
 from noronha.api.main import NoronhaAPI
 from noronha.bay.barrel import DatasetBarrel
+from noronha.bay.compass import CompressionCompass
 from noronha.common.annotations import validate
+from noronha.common.errors import NhaAPIError
 from noronha.common.logging import LOG
 from noronha.db.ds import Dataset
 from noronha.db.model import Model
@@ -34,22 +36,27 @@ class DatasetAPI(NoronhaAPI):
     def rm(self, name, model):
         
         ds = self.doc().find_one(name=name, model=model)
+        return dict(
+            name=name,
+            model=model,
+            record='removed',
+            files=self.remove(ds)
+        )
+    
+    @staticmethod
+    def remove(ds: Dataset, barrel: DatasetBarrel = None):
+        
+        """Deletes a dataset's record and purges its files, returning what happened to the files"""
+        
         # TODO: check if dataset is not being used in a training right now
         ds.delete()
         
         if ds.stored:
             LOG.info("Purging dataset '{}' from the file manager".format(ds.show()))
-            file_status = 'purged' if DatasetBarrel(ds).purge(ignore=True) else 'not_found'
+            return 'purged' if (barrel or DatasetBarrel(ds)).purge(ignore=True) else 'not_found'
         else:
             LOG.info("Dataset '{}' is not stored. Skipping purge".format(ds.show()))
-            file_status = 'not_stored'
-        
-        return dict(
-            name=name,
-            model=model,
-            record='removed',
-            files=file_status
-        )
+            return 'not_stored'
     
     def lyst(self, _filter: dict = None, model: str = None, **kwargs):
         
@@ -58,22 +65,30 @@ class DatasetAPI(NoronhaAPI):
         
         return super().lyst(_filter=_filter, **kwargs)
     
-    def _store(self, ds: Dataset, path: str = None, files: dict = None):
+    def _store(self, ds: Dataset, path: str = None, files: dict = None, dry_run=False):
         
         if path or files:  # either is not None
-            barrel = DatasetBarrel(ds)
+            barrel = DatasetBarrel(ds, codec=CompressionCompass().codec)
             
             if barrel.schema is None:
                 LOG.warn("Publishing dataset '{}' without a strict file definition".format(ds.get_pk()))
             
             if path:
-                barrel.store_from_path(path)
+                diff = barrel.store_from_path(path, manifest=ds.manifest, dry_run=dry_run)
             elif files:
-                barrel.store_from_dict(files)
+                diff = barrel.store_from_dict(files, manifest=ds.manifest, dry_run=dry_run)
             else:
                 raise NotImplementedError()
             
-            return barrel
+            if not dry_run:
+                ds.update(
+                    manifest=diff.manifest,
+                    archive_size=diff.archive_size,
+                    sha256=diff.digest,
+                    codec=diff.codec
+                )
+            
+            return diff
         else:
             LOG.warn("Dataset '{}' for model '{}' is not being stored by the framework"
                      .format(ds.name, ds.model.name))
@@ -89,7 +104,6 @@ class DatasetAPI(NoronhaAPI):
         if lightweight:
             model.assert_datasets_can_be_lightweight()
         
-        barrel = None
         ds = super().new(
             name=name,
             model=model,
@@ -100,18 +114,33 @@ class DatasetAPI(NoronhaAPI):
         
         try:
             if not skip_upload:
-                barrel = self._store(ds, path, files)
+                self._store(ds, path, files)
         except Exception as e:
             LOG.warn("Reverting creation of dataset '{}'".format(ds.name))
-            ds.delete()
-            if barrel is not None:
-                barrel.purge(ignore=True)
+            
+            try:  # the original error may have come from the file manager, so it must not be hidden by the purge
+                ds.delete()
+                DatasetBarrel(ds).purge(ignore=True)
+            except Exception as cleanup_error:
+                LOG.error("Failed to revert creation of dataset '{}': {}".format(ds.name, repr(cleanup_error)))
+            
             raise e
         else:
             return ds
     
     @validate(files=(dict, None), details=(dict, None))
-    def update(self, name, model, path: str = None, files: dict = None, **kwargs):
+    def update(self, name, model, path: str = None, files: dict = None, dry_run=False, **kwargs):
+        
+        current = self.doc().find_one(name=name, model=model)
+        
+        if dry_run:
+            if not (path or files):
+                raise NhaAPIError("A dry run requires either a path or files to compare with")
+            
+            return self._store(current, path, files, dry_run=True).as_dict()
+        
+        if kwargs.get('compressed', current.compressed) != current.compressed:
+            kwargs['manifest'] = []  # files are laid out differently, so all of them need to be uploaded
         
         ds = super().update(
             filter_kwargs=dict(name=name, model=model),
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+# Copyright Noronha Development Team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""API for garbage collection of stored datasets, model versions and shared volumes"""
+
+import asyncio
+
+from noronha.api.bulk import BulkAPI
+from noronha.bay.captain import get_captain
+from noronha.bay.compass import LWWarehouseCompass
+from noronha.bay.utils import StoreHierarchy
+from noronha.bay.warehouse import get_warehouse
+from noronha.common.annotations import validate
+from noronha.common.constants import WarehouseConst
+from noronha.db.depl import Deployment
+from noronha.db.ds import Dataset
+from noronha.db.model import Model
+from noronha.db.movers import ModelVersion
+from noronha.db.train import Training
+
+
+class GarbageCollectorAPI(BulkAPI):
+    
+    @staticmethod
+    def _get_size(doc):
+        
+        if isinstance(doc, Dataset) and not doc.stored:
+            return 0
+        elif doc.compressed and doc.archive_size:
+            return doc.archive_size
+        else:
+            return sum(entry.size or 0 for entry in doc.manifest)
+    
+    @staticmethod
+    def _get_referenced():
+        
+        """Primary keys of model versions and datasets that other records depend on"""
+        
+        movers, datasets = set(), set()
+        
+        for depl in Deployment.objects():
+            movers.update(mv.get_pk() for mv in depl.movers or [] if mv is not None)
+        
+        for mv in ModelVersion.objects(pretrained__ne=None):
+            movers.add(mv.pretrained.get_pk())
+        
+        for mv in ModelVersion.objects(ds__ne=None):
+            datasets.add(mv.ds.get_pk())
+        
+        for ref in Training.objects(mover__ne=None).no_dereference().scalar('mover'):  # outputs of trainings
+            movers.add(getattr(ref, 'id', ref))
+        
+        for ref in Training.objects(ds__ne=None).no_dereference().scalar('ds'):  # avoids a query per training
+            datasets.add(getattr(ref, 'id', ref))
+        
+        return movers, datasets
+    
+    def _select_expired(self, doc_cls, models: list, keep_last: int, referenced: set):
+        
+        expired, kept = [], []
+        
+        for model in models:
+            docs = list(doc_cls.objects(model=model).order_by('-modified'))
+            
+            for doc in docs[keep_last:]:
+                if doc.get_pk() in referenced:
+                    kept.append(doc.get_pk())
+                else:
+                    expired.append(doc)
+        
+        return expired, kept
+    
+    def _collect(self, docs: list, concurrency: int, batch_size: int):
+        
+        barrels = {doc.get_pk(): self._get_barrel(doc) for doc in docs}
+        report = dict(succeeded=[], failed={})
+        
+        async def purge(doc):
+            
+            if getattr(doc, 'stored', True):
+                await barrels[doc.get_pk()].purge_async(ignore=True)
+        
+        for i in range(0, len(docs), batch_size):
+            batch = docs[i:i + batch_size]
+            
+            for doc_cls in [Dataset, ModelVersion]:
+                pks = [doc.pk for doc in batch if isinstance(doc, doc_cls)]
+                
+                if pks:
+                    doc_cls.objects(pk__in=pks).delete()  # files left behind by failed purges become orphans
+            
+            result = self._run(batch, purge, concurrency)
+            report['succeeded'] += result['succeeded']
+            report['failed'].update(result['failed'])
+        
+        return report
+    
+    @validate(keep_last=int, concurrency=int, batch_size=int)
+    def retention(self, model: str = None, keep_last: int = WarehouseConst.GC_KEEP_LAST, datasets: bool = False,
+                  dry_run: bool = False, concurrency: int = WarehouseConst.BULK_CONCURRENCY,
+                  batch_size: int = WarehouseConst.GC_BATCH_SIZE):
+        
+        models = [Model.find_one(name=model)] if model else list(Model.objects())
+        ref_movers, ref_datasets = self._get_referenced()
+        expired, kept = self._select_expired(ModelVersion, models, keep_last, ref_movers)
+        
+        if datasets:
+            expired_ds, kept_ds = self._select_expired(Dataset, models, keep_last, ref_datasets)
+            expired, kept = expired + expired_ds, kept + kept_ds
+        
+        sizes = {doc.get_pk(): self._get_size(doc) for doc in expired}
+        report = dict(
+            expired=[doc.get_pk() for doc in expired],
+            kept_referenced=kept
+        )
+        
+        if dry_run or len(expired) == 0:
+            report.update(reclaimable_mb=round(sum(sizes.values())/(1024*1024), 2))
+            return report
+        
+        self._decide(
+            "{} dataset(s) and model version(s) will be removed along with their files. Proceed?".format(len(expired)),
+            default=False,
+            interrupt=True
+        )
+        
+        result = self._collect(expired, concurrency, batch_size)
+        report.update(
+            removed=result['succeeded'],
+            failed=result['failed'],
+            reclaimed_mb=round(sum(sizes[pk] for pk in result['succeeded'])/(1024*1024), 2)
+        )
+        return report
+    
+    @staticmethod
+    def _get_known(doc_cls, **query):
+        
+        # primary keys are stored as 'model_name:name', which matches the hierarchy of each barrel
+        return {tuple(pk.split(':', 1)) for pk in doc_cls.objects(**query).scalar('pk')}
+    
+    def _get_warehouses(self):
+        
+        warehouses = [
+            (
+                get_warehouse(section=WarehouseConst.Section.DATASETS, log=self.LOG),
+                self._get_known(Dataset, lightweight=False, stored__ne=False)
+            ),
+            (
+                get_warehouse(section=WarehouseConst.Section.MODELS, log=self.LOG),
+                self._get_known(ModelVersion, lightweight=False)
+            )
+        ]
+        
+        if LWWarehouseCompass().enabled:  # the lightweight store keeps datasets and versions side by side
+            warehouses.append((
+                get_warehouse(section=WarehouseConst.Section.MODELS, lightweight=True, log=self.LOG),
+                self._get_known(Dataset, lightweight=True) | self._get_known(ModelVersion, lightweight=True)
+            ))
+        
+        return warehouses
+    
+    @validate(concurrency=int)
+    def orphans(self, dry_run: bool = False, concurrency: int = WarehouseConst.BULK_CONCURRENCY):
+        
+        found = [
+            (warehouse, [h for h in warehouse.lyst_hierarchies() if (h.parent, h.child) not in known])
+            for warehouse, known in self._get_warehouses()
+        ]
+        report = dict(
+            orphans=[self._describe(warehouse, h) for warehouse, orphans in found for h in orphans],
+            removed=[],
+            failed={}
+        )
+        
+        if dry_run or len(report['orphans']) == 0:
+            return report
+        
+        self._decide(
+            "{} stored file sets have no matching record and will be removed. Proceed?".format(len(report['orphans'])),
+            default=False,
+            interrupt=True
+        )
+        
+        for warehouse, orphans in found:
+            async def delete(hierarchy: StoreHierarchy, _warehouse=warehouse):
+                
+                await _warehouse.delete_async(hierarchy, ignore=True)
+            
+            result = self._run(orphans, delete, concurrency, key=lambda h, _wh=warehouse: self._describe(_wh, h))
+            report['removed'] += result['succeeded']
+            report['failed'].update(result['failed'])
+        
+        return report
+    
+    @staticmethod
+    def _describe(warehouse, hierarchy: StoreHierarchy):
+        
+        return '{}:{}'.format(warehouse.__class__.__name__, hierarchy.join_as_path().rstrip('/'))
+    
+    @validate(concurrency=int)
+    def volumes(self, dry_run: bool = False, concurrency: int = WarehouseConst.BULK_CONCURRENCY):
+        
+        captain = get_captain(log=self.LOG)
+        
+        try:
+            cached = captain.list_cached_vols()
+            unused = [name for name in cached if captain.count_vol_refs(name) == 0]
+            report = dict(cached=cached, unused=unused, removed=[], failed={})
+            
+            if dry_run or len(unused) == 0:
+                return report
+            
+            self._decide(
+                "{} shared volume(s) are not mounted by any container and will be removed. Proceed?".format(len(unused)),
+                default=False,
+                interrupt=True
+            )
+            
+            async def remove(name: str):
+                
+                await asyncio.get_event_loop().run_in_executor(None, captain.rm_cached_vol, name)
+            
+            result = self._run(unused, remove, concurrency, key=lambda name: name)
+            report.update(removed=result['succeeded'], failed=result['failed'])
+            return report
+        finally:
+            captain.close()
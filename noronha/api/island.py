@@ -14,9 +14,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
 from noronha.api.main import NoronhaAPI
+from noronha.bay.captain import get_captain
 from noronha.bay.island import get_island
-from noronha.common.constants import IslandConst
+from noronha.common.constants import DockerConst, IslandConst
+from noronha.common.errors import NhaAPIError, PrettyError
 
 
 class IslandAPI(NoronhaAPI):
@@ -30,7 +36,51 @@ class IslandAPI(NoronhaAPI):
             resource_profile=kwargs.get('resource_profile')
         ).launch(**kwargs)
     
+    def _provision(self, name: str, launched: dict, failed: dict, progress: list, **kwargs):
+        
+        start = time.time()
+        
+        def report(step: str):
+            
+            progress.append(name)
+            self.LOG.info("[{}/{}] Plugin '{}' {} ({:.1f}s)".format(
+                len(progress), 2*len(launched), name, step, time.time() - start))
+        
+        try:
+            island = get_island(name)
+            island.builder.build()
+            report('built')
+            
+            for dep in IslandConst.DEPENDENCIES[name]:
+                if dep in launched:  # otherwise, it's expected to be running already
+                    launched[dep].wait()
+                    assert dep not in failed, NhaAPIError("Plugin '{}' depends on '{}', which failed".format(name, dep))
+            
+            island.launch(skip_build=True, **kwargs)
+            report('launched')
+        except Exception as e:
+            self.LOG.error("Failed to set up plugin '{}': {}".format(name, e))
+            failed[name] = PrettyError.parse_exc(e)
+        finally:
+            launched[name].set()
+    
     def get_me_started(self, **kwargs):
         
-        for name in IslandConst.ESSENTIAL:
-            get_island(name).launch(**kwargs)
+        """Builds and launches the essential plugins concurrently, each one waiting only for its dependencies"""
+        
+        kwargs.pop('skip_build', None)
+        launched = {name: Event() for name in IslandConst.ESSENTIAL}
+        failed, progress = {}, []
+        captain = get_captain(section=DockerConst.Section.ISLE, log=self.LOG)
+        
+        try:  # resources shared by all plugins (e.g.: the network) are created once, before the fan-out
+            captain.prepare_cluster()
+        finally:
+            captain.close()
+        
+        with ThreadPoolExecutor(max_workers=len(launched)) as executor:
+            for name in launched:
+                executor.submit(self._provision, name, launched, failed, progress, **kwargs)
+        
+        if failed:
+            raise NhaAPIError("Failed to set up plugins: {}".format(failed))
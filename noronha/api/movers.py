@@ -16,6 +16,7 @@
 
 from noronha.api.main import NoronhaAPI
 from noronha.bay.barrel import MoversBarrel
+from noronha.bay.compass import CompressionCompass
 from noronha.common.annotations import validate
 from noronha.common.errors import NhaAPIError, DBError
 from noronha.common.logging import LOG
@@ -37,22 +38,28 @@ class ModelVersionAPI(NoronhaAPI):
     def rm(self, name, model):
         
         mv = self.doc().find_one(name=name, model=model)
-
+        return dict(
+            name=name,
+            model=model,
+            record='removed',
+            files=self.remove(mv)
+        )
+    
+    @staticmethod
+    def remove(mv: ModelVersion, barrel: MoversBarrel = None):
+        
+        """Deletes a model version's record and purges its files, returning what happened to the files"""
+        
         try:
             train = Training().find_one(mover=mv)
         except DBError.NotFound:  # ignore if no training was found
             pass
         else:
             train.modify(mover=None)
-
+        
         # TODO: check if movers is not being used in a depl right now
         mv.delete()
-        return dict(
-            name=name,
-            model=model,
-            record='removed',
-            files='purged' if MoversBarrel(mv).purge(ignore=True) else 'not_found'
-        )
+        return 'purged' if (barrel or MoversBarrel(mv)).purge(ignore=True) else 'not_found'
     
     def lyst(self, _filter: dict = None, model: str = None, train: str = None, ds: str = None, **kwargs):
         
@@ -79,15 +86,24 @@ class ModelVersionAPI(NoronhaAPI):
         
         return super().lyst(_filter=_filter, **kwargs)
     
-    def _store(self, mv: ModelVersion, path: str = None):
+    def _store(self, mv: ModelVersion, path: str = None, dry_run=False):
         
-        barrel = MoversBarrel(mv)
+        barrel = MoversBarrel(mv, codec=CompressionCompass().codec)
         
         if barrel.schema is None:
             LOG.warn("Publishing model version '{}' without a strict file definition".format(mv.get_pk()))
         
-        barrel.store_from_path(path)
-        return barrel
+        diff = barrel.store_from_path(path, manifest=mv.manifest, dry_run=dry_run)
+        
+        if not dry_run:
+            mv.update(
+                manifest=diff.manifest,
+                archive_size=diff.archive_size,
+                sha256=diff.digest,
+                codec=diff.codec
+            )
+        
+        return diff
     
     @validate(name=valid.dns_safe_or_none, details=(dict, None))
     def new(self, name: str = None, model: str = None, train: str = None, ds: str = None, path: str = None,
@@ -122,22 +138,35 @@ class ModelVersionAPI(NoronhaAPI):
             _duplicate_filter=dict(name=name, model=model)
         )
         
-        barrel = None
-        
         try:
             if not skip_upload:
-                barrel = self._store(mv, path)
+                self._store(mv, path)
         except Exception as e:
             LOG.warn("Reverting creation of model version '{}'".format(mv.name))
-            mv.delete()
-            if barrel is not None:
-                barrel.purge(ignore=True)
+            
+            try:  # the original error may have come from the file manager, so it must not be hidden by the purge
+                mv.delete()
+                MoversBarrel(mv).purge(ignore=True)
+            except Exception as cleanup_error:
+                LOG.error("Failed to revert creation of model version '{}': {}".format(mv.name, repr(cleanup_error)))
+            
             raise e
         
         return mv
     
     @validate(details=(dict, None))
-    def update(self, name, model, train: str = None, ds: str = None, path: str = None, **kwargs):
+    def update(self, name, model, train: str = None, ds: str = None, path: str = None, dry_run=False, **kwargs):
+        
+        current = self.doc().find_one(name=name, model=model)
+        
+        if dry_run:
+            if path is None:
+                raise NhaAPIError("A dry run requires a path to compare with")
+            
+            return self._store(current, path, dry_run=True).as_dict()
+        
+        if kwargs.get('compressed', current.compressed) != current.compressed:
+            kwargs['manifest'] = []  # files are laid out differently, so all of them need to be uploaded
         
         if ds is not None:
             kwargs['ds'] = Dataset().find_one(name=ds, model=model).to_embedded()
@@ -15,6 +15,7 @@
 # limitations under the License.
 
 from noronha.api.main import NoronhaAPI
+from noronha.api.utils import find_by_refs
 from noronha.bay.expedition import ShortExpedition
 from noronha.common.annotations import projected, validate
 from noronha.common.constants import DockerConst, OnBoard, NoteConst
@@ -33,12 +34,14 @@ class NotebookAPI(NoronhaAPI):
                  movers: list = None, datasets: list = None, **kwargs):
         
         LOG.info("Notebook IDE will be mapped to port {}".format(port))
+        file_filters = {}
         return NotebookExp(
             port=port,
             proj=self.proj,
             tag=tag,
-            movers=[ModelVersion.find_by_pk(mv).to_embedded() for mv in movers or []],
-            datasets=[Dataset.find_by_pk(ds) for ds in datasets or []],
+            movers=[mv.to_embedded() for mv in find_by_refs(ModelVersion, movers, file_filters)],
+            datasets=find_by_refs(Dataset, datasets, file_filters),
+            file_filters=file_filters,
             resource_profile=kwargs.pop('resource_profile', None)
         ).launch(**kwargs)
 
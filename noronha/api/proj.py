@@ -114,7 +114,15 @@ class ProjectAPI(NoronhaAPI):
         builder_cls: Type[RepoHandler] = get_builder_class(source_repo=repo)
         builder = builder_cls(repo=repo, img_spec=ImageSpec.from_bvers(bvers))
         
-        bvers.docker_id = builder.build(nocache=nocache)
+        bvers.fingerprint = builder.fingerprint()
+        
+        if bvers.fingerprint is not None and not nocache:
+            previous = BuildVersion.objects(proj=self.proj, fingerprint=bvers.fingerprint).order_by('-built_at').first()
+            
+            if previous is not None:
+                bvers.docker_id = builder.retag(previous.docker_id)
+        
+        bvers.docker_id = bvers.docker_id or builder.build(nocache=nocache)
         bvers.git_version = repo.git_version
         bvers.save(built_now=True)
         return bvers
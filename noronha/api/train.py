@@ -18,6 +18,7 @@ import json
 import traceback
 
 from noronha.api.main import NoronhaAPI
+from noronha.api.utils import find_by_refs
 from noronha.bay.compass import DeploymentCompass
 from noronha.bay.expedition import ShortExpedition
 from noronha.common.annotations import validate, projected, retry_when_none
@@ -78,8 +79,9 @@ class TrainingAPI(NoronhaAPI):
         
         self.set_logger(name)
         bv = BuildVersion.find_one_or_none(tag=tag, proj=self.proj)
-        movers = [ModelVersion.find_by_pk(mv).to_embedded() for mv in movers or []]
-        datasets = [Dataset.find_by_pk(ds) for ds in datasets or []]
+        file_filters = {}
+        movers = [mv.to_embedded() for mv in find_by_refs(ModelVersion, movers, file_filters)]
+        datasets = find_by_refs(Dataset, datasets, file_filters)
         
         if name is None:
             all_names = set([ds.name for ds in datasets])
@@ -104,6 +106,7 @@ class TrainingAPI(NoronhaAPI):
             tag=tag,
             datasets=datasets,
             movers=movers,
+            file_filters=file_filters,
             resource_profile=kwargs.pop('resource_profile', None),
             log=self.LOG
         )
@@ -22,6 +22,7 @@ from noronha.common.annotations import Relaxed, relax, Validation, validation
 from noronha.common.constants import Regex
 from noronha.common.errors import ResolutionError
 from noronha.common.logging import LOG
+from noronha.common.parser import split_file_filter
 from noronha.db.proj import Project
 
 
@@ -140,3 +141,18 @@ def _or_none(cls, method_name):
 _or_none(DefaultValidation, 'dns_safe')
 _or_none(DefaultValidation, 'non_empty_str')
 _or_none(DefaultValidation, 'list_of_dicts')
+
+
+def find_by_refs(doc_cls, refs: list = None, file_filters: dict = None):
+    
+    docs = []
+    
+    for ref in refs or []:
+        pk, files = split_file_filter(ref)
+        doc = doc_cls.find_by_pk(pk)
+        docs.append(doc)
+        
+        if files is not None and file_filters is not None:
+            file_filters[doc.get_pk()] = files
+    
+    return docs
@@ -18,10 +18,11 @@
 """
 
 import git
+import hashlib
 import os
 from abc import ABC
 
-from noronha.common.constants import DockerConst
+from noronha.common.constants import DockerConst, HostUser
 from noronha.common.errors import ResolutionError
 from noronha.db.proj import Project
 
@@ -60,6 +61,16 @@ class Repository(ABC):
     def from_project(cls, proj: Project):
         
         raise NotImplementedError
+    
+    def fingerprint(self):
+        
+        """Digest of the build context, or None if it cannot be told whether the context changed"""
+        
+        return None
+    
+    def read_file(self, file_name: str):
+        
+        return None
 
 
 class LocalRepository(Repository):
@@ -89,6 +100,46 @@ class LocalRepository(Repository):
             return str(self.git_repo.head.commit)
         except git.exc.InvalidGitRepositoryError:
             return None
+    
+    def list_files(self):
+        
+        """Files sent to the Docker daemon as the build context, which honors .dockerignore but not .gitignore"""
+        
+        from docker.utils.build import exclude_paths  # lazy import
+        
+        patterns = [
+            line.strip() for line in (self.read_file('.dockerignore') or '').splitlines()
+            if line.strip() and not line.strip().startswith('#')
+        ]
+        
+        return sorted(
+            path for path in exclude_paths(self.address, patterns)
+            if os.path.isfile(os.path.join(self.address, path))
+        )
+    
+    def read_file(self, file_name: str):
+        
+        path = os.path.join(self.address, file_name)
+        
+        if not os.path.isfile(path):
+            return None
+        
+        with open(path) as f:
+            return f.read()
+    
+    def fingerprint(self):
+        
+        digest = hashlib.sha256()
+        
+        for rel_path in self.list_files():
+            path = os.path.join(self.address, rel_path)
+            digest.update('{}:{}\0'.format(rel_path, os.access(path, os.X_OK)).encode())
+            
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024*1024), b''):
+                    digest.update(block)
+        
+        return digest.hexdigest()
 
 
 class GitRepository(Repository):
@@ -113,9 +164,42 @@ class GitRepository(Repository):
         
         return self.address.split('/')[-1]
     
+    @property
+    def mirror_path(self):
+        
+        return os.path.join(HostUser.GIT_MIRRORS, hashlib.sha256(self.address.encode()).hexdigest()[:16])
+    
+    def sync_mirror(self):
+        
+        """Keeps a shallow copy of the remote repository, so that only the latest changes are fetched"""
+        
+        if os.path.isdir(self.mirror_path):
+            mirror = git.Repo(self.mirror_path)
+            mirror.git.fetch('--depth=1', '--prune', 'origin', '+refs/heads/*:refs/heads/*')
+        else:
+            os.makedirs(HostUser.GIT_MIRRORS, exist_ok=True)
+            mirror = git.Repo.clone_from(self.address, self.mirror_path, bare=True, depth=1)
+        
+        return mirror
+    
+    def fingerprint(self):
+        
+        return self.sync_mirror().git.rev_parse('HEAD^{tree}')
+    
+    def read_file(self, file_name: str):
+        
+        try:
+            return git.Repo(self.mirror_path).git.show('HEAD:{}'.format(file_name))
+        except (git.exc.GitCommandError, git.exc.NoSuchPathError):
+            return None
+    
     def clone(self, path):
         
-        git.Git(path).clone(self.address)
+        if not os.path.isdir(self.mirror_path):
+            self.sync_mirror()
+        
+        git.Git(path).clone(self.mirror_path, self.name)
+        git.Git(os.path.join(path, self.name)).remote('set-url', 'origin', self.address)
 
 
 class DockerRepository(Repository):
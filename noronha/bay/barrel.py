@@ -17,22 +17,26 @@
 """TODO: {{module description}}
 """
 
+import fnmatch
+import math
 import os
 import pathlib
 import shutil
-import tarfile
 from abc import ABC, abstractmethod
 from typing import List
 
-from noronha.bay.warehouse import get_warehouse
-from noronha.bay.utils import Workpath, FileSpec, StoreHierarchy
+from noronha.bay.compressor import get_codec
+from noronha.bay.warehouse import Warehouse, get_warehouse
+from noronha.bay.utils import Workpath, FileSpec, StoreHierarchy, StreamPipe, ManifestDiff, HashingReader, DownloadPlan
 from noronha.common.constants import WarehouseConst, Extension
-from noronha.common.errors import NhaStorageError
+from noronha.common.errors import NhaStorageError, MisusageError
 from noronha.common.logging import Logged
 from noronha.common.parser import cape_list
+from noronha.common.utils import run_blocking
 from noronha.db.ds import Dataset
 from noronha.db.movers import ModelVersion
 from noronha.db.proj import Project
+from noronha.db.utils import ManifestEntry
 
 
 class Barrel(ABC, Logged):
@@ -40,11 +44,19 @@ class Barrel(ABC, Logged):
     section: str = None
     subject = None
     
-    def __init__(self, schema: List[FileSpec] = None, compress_to: str = None, log=None, lightweight=False):
+    def __init__(self, schema: List[FileSpec] = None, compress_to: str = None, codec: str = None, log=None,
+                 lightweight=False, manifest: List[ManifestEntry] = None, archive_size: int = None,
+                 warehouse: Warehouse = None, stored_codec: str = None):
         
         Logged.__init__(self, log=log)
-        self.warehouse = get_warehouse(section=self.section, log=log, lightweight=lightweight)
-        self.compressed = None if not compress_to else '{}.tar.gz'.format(compress_to)
+        self.warehouse = warehouse or get_warehouse(section=self.section, log=log, lightweight=lightweight)
+        self.codec = None if not compress_to else get_codec(codec)
+        self.compressed = None if not compress_to else self.codec.archive_name(compress_to)
+        self.stored_codec = None if not compress_to else stored_codec  # codec of the archive already stored
+        self.stored_archive = None if not (compress_to and stored_codec) else \
+            get_codec(stored_codec).archive_name(compress_to)
+        self.manifest = manifest or None
+        self.archive_size = archive_size
         
         if schema is None:
             self.schema = None
@@ -100,16 +112,68 @@ class Barrel(ABC, Logged):
         
         if self.schema is None:
             self.LOG.warn("Deploying {} without a strict definition of files".format(self.subject))
-            schema = [
-                FileSpec(name=name) for name in
-                self.warehouse.lyst(self.make_hierarchy())
-            ]
+            
+            if self.manifest is None:  # listings are cached for a short while, so estimating and deploying share one
+                names = [name for name, _ in self.warehouse.lyst_files(self.make_hierarchy())]
+            else:
+                names = [entry.name for entry in self.manifest]
+            
+            schema = [FileSpec(name=name) for name in names]
             self._print_files(schema)
-        else:
+        elif self.manifest is None:
             schema = self.schema
+        else:  # optional files that were never stored are not looked up
+            stored = {entry.name for entry in self.manifest}
+            schema = [f for f in self.schema if f.name in stored or f.required]
         
         return schema
     
+    @staticmethod
+    def matches(file_name: str, files: List[str] = None):
+        
+        return files is None or any(fnmatch.fnmatch(file_name, pattern) for pattern in files)
+    
+    def filter_schema(self, schema: List[FileSpec], files: List[str] = None):
+        
+        if files is None:
+            return schema
+        
+        filtered = [f for f in schema if self.matches(f.name, files)]
+        assert len(filtered) > 0, NhaStorageError(
+            "No files in {} match the filter: {}".format(self.subject, ', '.join(files))
+        )
+        self._print_files(filtered)
+        return filtered
+    
+    def _get_listed_sizes(self, files: List[str] = None):
+        
+        try:
+            listed = self.warehouse.lyst_files(self.make_hierarchy())
+        except (MisusageError, NhaStorageError):
+            return []
+        
+        return [size for name, size in listed if self.matches(name, files)]
+    
+    def estimate_mb(self, files: List[str] = None):
+        
+        if self.manifest is None:
+            if self.schema is not None:
+                return sum(fyle.max_mb or 10 for fyle in self.schema if self.matches(fyle.name, files))
+            
+            sizes = [] if self.compressed else self._get_listed_sizes(files)
+            
+            if len(sizes) == 0 or None in sizes:
+                return 1024
+            else:
+                return max(math.ceil(sum(sizes)/(1024*1024)), 1)
+        
+        if self.compressed:  # the archive is read as a whole, whatever the filter
+            files = None
+        
+        n_bytes = sum(entry.size for entry in self.manifest if self.matches(entry.name, files))
+        
+        return max(math.ceil(n_bytes/(1024*1024)), 1)
+    
     def raise_for_file_size(self, file_spec: FileSpec, actual_size_mb: int):
         
         raise NhaStorageError(
@@ -117,20 +181,88 @@ class Barrel(ABC, Logged):
             .format(file_spec.name, actual_size_mb)
         )
     
-    def validate_file_sizes(self, file_schema: List[FileSpec]):
+    def _overflow_callback(self, file_spec: FileSpec):
         
-        for fyle in file_schema:
-            size = fyle.get_size_mb()
+        return lambda n_bytes: self.raise_for_file_size(file_spec=file_spec, actual_size_mb=int(n_bytes/(1024*1024)))
+    
+    def _make_manifest(self, to_store: List[FileSpec], manifest: List[ManifestEntry] = None):
+        
+        old = {entry.name: entry for entry in manifest or []}
+        entries = []
+        
+        for file_spec in to_store:
+            entry = file_spec.make_manifest_entry(hashed=False)
+            
+            if entry.size > file_spec.max_mb*1024*1024:  # fails fast when the size is already known
+                self._overflow_callback(file_spec)(entry.size)
             
-            if size > fyle.max_mb:
-                self.raise_for_file_size(
-                    file_spec=fyle,
-                    actual_size_mb=size
+            if file_spec.name in old and old[file_spec.name].size == entry.size:
+                entry = file_spec.make_manifest_entry()  # only a hash tells whether a same-sized file changed
+            
+            entries.append(entry)
+        
+        return entries
+    
+    def _upload_files(self, to_upload: List[FileSpec], entries: dict):
+        
+        readers = {}
+        
+        try:
+            for file_spec in to_upload:  # size and hash are computed in the same pass as the upload
+                file_spec.content = readers[file_spec.name] = file_spec.open_reader(self._overflow_callback(file_spec))
+            
+            self.warehouse.store_files(
+                hierarchy=self.make_hierarchy(),
+                file_schema=to_upload
+            )
+        finally:
+            for reader in readers.values():
+                reader.close()
+        
+        for name, reader in readers.items():
+            entries[name].size = reader.n_bytes
+            entries[name].sha256 = reader.sha256
+    
+    def _store(self, to_store: List[FileSpec], manifest: List[ManifestEntry] = None, dry_run=False):
+        
+        diff = ManifestDiff(
+            old=manifest,
+            new=self._make_manifest(to_store, manifest),
+            whole=bool(self.compressed)
+        )
+        
+        if dry_run:
+            return diff
+        elif manifest and diff.is_empty:  # the stored archive is kept, along with the codec that packed it
+            self.LOG.info("Files of {} are up to date".format(self.subject))
+            diff.archive_size = self.archive_size
+            diff.codec = self.stored_codec
+            return diff
+        
+        entries = {entry.name: entry for entry in diff.manifest}
+        
+        if self.compressed:
+            diff.archive_size = self._compress_and_store(to_compress=to_store, entries=entries)
+            diff.codec = self.codec.alias
+            
+            if manifest and self.stored_archive not in (None, self.compressed):
+                self._purge_stored_archive()
+        else:
+            to_upload = [file_spec for file_spec in to_store if file_spec.name in diff.uploads]
+            
+            if to_upload:
+                self._upload_files(to_upload, entries)
+            
+            if diff.removed:
+                self.warehouse.delete_files(
+                    hierarchy=self.make_hierarchy(),
+                    file_names=diff.removed
                 )
+        
+        return diff
     
-    def store_from_dict(self, dyct: dict = None):
+    def store_from_dict(self, dyct: dict = None, manifest: List[ManifestEntry] = None, dry_run=False):
         
-        to_compress = []
         to_store = []
         work = None if not self.compressed else Workpath.get_tmp()
         
@@ -145,27 +277,20 @@ class Barrel(ABC, Logged):
                         continue
                 elif self.compressed:
                     work.deploy_text_file(name=file_spec.name, content=file_content)
-                    to_compress.append(file_spec)
+                    file_spec.set_path(work)
                 else:
                     file_spec.content = file_content
-                    to_store.append(file_spec)
+                
+                to_store.append(file_spec)
             
-            if self.compressed:
-                self._compress_and_store(work, to_compress=to_compress)
-            else:
-                self.validate_file_sizes(to_store)
-                self.warehouse.store_files(
-                    hierarchy=self.make_hierarchy(),
-                    file_schema=to_store
-                )
+            return self._store(to_store, manifest=manifest, dry_run=dry_run)
         finally:
             if work is not None:
                 work.dispose()
     
-    def store_from_path(self, path):
+    def store_from_path(self, path, manifest: List[ManifestEntry] = None, dry_run=False):
         
         path, schema = self.infer_schema_from_path(path)
-        to_compress = []
         to_store = []
         
         for file_spec in schema:
@@ -177,20 +302,11 @@ class Barrel(ABC, Logged):
                 else:
                     self.LOG.info('Ignoring absent file: {}'.format(file_spec.name))
                     continue
-            elif self.compressed:
-                to_compress.append(file_spec)
             else:
                 file_spec.set_path(path)
                 to_store.append(file_spec)
         
-        if self.compressed:
-            self._compress_and_store(path, to_compress=to_compress)
-        else:
-            self.validate_file_sizes(to_store)
-            self.warehouse.store_files(
-                hierarchy=self.make_hierarchy(),
-                file_schema=to_store
-            )
+        return self._store(to_store, manifest=manifest, dry_run=dry_run)
     
     def move(self, path_from, path_to):
         
@@ -210,6 +326,16 @@ class Barrel(ABC, Logged):
             else:
                 shutil.move(file_path, os.path.join(path_to, file_spec.name))
     
+    def _purge_stored_archive(self):
+        
+        """Removes the archive packed with a previous codec, since the new archive has a different name"""
+        
+        try:
+            self.warehouse.delete_files(hierarchy=self.make_hierarchy(), file_names=[self.stored_archive])
+        except Exception as e:
+            self.LOG.warn("Failed to remove previous archive {} of {}".format(self.stored_archive, self.subject))
+            self.LOG.debug(repr(e))
+    
     def purge(self, ignore=False):
         
         return self.warehouse.delete(
@@ -217,92 +343,130 @@ class Barrel(ABC, Logged):
             ignore=ignore
         )
     
-    def _compress_and_store(self, path: str, to_compress: List[FileSpec] = None):
+    async def purge_async(self, ignore=False):
+        
+        return await self.warehouse.delete_async(
+            self.make_hierarchy(),
+            ignore=ignore
+        )
+    
+    def _compress_and_store(self, to_compress: List[FileSpec], entries: dict = None):
         
-        work = Workpath.get_tmp()
+        files = [(f.path_from, f.name) for f in to_compress]
+        specs = {f.name: f for f in to_compress}
+        readers = {}
         
-        try:
-            target = work.join(self.compressed)
-            
-            with tarfile.open(target, 'w:gz') as f:
-                for file_spec in to_compress:
-                    file_path = os.path.join(path, file_spec.alias)
-                    f.add(file_path, arcname=file_spec.name)
+        def wrap(name, fileobj):  # files are hashed while they are packed
             
-            file_spec = FileSpec(name=self.compressed)
-            self.validate_file_sizes([file_spec])
-            self.warehouse.store_files(
-                hierarchy=self.make_hierarchy(),
-                file_schema=[file_spec]
-            )
-        finally:
-            work.dispose()
+            readers[name] = HashingReader(fileobj, max_bytes=specs[name].max_mb*1024*1024,
+                                          on_overflow=self._overflow_callback(specs[name]))
+            return readers[name]
+        
+        file_spec = FileSpec(name=self.compressed)
+        pipe = StreamPipe(
+            producer=lambda fileobj: self.codec.pack(fileobj, files, wrap=wrap),
+            max_bytes=file_spec.max_mb*1024*1024
+        )
+        
+        self.LOG.info("Compressing {} file(s) into {}".format(len(files), self.compressed))
+        
+        try:
+            with pipe:  # the archive is uploaded while it is being written
+                file_spec.content = pipe
+                self.warehouse.store_files(
+                    hierarchy=self.make_hierarchy(),
+                    file_schema=[file_spec]
+                )
+        except NhaStorageError as e:
+            if pipe.overflown:
+                self.raise_for_file_size(file_spec=file_spec, actual_size_mb=int(pipe.n_bytes/(1024*1024)))
+            else:
+                raise e
+        
+        for name, reader in readers.items():
+            if entries is not None and name in entries:
+                entries[name].size = reader.n_bytes
+                entries[name].sha256 = reader.sha256
+        
+        return pipe.n_bytes
     
-    def _decompress(self, path: str):
+    def _extract(self, path: str, files: List[str] = None):
         
-        if self.compressed:
-            target_file = os.path.join(path, self.compressed)
-            
-            with tarfile.open(target_file, 'r:gz') as f:
-                f.extractall(path)
-            
-            os.remove(target_file)
+        stream = self.warehouse.open_file(self.make_hierarchy(), self.compressed)
+        
+        try:
+            self.LOG.info("Extracting {} to {}".format(self.compressed, path))
+            self.codec.unpack(  # the archive is extracted while it is being downloaded
+                stream, path,
+                members=None if files is None else lambda name: self.matches(name, files)
+            )
+        finally:
+            stream.close()
     
-    def _verify_schema(self, path: str):
+    def _verify_schema(self, path: str, files: List[str] = None):
         
         if self.schema:
-            for file_spec in self.schema:
+            for file_spec in filter(lambda f: self.matches(f.name, files), self.schema):
                 file_exists = os.path.isfile(os.path.join(path, file_spec.name))
                 assert file_exists or not file_spec.required,\
                     NhaStorageError("Required file '{}' is missing from {}".format(file_spec.name, self.subject))
     
-    def deploy(self, path_to):
+    def deploy(self, path_to, files: List[str] = None):
         
         if self.compressed:
-            file_schema = [FileSpec(name=self.compressed)]
+            self._extract(path_to, files=files)
         else:
-            file_schema = self.infer_schema_from_repo()
-        
-        self.warehouse.deploy_files(
-            hierarchy=self.make_hierarchy(),
-            file_schema=file_schema,
-            path_to=path_to
-        )
+            self.warehouse.deploy_files(
+                hierarchy=self.make_hierarchy(),
+                file_schema=self.filter_schema(self.infer_schema_from_repo(), files),
+                path_to=path_to
+            )
         
-        self._decompress(path_to)
-        self._verify_schema(path_to)
+        self._verify_schema(path_to, files=files)
     
-    def get_deployables(self, path_to, on_board_perspective=True):
+    async def deploy_async(self, path_to, files: List[str] = None):
         
         if self.compressed:
-            file_schema = [FileSpec(name=self.compressed)]
+            await run_blocking(self._extract, path_to, files=files)
         else:
-            file_schema = self.infer_schema_from_repo()
+            schema = await run_blocking(self.infer_schema_from_repo)
+            await self.warehouse.deploy_files_async(
+                hierarchy=self.make_hierarchy(),
+                file_schema=self.filter_schema(schema, files),
+                path_to=path_to
+            )
+        
+        self._verify_schema(path_to, files=files)
+    
+    def add_to_download_plan(self, plan: DownloadPlan, path_to, on_board_perspective=True, files: List[str] = None):
         
         hierarchy = self.make_hierarchy()
+        entries = {entry.name: entry for entry in self.manifest or []}
         
-        cmds = [
-            self.warehouse.get_download_cmd(
-                path_from=hierarchy.join_as_path(file_spec.name),
-                path_to=os.path.join(path_to, file_spec.name),
-                on_board_perspective=on_board_perspective
+        if self.compressed:  # extracted while downloaded, then checked against the manifest
+            if files is not None:
+                self.LOG.warn("Filter {} does not apply to the compressed {}".format(files, self.subject))
+            
+            plan.add_archive(
+                source=self.warehouse.get_download_source(hierarchy.join_as_path(self.compressed), on_board_perspective),
+                path_to=path_to,
+                codec=self.codec,
+                manifest=self.manifest,
+                size=self.archive_size,
+                msg='Extracting {} to {}'.format(self.compressed, path_to)
             )
-            for file_spec in file_schema
-        ]
-        
-        msgs = [
-            'Injecting file: {}'.format(file_spec.name)
-            for file_spec in file_schema
-        ]
-        
-        if self.compressed:
-            msgs.append('Extracting {} to {}'.format(self.compressed, path_to))
-            cmds.append('tar -xzf {tgz_file} {path} && rm -f {tgz_file}'.format(
-                tgz_file=self.compressed,
-                path=path_to
-            ))
+        else:
+            for file_spec in self.filter_schema(self.infer_schema_from_repo(), files):
+                entry = entries.get(file_spec.name)
+                plan.add_file(
+                    source=self.warehouse.get_download_source(hierarchy.join_as_path(file_spec.name), on_board_perspective),
+                    path_to=os.path.join(path_to, file_spec.name),
+                    sha256=None if entry is None else entry.sha256,
+                    size=None if entry is None else entry.size,
+                    msg='Injecting file: {}'.format(file_spec.name)
+                )
         
-        return zip(msgs, cmds)
+        return plan
     
     @abstractmethod
     def make_hierarchy(self) -> StoreHierarchy:
@@ -322,6 +486,10 @@ class DatasetBarrel(Barrel):
         super().__init__(
             schema=ds.model.data_files,
             compress_to=None if not ds.compressed else ds.name,
+            codec=kwargs.pop('codec', None) or ds.codec or WarehouseConst.Codecs.LEGACY,
+            stored_codec=None if not ds.manifest else ds.codec or WarehouseConst.Codecs.LEGACY,
+            manifest=ds.manifest,
+            archive_size=ds.archive_size,
             lightweight=ds.lightweight,
             **kwargs
         )
@@ -353,6 +521,10 @@ class MoversBarrel(Barrel):
         super().__init__(
             schema=mv.model.model_files,
             compress_to=None if not mv.compressed else mv.name,
+            codec=kwargs.pop('codec', None) or mv.codec or WarehouseConst.Codecs.LEGACY,
+            stored_codec=None if not mv.manifest else mv.codec or WarehouseConst.Codecs.LEGACY,
+            manifest=mv.manifest,
+            archive_size=mv.archive_size,
             lightweight=mv.lightweight,
             **kwargs
         )
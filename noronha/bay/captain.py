@@ -16,17 +16,28 @@
 
 """Module used to orchestrate container deployment"""
 
+import hashlib
+import json
 import logging
 import os
+import pathlib
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tarfile
 import time
 from abc import ABC, abstractmethod
-from conu import DockerBackend, K8sBackend
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from conu import DockerBackend
 from conu.backend.docker.container import DockerContainer
+from conu.backend.docker.image import DockerImage
 from conu.backend.k8s.deployment import Deployment
 from conu.backend.k8s.pod import Pod
 from conu.backend.k8s.pod import PodPhase
 from conu.exceptions import ConuException
-from datetime import datetime
 from docker.errors import APIError as DockerAPIError
 from docker.types import ServiceMode, TaskTemplate, ContainerSpec, Resources, Healthcheck
 from kaptan import Kaptan
@@ -37,25 +48,29 @@ from kubernetes import watch as k8s_watch
 from kubernetes.client.rest import ApiException as K8sApiException
 from kubernetes.stream import stream
 import random_name
-from subprocess import Popen, PIPE
+from threading import Event, Lock, Thread, local
 from typing import Type, List
+from urllib3.exceptions import HTTPError as Urllib3Error
 
 from noronha.bay.cargo import Cargo, EmptyCargo, MappedCargo, HeavyCargo, SharedCargo
-from noronha.bay.compass import DockerCompass, CaptainCompass, SwarmCompass, KubeCompass
+from noronha.bay.compass import DockerCompass, CaptainCompass, SwarmCompass, KubeCompass, LocalCompass,\
+    FSWarehouseCompass
 from noronha.bay.shipyard import ImageSpec
-from noronha.bay.utils import Workpath
+from noronha.bay.utils import Workpath, DownloadPlan, StreamPipe
 from noronha.common.annotations import Configured, Patient, patient, retry_when_none
 from noronha.common.conf import CaptainConf
-from noronha.common.constants import DockerConst, Encoding, DateFmt, Regex, LoggerConst, KubeConst
-from noronha.common.errors import ResolutionError, NhaDockerError, PatientError, ConfigurationError
+from noronha.common.constants import DockerConst, Encoding, LoggerConst, KubeConst, EnvVar, OnBoard, Package
+from noronha.common.errors import ResolutionError, NhaDockerError, PatientError, ConfigurationError, MisusageError
 from noronha.common.logging import Logged
-from noronha.common.parser import dict_to_kv_list, assert_str, StructCleaner, join_dicts
+from noronha.common.parser import dict_to_kv_list, StructCleaner, join_dicts
 
 
 class Captain(ABC, Configured, Patient, Logged):
     
     conf = CaptainConf
     compass_cls: Type[CaptainCompass] = None
+    _live_tasks = {}  # shared by all instances: {manager: (expiration, {deployment name: {task ids}})}
+    _live_tasks_lock = Lock()
     
     def __init__(self, section: str, resource_profile: str = None, **kwargs):
         
@@ -96,16 +111,269 @@ class Captain(ABC, Configured, Patient, Logged):
         
         pass
     
+    @abstractmethod
+    def load_vol(self, cargo: Cargo, mule_alias: str = None):
+        
+        pass
+    
+    @abstractmethod
+    def list_cached_vols(self) -> List[str]:
+        
+        pass
+    
+    @abstractmethod
+    def count_vol_refs(self, vol_name: str) -> int:
+        
+        """Number of containers that mount a shared volume"""
+        
+        pass
+    
+    def rm_cached_vol(self, vol_name: str):
+        
+        assert vol_name.startswith(DockerConst.CACHED_VOL), MisusageError("Not a shared volume: {}".format(vol_name))
+        return self.rm_vol(Cargo(name=vol_name, mount_to=DockerConst.STG_MOUNT, mode='rw'))
+    
+    def load_vols(self, cargos: List[Cargo], mule_alias: str = None):
+        
+        """Loads independent cargos at once. If any of them fails, the ones already loaded are removed"""
+        
+        latencies, loaded, errors = {}, [], []
+        
+        def load(cargo: Cargo):
+            start = time.time()
+            self.load_vol(cargo, mule_alias)
+            return time.time() - start
+        
+        with ThreadPoolExecutor(max_workers=self.compass.vol_concurrency) as executor:
+            futures = {executor.submit(load, cargo): cargo for cargo in cargos}
+            
+            for future in as_completed(futures):
+                cargo = futures[future]
+                
+                try:
+                    latencies[cargo.name] = round(future.result(), 3)
+                except Exception as e:
+                    self.LOG.error("Failed to load volume '{}'".format(cargo.name))
+                    errors.append(e)
+                else:
+                    self.LOG.debug("Loaded volume '{}' in {} seconds".format(cargo.name, latencies[cargo.name]))
+                    loaded.append(cargo)
+        
+        if errors:
+            for cargo in loaded:
+                if not isinstance(cargo, (EmptyCargo, MappedCargo)):  # persistent or external volumes are kept
+                    self.rm_vol(cargo, ignore=True)
+            
+            raise errors[0]
+        
+        self.LOG.profile(dict(volume_loading=latencies))
+        return latencies
+    
     def close(self):
         
         pass
     
+    def prepare_cluster(self):
+        
+        """Creates the resources that every container depends on, so that concurrent launches don't race for them"""
+        
+        pass
+    
     def mule_name(self, mule_alias: str = None):
         
         return '{}-mule'.format(
             mule_alias or random_name.generate_name()
         )
     
+    @property
+    def pools_mules(self):
+        
+        return self.compass.mule_idle_timeout > 0
+    
+    @property
+    def mule_cmd(self):
+        
+        if not self.pools_mules:
+            return DockerConst.MULE_CMD
+        
+        # a pooled mule quits by itself once its clock has not been touched for a while
+        return ['sh', '-c', (
+            'touch {clock}; '
+            'while [ $(($(date +%s) - $(stat -c %Y {clock}))) -lt {timeout} ]; do sleep 5; done'
+        ).format(clock=DockerConst.MULE_CLOCK, timeout=self.compass.mule_idle_timeout)]
+    
+    @abstractmethod
+    def touch_mule(self, mule):
+        
+        pass
+    
+    @contextmanager
+    def mule_lease(self, mule):
+        
+        """Keeps a pooled mule from quitting while it is in use"""
+        
+        if not self.pools_mules:
+            yield mule
+            return
+        
+        done = Event()
+        
+        def keep_alive():
+            while not done.wait(max(self.compass.mule_idle_timeout/3, 1)):
+                try:
+                    self.touch_mule(mule)
+                except Exception as e:
+                    self.LOG.debug(repr(e))
+        
+        self.touch_mule(mule)
+        thread = Thread(target=keep_alive, daemon=True)
+        thread.start()
+        
+        try:
+            yield mule
+        finally:
+            done.set()
+            thread.join()
+    
+    @contextmanager
+    def vol_claim(self, cargo: Cargo, mule=None):
+        
+        """Lets a single command load a shared volume, while the others wait for it to be sealed
+        
+        Yields True if this command must load the volume, or False if another command has already loaded it.
+        The claim is refreshed while the volume is loaded, so that a claim left by an interrupted command is
+        taken over once it expires. If loading fails, the claim is released for the next command to retry
+        """
+        
+        if not cargo.cached:
+            yield True
+            return
+        
+        if not self.await_vol_claim(cargo, mule):
+            yield False
+            return
+        
+        done = Event()
+        
+        def keep_alive():
+            while not done.wait(DockerConst.VOL_CLAIM_TTL/3):
+                try:
+                    self.touch_vol_claim(cargo, mule)
+                except Exception as e:
+                    self.LOG.debug(repr(e))
+        
+        thread = Thread(target=keep_alive, daemon=True)
+        thread.start()
+        
+        try:
+            yield True
+        except Exception as e:
+            try:
+                self.release_vol_claim(cargo, mule)
+            except Exception as release_error:
+                self.LOG.debug(repr(release_error))
+            raise e
+        finally:
+            done.set()
+            thread.join()
+    
+    def await_vol_claim(self, cargo: Cargo, mule=None):
+        
+        waiting = False
+        
+        while True:
+            sealed, stamp, age = self.vol_claim_state(cargo, mule)
+            
+            if sealed:
+                return False
+            elif stamp is None and self.try_claim_vol(cargo, mule):
+                return True
+            elif stamp is not None and age > DockerConst.VOL_CLAIM_TTL and self.try_claim_vol(cargo, mule, stamp):
+                self.LOG.warn("Taking over shared volume '{}' from an interrupted command".format(cargo.name))
+                return True
+            elif not waiting:
+                self.LOG.info("Waiting for shared volume '{}' to be loaded by another command".format(cargo.name))
+                waiting = True
+            
+            time.sleep(DockerConst.VOL_CLAIM_TTL/12)
+    
+    @staticmethod
+    def vol_claim_scripts(vol_path: str):
+        
+        """Shell scripts for claiming a shared volume from an auxiliary container
+        
+        Creating a directory is atomic, even over NFS, so only one command succeeds in claiming the volume.
+        Taking over an expired claim is atomic as well, because it creates a directory named after the
+        timestamp of the expired claim, which only one of the commands that saw that timestamp can create
+        """
+        
+        claim = os.path.join(vol_path, DockerConst.VOL_CLAIM)
+        seal = os.path.join(vol_path, DockerConst.VOL_SEAL)
+        
+        return dict(
+            state=(
+                'if [ -f {seal} ]; then echo sealed; '
+                'elif [ -d {claim} ]; then stamp=$(stat -c %Y {claim}); echo $stamp $(($(date +%s) - $stamp)); '
+                'else echo free; fi'
+            ).format(seal=seal, claim=claim),
+            claim='mkdir -p {vol} && mkdir {claim} 2>/dev/null && echo yes || echo no'.format(vol=vol_path, claim=claim),
+            take_over='mkdir {claim}/.expired-{{stamp}} 2>/dev/null && touch {claim} && echo yes || echo no'.format(
+                claim=claim),
+            touch='touch {}'.format(claim),
+            release='rm -rf {}'.format(claim)
+        )
+    
+    def run_claim_script(self, cargo: Cargo, mule, script: str, **kwargs) -> str:
+        
+        raise NotImplementedError()
+    
+    def vol_claim_state(self, cargo: Cargo, mule=None):
+        
+        """Whether the volume is sealed, plus the timestamp and age in seconds of its claim, if any"""
+        
+        out = self.run_claim_script(cargo, mule, 'state').strip()
+        
+        if out == 'sealed':
+            return True, None, None
+        elif out == 'free':
+            return False, None, None
+        else:
+            stamp, age = out.split()
+            return False, int(stamp), int(age)
+    
+    def try_claim_vol(self, cargo: Cargo, mule=None, expired: int = None):
+        
+        if expired is None:
+            out = self.run_claim_script(cargo, mule, 'claim')
+        else:
+            out = self.run_claim_script(cargo, mule, 'take_over', stamp=expired)
+        
+        return out.strip() == 'yes'
+    
+    def touch_vol_claim(self, cargo: Cargo, mule=None):
+        
+        self.run_claim_script(cargo, mule, 'touch')
+    
+    def release_vol_claim(self, cargo: Cargo, mule=None):
+        
+        self.run_claim_script(cargo, mule, 'release')
+    
+    @staticmethod
+    def _as_root(tarinfo: tarfile.TarInfo):
+        
+        tarinfo.uid = tarinfo.gid = 0  # same ownership docker cp would give
+        tarinfo.uname = tarinfo.gname = 'root'
+        return tarinfo
+    
+    def pack_dir(self, src: str) -> StreamPipe:
+        
+        def producer(fileobj):
+            with tarfile.open(fileobj=fileobj, mode='w|') as tar:
+                for file_name in sorted(os.listdir(src)):
+                    tar.add(os.path.join(src, file_name), arcname=file_name, filter=self._as_root)
+        
+        return StreamPipe(producer)
+    
     def _find_sth(self, what, method, name, key=None, **kwargs):
         
         items = list(filter(
@@ -124,8 +392,31 @@ class Captain(ABC, Configured, Patient, Logged):
 
         pass
     
+    def list_task_ids(self, name: str) -> set:
+        
+        """Hostnames of the containers that currently exist for a deployment, as seen a few seconds ago at most
+        
+        A single listing of the containers of all deployments is shared by every lookup made within that time,
+        so that checking many deployments costs one call to the container manager
+        """
+        
+        key = self.compass.tipe
+        
+        with self._live_tasks_lock:
+            expiration, snapshot = self._live_tasks.get(key, (0, None))
+        
+        if snapshot is None or expiration <= time.time():
+            snapshot = self._snapshot_task_ids()
+            
+            with self._live_tasks_lock:
+                self._live_tasks[key] = (time.time() + self.compass.liveness_ttl, snapshot)
+        
+        return snapshot.get(name, set())
+    
     @abstractmethod
-    def list_cont_or_pod_ids(self):
+    def _snapshot_task_ids(self) -> dict:
+        
+        """Task ids of every deployment, keyed by deployment name"""
         
         pass
 
@@ -137,6 +428,7 @@ class SwarmCaptain(Captain):
     _CPU_RATE = 10**9  # vCores to nanoCores
     _MEM_RATE = 1024*1024  # MB to bytes
     _SEC_RATE = 10**9  # seconds to nanoseconds
+    _network_lock = Lock()
     
     def __init__(self, section: str, **kwargs):
         
@@ -154,7 +446,7 @@ class SwarmCaptain(Captain):
     def run(self, img: ImageSpec, env_vars, mounts, cargos, ports, cmd: list, name: str, foreground=False, is_job=False):
         
         self.make_name_available(name)
-        [self.load_vol(v, name) for v in cargos]
+        self.load_vols(cargos, name)
         image = self.docker_backend.ImageClass(img.repo, tag=img.tag)
         
         additional_opts = \
@@ -184,7 +476,7 @@ class SwarmCaptain(Captain):
     def deploy(self, img: ImageSpec, env_vars, mounts, cargos, ports, cmd: list, name: str, tasks: int = 1,
                allow_probe=False):
         
-        [self.load_vol(v, name) for v in cargos]
+        self.load_vols(cargos, name)
         self.assert_network()
         depl = self.find_depl(name)
         
@@ -232,9 +524,15 @@ class SwarmCaptain(Captain):
     @patient
     def rm_vol(self, cargo: Cargo, ignore=False):
         
-        if isinstance(cargo, MappedCargo):
+        if isinstance(cargo, MappedCargo) or cargo.cached:  # shared volumes are only removed when unused
             return False
         
+        if self.pools_mules:  # a pooled mule would keep the volume in use
+            mule = self.find_cont(self.pooled_mule_name(cargo))
+            
+            if mule is not None:
+                self.rm_cont(mule)
+        
         try:
             self.docker_api.remove_volume(name=cargo.name, force=True)
             return True
@@ -243,7 +541,7 @@ class SwarmCaptain(Captain):
                 self.LOG.error(e)
                 return False
             else:
-                msg = "Waiting up to {} seconds for removal of volume {}".format(self.timeout, cargo.name)
+                msg = self.waiting_msg("for removal of volume {}".format(cargo.name))
                 raise PatientError(wait_callback=lambda: self.LOG.info(msg), original_exception=e)
     
     def rm_cont(self, x: DockerContainer):
@@ -266,18 +564,32 @@ class SwarmCaptain(Captain):
         else:
             return True
     
-    def list_cont_or_pod_ids(self):
+    def _snapshot_task_ids(self):
+        
+        label, snapshot = 'com.docker.swarm.service.name', {}
+        
+        for cont in self.docker_api.containers(all=True, filters=dict(label=label)):
+            name = (cont.get('Labels') or {}).get(label)
+            snapshot.setdefault(name, set()).add(cont['Id'][:12])  # task containers are named after their short ids
+        
+        return snapshot
+    
+    def list_conts(self, **filters):
         
         return [
-            cont.get_id() for cont in
-            self.docker_backend.list_containers()
+            DockerContainer(
+                DockerImage(None, identifier=cont['ImageID']),
+                cont['Id'],
+                name=(cont.get('Names') or [None])[0]
+            )
+            for cont in self.docker_api.containers(all=True, filters=filters)
         ]
     
     def find_cont(self, name):
         
         return self._find_sth(
             what='containers',
-            method=self.docker_backend.list_containers,
+            method=lambda: self.list_conts(name='^/{}$'.format(name)),  # the daemon matches names by regex
             name=name
         )
     
@@ -312,23 +624,48 @@ class SwarmCaptain(Captain):
     def watch_cont(self, container: DockerContainer):
         
         try:
-            while container.is_running():
-                time.sleep(1)
+            self.docker_api.wait(container.get_id(), timeout=None)  # returns as soon as the container stops
+        except DockerAPIError as e:  # already gone
+            self.LOG.debug(repr(e))
         except (KeyboardInterrupt, InterruptedError):
             self.interrupted = True
     
-    def wait_for_net(self):
+    def wait_for_net(self, since: float = None):
         
-        for _ in range(self.timeout):
-            if self.find_net() is None:
-                time.sleep(1)
-            else:
-                break
-        else:
+        since = since or time.time()  # events are replayed from this moment, so none is missed
+        deadline = self.deadline()  # with no deadline, the events are followed until the network shows up
+        
+        if self.find_net() is not None:
+            return
+        
+        events = self.docker_api.events(
+            since=int(since),
+            until=None if deadline is None else int(deadline) + 1,
+            filters=dict(type='network', event='create'),
+            decode=True
+        )
+        
+        try:
+            for _ in events:
+                if self.find_net() is not None:
+                    return
+        finally:
+            events.close()
+        
+        if self.find_net() is None:
             raise NhaDockerError("Timed out waiting for Docker network")
     
+    def prepare_cluster(self):
+        
+        self.assert_network()
+    
     def assert_network(self):
         
+        with SwarmCaptain._network_lock:  # threads of the same command must not create two networks
+            self._assert_network()
+    
+    def _assert_network(self):
+        
         if self.find_net() is not None:
             return
         
@@ -342,8 +679,9 @@ class SwarmCaptain(Captain):
         
         self.LOG.info("Creating Docker network")
         self.LOG.debug(kwargs)
+        since = time.time()
         self.docker_api.create_network(**kwargs)
-        self.wait_for_net()
+        self.wait_for_net(since)
     
     def assert_vol(self, cargo: Cargo):
         
@@ -371,13 +709,23 @@ class SwarmCaptain(Captain):
         try:
             self.LOG.debug("Loading volume '{}'".format(cargo.name))
             mule = self.get_mule(cargo, mule_alias)
-            self.clear_mule(mule)
-            work_path = Workpath.get_tmp()
-            kwargs = dict(include_heavy_cargos=True) if isinstance(cargo, SharedCargo) else {}
-            cargo.deploy(work_path, **kwargs)
             
-            for file_name in os.listdir(work_path):
-                self.copy_to(src=work_path.join(file_name), dest=DockerConst.STG_MOUNT, cont=mule)
+            with self.mule_lease(mule), self.vol_claim(cargo, mule) as claimed:
+                if not claimed:
+                    self.LOG.info("Reusing shared volume '{}'".format(cargo.name))
+                    return False
+                
+                self.clear_mule(mule)
+                work_path = Workpath.get_tmp()
+                kwargs = dict(
+                    include_heavy_cargos=True,
+                    max_workers=self.compass.vol_concurrency
+                ) if isinstance(cargo, SharedCargo) else {}
+                cargo.deploy(work_path, **kwargs)
+                self.put_dir(src=work_path, dest=DockerConst.STG_MOUNT, cont=mule)
+                
+                if cargo.cached:
+                    mule.execute(['touch', os.path.join(DockerConst.STG_MOUNT, DockerConst.VOL_SEAL)])
         
         except Exception as e:
             error = e
@@ -386,39 +734,78 @@ class SwarmCaptain(Captain):
         finally:
             if work_path is not None:
                 work_path.dispose()
-            if mule is not None:
+            if mule is not None and (error is not None or not self.pools_mules):
                 self.rm_cont(mule)
             if error is not None:
                 self.rm_vol(cargo, ignore=True)
                 raise error
     
+    def pooled_mule_name(self, cargo: Cargo):
+        
+        return self.mule_name('{}-{}'.format(DockerConst.MULE_POOL, cargo.name))
+    
     def get_mule(self, cargo: Cargo, mule_alias: str = None):
         
+        if self.pools_mules:  # one warm mule per volume, reused by later commands
+            name = self.pooled_mule_name(cargo)
+            existing = self.find_cont(name)
+            
+            if existing is not None:
+                try:
+                    self.touch_mule(existing)
+                except (ConuException, DockerAPIError) as e:  # it has just quit
+                    self.LOG.debug(repr(e))
+                    self.rm_cont(existing)
+                else:
+                    self.LOG.debug("Reusing auxiliary container '{}'".format(name))
+                    return existing
+        else:  # volumes are loaded concurrently, so each one has its own mule
+            name = self.mule_name(None if mule_alias is None else '{}-{}'.format(mule_alias, cargo.name))
+        
         repo, tag = DockerConst.MULE_IMG.split(':')
         image = self.docker_backend.ImageClass(repo, tag=tag)
-        name = self.mule_name(mule_alias)
         
         kwargs = dict(
-            additional_opts=self.conu_name(name),
-            command=DockerConst.MULE_CMD,
+            additional_opts=self.conu_name(name) + (['--rm'] if self.pools_mules else []),
+            command=self.mule_cmd,
             volumes=[(cargo.name, DockerConst.STG_MOUNT, 'rw')]
         )
         
         return image.run_via_binary(**kwargs)
     
-    def clear_mule(self, mule: DockerContainer):
+    def touch_mule(self, mule: DockerContainer):
         
-        ls_output = mule.execute('ls {}'.format(DockerConst.STG_MOUNT))
+        mule.execute(['touch', DockerConst.MULE_CLOCK])
+    
+    def run_claim_script(self, cargo: Cargo, mule: DockerContainer, script: str, **kwargs):
         
-        if not ls_output:
-            return
+        cmd = self.vol_claim_scripts(DockerConst.STG_MOUNT)[script].format(**kwargs)
+        exec_id = self.docker_api.exec_create(mule.get_id(), ['sh', '-c', cmd])
+        return self.docker_api.exec_start(exec_id).decode(Encoding.UTF_8)
+    
+    def list_cached_vols(self):
+        
+        vols = self.docker_api.volumes(filters=dict(name=DockerConst.CACHED_VOL)).get('Volumes') or []
+        return [vol['Name'] for vol in vols if vol['Name'].startswith(DockerConst.CACHED_VOL)]
+    
+    def count_vol_refs(self, vol_name: str):
+        
+        mule = '/' + self.mule_name('{}-{}'.format(DockerConst.MULE_POOL, vol_name))
+        conts = self.docker_api.containers(all=True, filters=dict(volume=vol_name))
+        return len([cont for cont in conts if mule not in (cont.get('Names') or [])])
+    
+    def clear_mule(self, mule: DockerContainer):
         
-        for file_name in ls_output[0].strip().decode('utf-8').split('\n'):
-            mule.execute('rm -rf {}/{}'.format(DockerConst.STG_MOUNT, file_name))
+        # the claim of a shared volume is kept, since it belongs to the command that is loading it
+        mule.execute(['find', DockerConst.STG_MOUNT, '-mindepth', '1', '-maxdepth', '1',
+                      '!', '-name', DockerConst.VOL_CLAIM, '-exec', 'rm', '-rf', '{}', '+'])
     
-    def copy_to(self, src: str, dest: str, cont: DockerContainer):
+    def put_dir(self, src: str, dest: str, cont: DockerContainer):
         
-        cont.copy_to(src=src, dest=dest)
+        """Copies the contents of a directory into a container as a single tar stream, packed on the fly"""
+        
+        with self.pack_dir(src) as pipe:
+            self.docker_api.put_archive(cont.get_id(), dest, pipe)
     
     def _exec_in_cont(self, cont: DockerContainer, cmd: str):
         
@@ -526,6 +913,107 @@ class SwarmCaptain(Captain):
             return None
 
 
+class KubeInformer(object):
+    
+    """Local copy of the objects of one kind in a namespace, kept up to date by a watch
+    
+    Lookups are served from memory once the first listing arrives. Before that, the informer reports
+    itself as not synced and callers are expected to query the API directly. If a label selector is given,
+    only the objects that match it are listed and watched.
+    """
+    
+    WATCH_TIMEOUT = 300  # seconds before a watch is renewed from the last seen version
+    
+    def __init__(self, list_method, namespace: str, log, label_selector: str = None):
+        
+        self.list_method = list_method
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.LOG = log
+        self.objects = {}
+        self.lock = Lock()
+        self.synced = Event()
+        self.stopped = Event()
+        self.thread = None
+    
+    def start(self):
+        
+        with self.lock:
+            if self.thread is None:
+                self.thread = Thread(target=self._run, daemon=True)
+                self.thread.start()
+    
+    def stop(self):
+        
+        self.stopped.set()
+    
+    def get(self, name: str):
+        
+        with self.lock:
+            return self.objects.get(name)
+    
+    def values(self):
+        
+        with self.lock:
+            return list(self.objects.values())
+    
+    def put(self, obj):
+        
+        """Records an object written by this process, before its event arrives"""
+        
+        with self.lock:
+            self.objects[obj.metadata.name] = obj
+    
+    def _relist(self):
+        
+        listing = self.list_method(self.namespace, label_selector=self.label_selector)
+        
+        with self.lock:
+            self.objects = {obj.metadata.name: obj for obj in listing.items}
+        
+        self.synced.set()
+        return listing.metadata.resource_version
+    
+    def _apply(self, event: dict):
+        
+        obj = event['object']
+        
+        with self.lock:
+            if event['type'] == 'DELETED':
+                self.objects.pop(obj.metadata.name, None)
+            else:
+                self.objects[obj.metadata.name] = obj
+        
+        return obj.metadata.resource_version
+    
+    def _run(self):
+        
+        version = None
+        
+        while not self.stopped.is_set():
+            watch = k8s_watch.Watch()
+            
+            try:
+                version = version or self._relist()
+                
+                for event in watch.stream(self.list_method, self.namespace, resource_version=version,
+                                          label_selector=self.label_selector, timeout_seconds=self.WATCH_TIMEOUT):
+                    if self.stopped.is_set():
+                        break
+                    elif event['type'] == 'ERROR':  # the version expired, so the next round starts over
+                        version = None
+                        break
+                    
+                    version = self._apply(event)
+            except (K8sApiException, Urllib3Error) as e:
+                self.LOG.debug(repr(e))
+                self.synced.clear()
+                version = None
+                self.stopped.wait(1)
+            finally:
+                watch.stop()
+
+
 class KubeCaptain(Captain):
     
     compass_cls = KubeCompass
@@ -538,14 +1026,22 @@ class KubeCaptain(Captain):
         self.nfs = self.compass.get_nfs_server()
         self.stg_cls = self.compass.get_stg_cls(section)
         self.mule = None
-        self.assert_namespace()
+        self.mule_lock = Lock()  # volumes are loaded concurrently, but share a single mule
         k8s_config.load_kube_config()
         self.api_client = k8s_client.ApiClient()
+        self.core_api = k8s_client.CoreV1Api(self.api_client)
+        self.apps_api = k8s_client.AppsV1Api(self.api_client)
+        self.batch_api = k8s_client.BatchV1Api(self.api_client)
+        self.scaling_api = k8s_client.AutoscalingV1Api(self.api_client)
+        self.exec_apis = local()  # one client for exec sessions per thread, see _exec_api
+        self.informers = {}
+        self.informers_lock = Lock()
+        self.assert_namespace()
         self.svc_type = self.compass.get_svc_type(self.resources)
     
     def run(self, img: ImageSpec, env_vars, mounts, cargos, ports, cmd: list, name: str, foreground=False, is_job=False):
         
-        [self.load_vol(v, name) for v in cargos]
+        self.load_vols(cargos, name)
         self.make_name_available(name)
         vol_refs, vol_defs = self.kube_vols(cargos)
         mount_refs, mount_defs = self.kube_mounts(mounts)
@@ -571,11 +1067,11 @@ class KubeCaptain(Captain):
         
         if is_job:
             self.LOG.info("Creating Job '{}'".format(name))
-            pod = self.create_job(name, cont_spec)
+            pod = self.create_job(name, cont_spec, labels=self.kube_labels(name, cargos))
         
         else:
             self.LOG.info("Creating Pod '{}'".format(name))
-            pod = self.create_pod(name, cont_spec)
+            pod = self.create_pod(name, cont_spec, labels=self.kube_labels(name, cargos))
         
         self.handle_svc(name, port_defs)
         self.wait_for_pod(pod)
@@ -588,7 +1084,6 @@ class KubeCaptain(Captain):
     def deploy(self, img: ImageSpec, env_vars, mounts, cargos, ports, cmd: list, name: str, tasks: int = 1,
                allow_probe=False, delay_readiness: int = 0):
         
-        [self.load_vol(v, name) for v in cargos]
         vol_refs, vol_defs = self.kube_vols(cargos)
         mount_refs, mount_defs = self.kube_mounts(mounts)
         port_refs, port_defs = self.kube_svc_ports(name, ports)
@@ -615,8 +1110,8 @@ class KubeCaptain(Captain):
                 selector={'matchLabels': {'app': name}},
                 template=dict(
                     metadata={
-                        'labels': {'app': name},
-                        'annotations': {'updated': datetime.now().strftime(DateFmt.READABLE)}
+                        'labels': self.kube_labels(name, cargos),
+                        'annotations': self.kube_annotations(img, cargos)
                     },
                     spec={
                         'containers': [container],
@@ -627,48 +1122,57 @@ class KubeCaptain(Captain):
             )
         ))
 
-        if self.find_depl(name) is None:
+        spec_hash = self.spec_hash(template)
+        template['metadata']['annotations'] = {KubeConst.SPEC_HASH: spec_hash}
+        current = self.find_depl(name)
+        
+        if current is None:
+            self.load_vols(cargos, name)
             self.LOG.info("Creating deployment '{}'".format(name))
             self.LOG.debug(template)
             yaml = Kaptan().import_config(template).export(handler='yaml')
             depl = Deployment(namespace=self.namespace, create_in_cluster=True, from_template=yaml)
-        else:
+        elif (current.metadata.annotations or {}).get(KubeConst.SPEC_HASH) == spec_hash:
+            self.LOG.info("Skipping update of deployment '{}' since no changes were made".format(name))
+            depl = current
+        else:  # pods are only replaced if their template changed (e.g.: image, volumes, env or resources)
+            self.load_vols(cargos, name)
             self.LOG.info("Updating deployment '{}'".format(name))
             self.LOG.debug(template)
-            with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-                k8s_backend.apps_api.replace_namespaced_deployment(name, self.namespace, template)
-            depl = self.find_depl(name)
+            depl = self.apps_api.replace_namespaced_deployment(name, self.namespace, template)
+            self.informer('deployments').put(depl)
         
         self.handle_svc(name, port_defs)
         self.handle_autoscaler(name)
 
         return depl
 
-    def create_pod(self, name: str, cont_spec: dict) -> Pod:
+    def create_pod(self, name: str, cont_spec: dict, labels: dict = None) -> Pod:
         
         template = self.cleaner(dict(
             apiVersion="v1",
             kind="Pod",
-            metadata=dict(name=name, labels={'app': name}),
+            metadata=dict(name=name, labels=labels or {'app': name}),
             spec=cont_spec
         ))
         self.LOG.debug(template)
         
         return Pod(namespace=self.namespace, from_template=template)
     
-    def create_job(self, name: str, cont_spec: dict) -> Pod:
+    def create_job(self, name: str, cont_spec: dict, labels: dict = None) -> Pod:
         
+        labels = labels or {'app': name}
         template = self.cleaner(dict(
             apiVersion="batch/v1",
             kind="Job",
-            metadata=dict(name=name, labels={'app': name}),
+            metadata=dict(name=name, labels=labels),
             spec=dict(
                 backoffLimit=0,
-                template=dict(spec=cont_spec))
+                template=dict(metadata=dict(labels=labels), spec=cont_spec))
         ))
         self.LOG.debug(template)
         
-        _ = k8s_client.BatchV1Api(self.api_client).create_namespaced_job(namespace=self.namespace, body=template)
+        _ = self.batch_api.create_namespaced_job(namespace=self.namespace, body=template)
         pod_name = self.find_pod_from_job(name).metadata.name
         
         return Pod(namespace=self.namespace, name=pod_name)
@@ -686,21 +1190,18 @@ class KubeCaptain(Captain):
     
     def rm_vol(self, cargo: Cargo, ignore=False):
         
-        if isinstance(cargo, MappedCargo):
+        if isinstance(cargo, MappedCargo) or cargo.cached:  # shared volumes are only removed when unused
             return False
         elif isinstance(cargo, EmptyCargo):  # PVC
-            with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-                k8s_backend.core_api.delete_namespaced_persistent_volume_claim(cargo.name, self.namespace)
+            self.core_api.delete_namespaced_persistent_volume_claim(cargo.name, self.namespace)
             return True
         
-        if self.mule is None:
-            if ignore:
-                self.LOG.warn("Missing auxiliary Pod for deletion of volume '{}'".format(cargo.name))
-                return False
-            else:
-                self.prepare_mule(cargo.name)
+        if self.mule is None and ignore and not self.pools_mules:
+            self.LOG.warn("Missing auxiliary Pod for deletion of volume '{}'".format(cargo.name))
+            return False
         
         try:
+            self.prepare_mule(cargo.name)
             vol_path = os.path.join(DockerConst.STG_MOUNT, cargo.name)
             self._exec_in_pod(self.mule, 'rm -rf {}'.format(vol_path))
             return True
@@ -714,10 +1215,10 @@ class KubeCaptain(Captain):
     def rm_job(self, name: str, ignore=True):
         
         try:
-            k8s_client.BatchV1Api(self.api_client).delete_namespaced_job(namespace=self.namespace,
-                                                                         name=name,
-                                                                         grace_period_seconds=0,
-                                                                         propagation_policy="Background")
+            self.batch_api.delete_namespaced_job(namespace=self.namespace,
+                                                 name=name,
+                                                 grace_period_seconds=0,
+                                                 propagation_policy="Background")
         except Exception as e:
             self.LOG.debug("Could not delete Job: {}".format(name))
             if ignore:
@@ -728,9 +1229,9 @@ class KubeCaptain(Captain):
     def rm_pod(self, name: str, ignore=True):
         
         try:
-            k8s_client.CoreV1Api(self.api_client).delete_namespaced_pod(namespace=self.namespace,
-                                                                        name=name,
-                                                                        grace_period_seconds=0)
+            self.core_api.delete_namespaced_pod(namespace=self.namespace,
+                                                name=name,
+                                                grace_period_seconds=0)
         except Exception as e:
             self.LOG.debug("Could not delete Pod: {}".format(name))
             if ignore:
@@ -742,11 +1243,9 @@ class KubeCaptain(Captain):
     def rm_depl(self, name: str, ignore=True):
         
         try:
-            with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-                k8s_backend.apps_api.delete_namespaced_deployment(
-                    name=name, namespace=self.namespace, grace_period_seconds=0)
+            self.apps_api.delete_namespaced_deployment(name=name, namespace=self.namespace, grace_period_seconds=0)
         except (ConuException, K8sApiException) as e:
-            msg = "Waiting up to {} seconds to kill Deployment '{}'".format(self.timeout, name)
+            msg = self.waiting_msg("to kill Deployment '{}'".format(name))
             raise PatientError(wait_callback=lambda: self.LOG.info(msg), original_exception=e)
         except Exception as e:
             self.LOG.info("Could not patiently delete Deployment: {}".format(name))
@@ -758,9 +1257,7 @@ class KubeCaptain(Captain):
     def rm_svc(self, name: str, ignore=True):
         
         try:
-            with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-                k8s_backend.core_api.delete_namespaced_service(
-                    name=name, namespace=self.namespace, grace_period_seconds=0)
+            self.core_api.delete_namespaced_service(name=name, namespace=self.namespace, grace_period_seconds=0)
         except Exception as e:
             self.LOG.debug("Could not delete service: {}".format(name))
             if ignore:
@@ -773,98 +1270,97 @@ class KubeCaptain(Captain):
         
         selector = "job-name={}".format(job_name)
         
-        try:        
-            with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-                pod = k8s_backend.core_api.list_namespaced_pod(namespace=self.namespace,
-                                                                label_selector=selector
-                                                                ).items[0]
+        try:
+            pod = self.core_api.list_namespaced_pod(namespace=self.namespace, label_selector=selector).items[0]
         except (ConuException, K8sApiException, IndexError) as e:
-            msg = "Waiting up to {} seconds to find pod from job: '{}'".format(self.timeout, job_name)
+            msg = self.waiting_msg("to find pod from job: '{}'".format(job_name))
             raise PatientError(wait_callback=lambda: self.LOG.info(msg), original_exception=e)
         
         return pod
     
     def close(self):
         
-        if self.mule is not None:
+        if self.mule is not None and not self.pools_mules:
             self.rm_pod(self.mule.name)
+        
+        for informer in self.informers.values():
+            informer.stop()
     
-    def list_cont_or_pod_ids(self):
-
-        with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-            lyst = [pod.metadata.name for pod in
-                    k8s_backend.core_api.list_namespaced_pod(namespace=self.namespace).items]
+    def _snapshot_task_ids(self):
+        
+        informer, snapshot = self.informer('pods'), {}
         
-        return lyst
+        if informer.synced.is_set():
+            pods = informer.values()
+        else:
+            pods = informer.list_method(self.namespace, label_selector=informer.label_selector).items
+        
+        for pod in pods:
+            snapshot.setdefault((pod.metadata.labels or {}).get('app'), set()).add(pod.metadata.name)
+        
+        return snapshot
+    
+    def informer(self, what: str) -> KubeInformer:
+        
+        with self.informers_lock:
+            if what not in self.informers:
+                list_method = {
+                    'pods': self.core_api.list_namespaced_pod,
+                    'deployments': self.apps_api.list_namespaced_deployment,
+                    'services': self.core_api.list_namespaced_service,
+                    'persistent volume claims': self.core_api.list_namespaced_persistent_volume_claim
+                }[what]
+                self.informers[what] = KubeInformer(
+                    list_method, self.namespace, self.LOG,
+                    label_selector='app' if what == 'pods' else None  # only the pods created by the framework
+                )
+                self.informers[what].start()
+            
+            return self.informers[what]
     
     @patient
-    def _find_sth(self, what, name, method, **kwargs):
+    def _find_sth(self, what, name, fresh=False, **kwargs):
         
-        try:
+        informer = self.informer(what)
+        
+        if informer.synced.is_set() and not fresh:
+            return informer.get(name)
+        
+        try:  # the cache is not filled yet, so only the named object is fetched
             return super()._find_sth(
                 what=what,
                 name=name,
-                method=lambda: method(self.namespace).items,
-                key=lambda i: i.metadata.name == name
+                method=lambda: informer.list_method(
+                    self.namespace, field_selector='metadata.name={}'.format(name)).items,
+                key=lambda _: True
             )
         except (ConuException, K8sApiException) as e:
-            msg = "Waiting up to {} seconds to find {} '{}'".format(self.timeout, what, name)
+            msg = self.waiting_msg("to find {} '{}'".format(what, name))
             raise PatientError(wait_callback=lambda: self.LOG.info(msg), original_exception=e)
     
     def find_vol(self, cargo: Cargo):
-
-        with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-            result = self._find_sth(
-                what='persistent volume claims',
-                method=k8s_backend.core_api.list_namespaced_persistent_volume_claim,
-                name=cargo.name
-            )
         
-        return result
+        return self._find_sth(what='persistent volume claims', name=cargo.name)
     
-    @patient
-    def find_pod(self, name):
+    def find_pod(self, name, fresh=False):
         
-        try:
-            with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-                result = super()._find_sth(
-                    what='pods',
-                    method=k8s_backend.list_pods,
-                    name=name,
-                    namespace=self.namespace
-                )
-
-            return result
-        except (ConuException, K8sApiException) as e:
-            msg = "Waiting up to {} seconds to find {} '{}'".format(self.timeout, 'pod', name)
-            raise PatientError(wait_callback=lambda: self.LOG.info(msg), original_exception=e)
+        if self._find_sth(what='pods', name=name, fresh=fresh) is None:
+            return None
+        else:
+            return Pod(namespace=self.namespace, name=name)
     
     def find_depl(self, name):
-
-        with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-            result = self._find_sth(
-                what='deployments',
-                method=k8s_backend.apps_api.list_namespaced_deployment,
-                name=name
-            )
         
-        return result
+        return self._find_sth(what='deployments', name=name)
     
     def find_svc(self, name):
-
-        with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-            result = self._find_sth(
-                what='services',
-                method=k8s_backend.core_api.list_namespaced_service,
-                name=name
-            )
         
-        return result
+        return self._find_sth(what='services', name=name)
 
     def find_autoscaler(self, name: str):
 
-        api_response = k8s_client.AutoscalingV1Api(self.api_client). \
-            list_namespaced_horizontal_pod_autoscaler(namespace=self.namespace).to_dict()
+        api_response = self.scaling_api.list_namespaced_horizontal_pod_autoscaler(
+            namespace=self.namespace, field_selector='metadata.name={}'.format(name)).to_dict()
 
         for i in api_response.get('items', []):
             if i.get('metadata', {}).get('name', '') == name:
@@ -876,13 +1372,6 @@ class KubeCaptain(Captain):
 
         if self.resources and self.resources.get('auto_scale', False):
 
-            if self.find_autoscaler(name):
-                self.LOG.debug('Removing old autoscaler: {}'.format(name))
-                k8s_client.AutoscalingV1Api(self.api_client). \
-                    delete_namespaced_horizontal_pod_autoscaler(name=name, namespace=self.namespace)
-
-            self.LOG.info("Creating horizontal Pod autoscaler")
-
             template = dict(
                 apiVersion='autoscaling/v1',
                 kind='HorizontalPodAutoscaler',
@@ -900,8 +1389,27 @@ class KubeCaptain(Captain):
                 )
             )
 
+            current = self.find_autoscaler(name)
+            current_spec = (current or {}).get('spec') or {}
+            desired_spec = dict(
+                min_replicas=template['spec']['minReplicas'],
+                max_replicas=template['spec']['maxReplicas'],
+                target_cpu_utilization_percentage=template['spec']['targetCPUUtilizationPercentage']
+            )
+            
+            if current is not None and all(current_spec.get(key) == val for key, val in desired_spec.items()):
+                self.LOG.debug("Skipping update of autoscaler '{}' since no changes were made".format(name))
+                return
+            
             try:
-                k8s_utils.create_from_dict(self.api_client, template)
+                if current is None:
+                    self.LOG.info("Creating horizontal Pod autoscaler")
+                    k8s_utils.create_from_dict(self.api_client, template)
+                else:  # patched in place, instead of being removed and created again
+                    self.LOG.info("Updating horizontal Pod autoscaler")
+                    self.scaling_api.patch_namespaced_horizontal_pod_autoscaler(
+                        name, self.namespace, {'spec': template['spec']})
+                
                 self.LOG.debug(template)
             except Exception as e:
                 self.LOG.debug("Failed to create autoscaler: {}".format(name))
@@ -920,7 +1428,7 @@ class KubeCaptain(Captain):
 
         w = k8s_watch.Watch()
         try:
-            for line in w.stream(k8s_client.CoreV1Api(self.api_client).read_namespaced_pod_log,
+            for line in w.stream(self.core_api.read_namespaced_pod_log,
                                  namespace=self.namespace,
                                  name=pod.name,
                                  container=cont_name,
@@ -935,36 +1443,91 @@ class KubeCaptain(Captain):
         
         return True
     
-    @patient
+    @staticmethod
+    def _pod_is_ready(pod: k8s_client.V1Pod):
+        
+        if pod is None:
+            return False
+        elif pod.status.phase in KubeConst.Phase.END_PHASES:
+            raise NhaDockerError("Pod '{}' has already stopped ({})".format(pod.metadata.name, pod.status.phase))
+        
+        return pod.status.phase == KubeConst.Phase.RUNNING and any(
+            cond.type == 'Ready' and cond.status == 'True'
+            for cond in pod.status.conditions or []
+        )
+    
+    def watch_pod_state(self, name: str, condition, on_wait=None):
+        
+        """Follows the events of a pod until the condition holds for it, or the timeout is exceeded
+        
+        The condition receives the pod, or None if it does not exist. It is checked at least once,
+        even with a timeout of zero, and indefinitely if there is no timeout
+        """
+        
+        api = self.core_api
+        selector = 'metadata.name={}'.format(name)
+        deadline = self.deadline()
+        intervals = self.backoff(deadline)
+        
+        while True:
+            watch = k8s_watch.Watch()
+            
+            try:
+                pods = api.list_namespaced_pod(self.namespace, field_selector=selector)
+                
+                if condition(pods.items[0] if pods.items else None):
+                    return True
+                elif on_wait is not None:
+                    on_wait()
+                    on_wait = None
+                
+                # the watch resumes from the listing, so no change in between is missed
+                for event in watch.stream(
+                        api.list_namespaced_pod, self.namespace, field_selector=selector,
+                        resource_version=pods.metadata.resource_version,
+                        timeout_seconds=KubeInformer.WATCH_TIMEOUT if deadline is None
+                        else max(int(deadline - time.time()), 1)):
+                    if condition(None if event['type'] == 'DELETED' else event['object']):
+                        return True
+            except (K8sApiException, Urllib3Error) as e:  # including expired resource versions
+                self.LOG.debug(repr(e))
+                interval = next(intervals, None)
+                
+                if interval is None:
+                    return False
+                
+                time.sleep(interval)
+            finally:
+                watch.stop()
+            
+            if deadline is not None and time.time() >= deadline:
+                return False
+    
     def wait_for_pod(self, pod: Pod):
         
-        try:
-            if pod.get_phase() == PodPhase.RUNNING and pod.is_ready():
-                return
-            else:
-                raise NhaDockerError("Timed out waiting for pod '{}'".format(pod.name))
-        except (ConuException, K8sApiException, NhaDockerError) as e:
-            msg = "Waiting up to {} seconds for pod '{}' to start".format(self.timeout, pod.name)
-            raise PatientError(wait_callback=lambda: self.LOG.info(msg), original_exception=e)
+        msg = self.waiting_msg("for pod '{}' to start".format(pod.name))
+        
+        if not self.watch_pod_state(pod.name, self._pod_is_ready, on_wait=lambda: self.LOG.info(msg)):
+            raise NhaDockerError("Timed out waiting for pod '{}'".format(pod.name))
     
     @patient
     def assert_namespace(self):
         
         try:
-            with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-                assert super()._find_sth(
-                    what='namespaces',
-                    name=self.namespace,
-                    method=lambda: k8s_backend.core_api.list_namespace().items,
-                    key=lambda i: i.metadata.name == self.namespace
-                ) is not None, ConfigurationError("Namespace '{}' does not exist".format(self.namespace))
+            assert super()._find_sth(
+                what='namespaces',
+                name=self.namespace,
+                method=lambda: self.core_api.list_namespace(
+                    field_selector='metadata.name={}'.format(self.namespace)).items,
+                key=lambda _: True
+            ) is not None, ConfigurationError("Namespace '{}' does not exist".format(self.namespace))
         except (ConuException, K8sApiException) as e:
-            msg = "Waiting up to {} seconds to find {} '{}'".format(self.timeout, 'namespace', self.namespace)
+            msg = self.waiting_msg("to find {} '{}'".format('namespace', self.namespace))
             raise PatientError(wait_callback=lambda: self.LOG.info(msg), original_exception=e)
     
     def assert_vol(self, cargo: Cargo):
         
-        storage = '{}Gi'.format(max(int(cargo.require_mb/1024), 1))
+        storage = '{}Mi'.format(max(int(cargo.require_mb), 1))
         
         template = dict(
             apiVersion="v1",
@@ -980,8 +1543,8 @@ class KubeCaptain(Captain):
         if self.find_vol(cargo) is None:
             self.LOG.info("Creating persistent volume claim '{}'".format(cargo.name))
             self.LOG.debug(template)
-            with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-                k8s_backend.core_api.create_namespaced_persistent_volume_claim(self.namespace, template)
+            pvc = self.core_api.create_namespaced_persistent_volume_claim(self.namespace, template)
+            self.informer('persistent volume claims').put(pvc)
             return True
         else:
             return False
@@ -1021,8 +1584,7 @@ class KubeCaptain(Captain):
         
         self.LOG.info("Creating service '{}'".format(name))
         self.LOG.debug(svc)
-        with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-            k8s_backend.core_api.create_namespaced_service(self.namespace, svc)
+        self.informer('services').put(self.core_api.create_namespaced_service(self.namespace, svc))
     
     def load_vol(self, cargo: Cargo, mule_alias: str = None):
         
@@ -1038,19 +1600,25 @@ class KubeCaptain(Captain):
         try:
             self.prepare_mule(mule_alias)
             self.LOG.debug("Creating volume '{}'".format(cargo.name))
-            self.clear_mule(self.mule, vol_path)
-            work_path = Workpath.get_tmp()
             
-            if not isinstance(cargo, HeavyCargo):
-                cargo.deploy(work_path)
+            with self.mule_lease(self.mule), self.vol_claim(cargo, self.mule) as claimed:
+                if not claimed:
+                    self.LOG.info("Reusing shared volume '{}'".format(cargo.name))
+                    return
+                elif cargo.cached:  # downloads that were interrupted are resumed
+                    self._exec_in_pod(self.mule, ['mkdir', '-p', vol_path])
+                elif isinstance(cargo, HeavyCargo):
+                    self.clear_mule(self.mule, vol_path)
+                else:
+                    work_path = Workpath.get_tmp()
+                    cargo.deploy(work_path)
+                    self.put_dir(src=work_path, dest=vol_path, pod=self.mule, clear=True)
                 
-                for file_name in os.listdir(work_path):
-                    self.copy_to(src=work_path.join(file_name), dest=vol_path, pod=self.mule)
-            
-            if isinstance(cargo, (HeavyCargo, SharedCargo)):
-                for msg, cmd in cargo.get_deployables(vol_path):
-                    self.LOG.info(msg)
-                    self._exec_in_pod(self.mule, cmd)
+                if isinstance(cargo, (HeavyCargo, SharedCargo)):
+                    self.download_in_pod(self.mule, cargo, vol_path)
+                
+                if cargo.cached:
+                    self._exec_in_pod(self.mule, ['touch', os.path.join(vol_path, DockerConst.VOL_SEAL)])
         
         except Exception as e:
             self.rm_vol(cargo, ignore=True)
@@ -1059,19 +1627,101 @@ class KubeCaptain(Captain):
             if work_path is not None:
                 work_path.dispose()
     
+    def run_claim_script(self, cargo: Cargo, mule: Pod, script: str, **kwargs):
+        
+        vol_path = os.path.join(DockerConst.STG_MOUNT, cargo.name)
+        return self._exec_in_pod(mule, self.vol_claim_scripts(vol_path)[script].format(**kwargs))
+    
+    def list_cached_vols(self):
+        
+        self.prepare_mule()
+        
+        with self.mule_lease(self.mule):
+            names = self._exec_in_pod(self.mule, ['ls', '-1', DockerConst.STG_MOUNT]).split()
+        
+        return [name for name in names if name.startswith(DockerConst.CACHED_VOL)]
+    
+    def count_vol_refs(self, vol_name: str):
+        
+        informer = self.informer('pods')
+        
+        if informer.synced.is_set():
+            return len([pod for pod in informer.values() if vol_name in (pod.metadata.labels or {})])
+        else:
+            return len(self.core_api.list_namespaced_pod(self.namespace, label_selector=vol_name).items)
+    
+    def kube_annotations(self, img: ImageSpec, cargos: List[Cargo]):
+        
+        # volume contents and rebuilt images are not part of the spec, but pods must be replaced when they change
+        return self.cleaner({
+            KubeConst.CONTENTS_HASH: self.spec_hash([cargo.fingerprint for cargo in cargos]),
+            KubeConst.IMAGE_ID: img.image_id
+        })
+    
+    @staticmethod
+    def spec_hash(spec):
+        
+        return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()[:32]
+    
+    def kube_labels(self, name: str, cargos: List[Cargo]):
+        
+        labels = {'app': name}
+        labels.update({cargo.name: 'true' for cargo in cargos if cargo.cached})  # counts the users of shared volumes
+        return labels
+    
+    def download_in_pod(self, pod: Pod, cargo: Cargo, vol_path: str):
+        
+        compass = FSWarehouseCompass()
+        plan = cargo.add_to_download_plan(
+            DownloadPlan(concurrency=compass.download_concurrency, retries=compass.retries),
+            vol_path
+        )
+        
+        if len(plan) == 0:
+            return
+        
+        self.LOG.info("Downloading {} file(s) or archive(s) into volume '{}'".format(len(plan), cargo.name))
+        output = plan.check(self._exec_script(pod, plan.render()))
+        
+        for line in output.split('\n'):
+            self.LOG.info(line)
+    
     def prepare_mule(self, mule_alias: str = None):
         
-        if self.mule is not None:
+        with self.mule_lock:
+            return self._prepare_mule(mule_alias)
+    
+    def _prepare_mule(self, mule_alias: str = None):
+        
+        if self.mule is not None and not self.pools_mules:
             return self.mule
         
-        name = self.mule_name(mule_alias)
-        self.make_name_available(name)
+        if self.pools_mules:  # a single warm mule per namespace, reused by later commands
+            name = self.mule_name(DockerConst.MULE_POOL)
+            self.mule = self.mule or self.find_pod(name)
+            
+            if self.mule is not None:
+                try:
+                    if self.mule.get_phase() == PodPhase.PENDING:  # just created by another command
+                        self.wait_for_pod(self.mule)
+                    
+                    self.touch_mule(self.mule)
+                except (ConuException, K8sApiException, NhaDockerError) as e:  # it has quit after being idle
+                    self.LOG.debug(repr(e))
+                    self.rm_pod(name)
+                    self.wait_for_pod_removal(name)
+                else:
+                    return self.mule
+        else:
+            name = self.mule_name(mule_alias)
+            self.make_name_available(name)
+        
         vol_refs, vol_defs = self.mule_mount(name)
         
         container = dict(
             name=name,
             image=DockerConst.MULE_IMG,
-            command=DockerConst.MULE_CMD,
+            command=self.mule_cmd,
             volumeMounts=vol_refs
         )
         
@@ -1081,58 +1731,135 @@ class KubeCaptain(Captain):
             metadata=dict(name=name, labels={'app': name}),
             spec={
                 'containers': [container],
-                'volumes': vol_defs
+                'volumes': vol_defs,
+                'restartPolicy': 'Never' if self.pools_mules else 'Always'
             }
         )
         
         self.LOG.debug("Creating auxiliar Pod '{}' for handling volumes".format(name))
         self.LOG.debug(template)
         
-        self.mule = Pod(namespace=self.namespace, from_template=template)
+        try:
+            self.mule = Pod(namespace=self.namespace, from_template=template)
+        except (ConuException, K8sApiException) as e:
+            self.mule = self.find_pod(name, fresh=True) if self.pools_mules else None  # another command created it
+            
+            if self.mule is None:
+                raise e
+        
         self.wait_for_pod(self.mule)
+        return self.mule
+    
+    def touch_mule(self, mule: Pod):
+        
+        self._exec_in_pod(mule, ['touch', DockerConst.MULE_CLOCK])
+    
+    def wait_for_pod_removal(self, name: str):
+        
+        msg = self.waiting_msg("for removal of pod '{}'".format(name))
+        
+        if not self.watch_pod_state(name, lambda p: p is None, on_wait=lambda: self.LOG.info(msg)):
+            raise NhaDockerError("Timed out waiting for removal of pod '{}'".format(name))
+    
+    @staticmethod
+    def _clear_script(vol_path: str):
+        
+        return 'mkdir -p {0} && rm -rf {0}/* {0}/.[!.]* {0}/..?*'.format(vol_path)
     
     def clear_mule(self, mule: Pod, vol_path: str):
         
-        self._exec_in_pod(mule, 'mkdir -p {}'.format(vol_path))
-        ls_output = self._exec_in_pod(mule, 'ls {}'.format(vol_path)).strip()
+        self._exec_in_pod(mule, ['sh', '-c', self._clear_script(vol_path)])
+    
+    def put_dir(self, src: str, dest: str, pod: Pod, clear=False):
+        
+        """Streams the contents of a directory into a pod as a single tar archive, through one exec session"""
         
-        if not ls_output:
-            return
+        script = '{} && tar -xf - -C {}'.format(
+            self._clear_script(dest) if clear else 'mkdir -p {}'.format(dest),
+            dest
+        )
+        
+        session = stream(
+            self._exec_api().connect_get_namespaced_pod_exec,
+            name=pod.name, namespace=self.namespace, command=['sh', '-c', script], container=pod.name,
+            stderr=True, stdin=True, stdout=True, tty=False, _preload_content=False
+        )
         
-        for name in ls_output.split('\n'):
-            self._exec_in_pod(mule, 'rm -rf {}/{}'.format(vol_path, name))
+        try:
+            with self.pack_dir(src) as pipe:
+                for chunk in pipe:
+                    if not session.is_open():  # tar quits by itself once it reads the end of the archive
+                        break
+                    
+                    session.write_stdin(chunk)
+            
+            if hasattr(session, 'close_channel'):
+                session.close_channel(0)  # stdin
+            
+            session.run_forever(timeout=self.timeout)
+            
+            if session.is_open():
+                raise NhaDockerError("Timed out copying files into pod '{}'".format(pod.name))
+            elif session.returncode != 0:
+                raise NhaDockerError(
+                    "Failed to copy files into pod '{}': {}".format(pod.name, session.read_stderr(timeout=0).strip())
+                )
+        finally:
+            session.close()
     
-    def copy_to(self, src: str, dest: str, pod: Pod):
+    def _exec_api(self):
         
-        out, err = Popen(
-            'kubectl cp --namespace={namespace} {src} {pod}:{dest} --container={cont}'.format(
-                src=src,
-                dest=dest,
-                pod=pod.name,
-                namespace=self.namespace,
-                cont=pod.name
-            ).split(' '),
-            stdout=PIPE, stderr=PIPE
-        ).communicate()
+        # stream() swaps the request method of the api client it is given, so exec sessions must not share
+        # a client with calls that may run at the same time. Each thread reuses its own client and connection pool
+        api = getattr(self.exec_apis, 'core_api', None)
         
-        if err:
-            raise RuntimeError(assert_str(err).strip())
-        else:
-            return assert_str(out).strip()
+        if api is None:
+            api = self.exec_apis.core_api = k8s_client.CoreV1Api(k8s_client.ApiClient())
+        
+        return api
+    
+    def _exec_script(self, pod: Pod, script: str):
+        
+        """Runs a shell script that is written to the exec session's stdin, so it never shows up in a command line"""
+        
+        session = stream(
+            self._exec_api().connect_get_namespaced_pod_exec,
+            name=pod.name, namespace=self.namespace, command=['sh', '-s'], container=pod.name,
+            stderr=True, stdin=True, stdout=True, tty=False, _preload_content=False
+        )
+        output = []
+        
+        try:
+            session.write_stdin(script + '\nexit\n')  # sh quits even if the client cannot close stdin
+            
+            if hasattr(session, 'close_channel'):
+                session.close_channel(0)  # stdin
+            
+            while session.is_open():
+                session.update(timeout=1)
+                
+                if session.peek_stdout():
+                    output.append(session.read_stdout())
+                
+                if session.peek_stderr():
+                    output.append(session.read_stderr())
+            
+            output += [session.read_stdout(timeout=0) or '', session.read_stderr(timeout=0) or '']
+        finally:
+            session.close()
+        
+        return ''.join(output)
     
     def _exec_in_pod(self, pod: Pod, cmd, stderr=True, stdin=False, stdout=True, tty=False):
-
-        with K8sBackend(logging_level=logging.ERROR) as k8s_backend:
-            result = '\n'.join([
-                stream(
-                    k8s_backend.core_api.connect_get_namespaced_pod_exec,
-                    name=pod.name, namespace=self.namespace, command=c.strip().split(' '),
-                    stderr=stderr, stdin=stdin, stdout=stdout, tty=tty, container=pod.name
-                )
-                for c in Regex.CMD_DELIMITER.split(cmd)
-            ])
         
-        return result
+        if not isinstance(cmd, list):  # chained commands run as a single shell script, in a single session
+            cmd = ['sh', '-c', cmd]
+        
+        return stream(
+            self._exec_api().connect_get_namespaced_pod_exec,
+            name=pod.name, namespace=self.namespace, command=cmd,
+            stderr=stderr, stdin=stdin, stdout=stdout, tty=tty, container=pod.name
+        )
     
     def mule_mount(self, mule_name):
         
@@ -1186,10 +1913,11 @@ class KubeCaptain(Captain):
                     'path': nfs_path
                 })
             
-            refs.append(dict(
+            refs.append(self.cleaner(dict(
                 name=cargo.name,
-                mountPath=cargo.mount_to
-            ))
+                mountPath=cargo.mount_to,
+                readOnly=True if cargo.cached else None
+            )))
             
             defs.append(dict(
                 name=cargo.name,
@@ -1317,16 +2045,390 @@ class KubeCaptain(Captain):
         return False
 
 
+class LocalCaptain(Captain):
+    
+    """Runs each container as a process of the host, with volumes as plain directories and ports bound to the host
+    
+    The process sees the container's filesystem under a directory of its own, pointed by an environment variable.
+    The project's code is taken from the current working directory, instead of an image.
+    """
+    
+    compass_cls = LocalCompass
+    
+    def __init__(self, section: str, **kwargs):
+        
+        super().__init__(section, **kwargs)
+        self.vols_dir = os.path.join(self.compass.root_dir, 'volumes')
+        self.procs_dir = os.path.join(self.compass.root_dir, 'processes')
+    
+    def run(self, img: ImageSpec, env_vars, mounts, cargos, ports, cmd: list, name: str, foreground=False, is_job=False):
+        
+        self.make_name_available(name)
+        self.load_vols(cargos, name)
+        self.LOG.debug("Running '{}' as a local process, instead of image '{}'".format(name, img.target))
+        port_map = self.bind_ports(name, ports)
+        proc = self.start_task(name, name, env_vars, mounts, cargos, port_map, cmd, foreground=foreground)
+        
+        if foreground:
+            self.watch_proc(proc)
+        
+        return proc
+    
+    def deploy(self, img: ImageSpec, env_vars, mounts, cargos, ports, cmd: list, name: str, tasks: int = 1,
+               allow_probe=False, delay_readiness: int = 0):
+        
+        if tasks > 1 and len(ports) > 0:
+            raise MisusageError("Container manager 'local' cannot bind the same ports for {} tasks".format(tasks))
+        
+        self.load_vols(cargos, name)
+        
+        if self.dispose_deploy(name):
+            self.LOG.info("Replacing tasks of deployment '{}'".format(name))
+        
+        port_map = self.bind_ports(name, ports)
+        
+        return [
+            self.start_task(name, '{}-{}'.format(name, i), env_vars, mounts, cargos, port_map, cmd)
+            for i in range(tasks)
+        ]
+    
+    def dispose_run(self, name: str):
+        
+        return self.dispose_deploy(name)
+    
+    def dispose_deploy(self, name: str):
+        
+        stopped = [self.stop_task(pid) for pid in self.find_tasks(name).values()]
+        shutil.rmtree(os.path.join(self.procs_dir, name), ignore_errors=True)
+        return any(stopped)
+    
+    def vol_path(self, cargo: Cargo):
+        
+        return os.path.join(self.vols_dir, cargo.name)
+    
+    def rm_vol(self, cargo: Cargo, ignore=False):
+        
+        if isinstance(cargo, MappedCargo) or cargo.cached:  # shared volumes are only removed when unused
+            return False
+        
+        try:
+            shutil.rmtree(self.vol_path(cargo))
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            if ignore:
+                self.LOG.debug(repr(e))
+                return False
+            else:
+                raise e
+    
+    def load_vol(self, cargo: Cargo, mule_alias: str = None):
+        
+        if isinstance(cargo, MappedCargo):
+            return
+        
+        vol_path = self.vol_path(cargo)
+        
+        with self.vol_claim(cargo) as claimed:
+            if not claimed:
+                self.LOG.info("Reusing shared volume '{}'".format(cargo.name))
+                return
+            elif not isinstance(cargo, EmptyCargo):  # contents are replaced, as in a fresh volume
+                self.clear_vol(vol_path)
+            
+            pathlib.Path(vol_path).mkdir(parents=True, exist_ok=True)
+            self.LOG.debug("Creating volume '{}'".format(cargo.name))
+            
+            if isinstance(cargo, SharedCargo):
+                cargo.deploy(vol_path, include_heavy_cargos=True, max_workers=self.compass.vol_concurrency)
+            elif not isinstance(cargo, EmptyCargo):
+                cargo.deploy(vol_path)
+            
+            if cargo.cached:
+                pathlib.Path(os.path.join(vol_path, DockerConst.VOL_SEAL)).touch()
+    
+    @staticmethod
+    def clear_vol(vol_path: str):
+        
+        if not os.path.isdir(vol_path):
+            return
+        
+        for name in os.listdir(vol_path):
+            path = os.path.join(vol_path, name)
+            
+            if name == DockerConst.VOL_CLAIM:  # belongs to the command that is loading the volume
+                continue
+            elif os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+    
+    def claim_path(self, cargo: Cargo):
+        
+        return os.path.join(self.vol_path(cargo), DockerConst.VOL_CLAIM)
+    
+    def vol_claim_state(self, cargo: Cargo, mule=None):
+        
+        if os.path.exists(os.path.join(self.vol_path(cargo), DockerConst.VOL_SEAL)):
+            return True, None, None
+        
+        try:
+            stamp = int(os.stat(self.claim_path(cargo)).st_mtime)
+        except FileNotFoundError:
+            return False, None, None
+        else:
+            return False, stamp, int(time.time()) - stamp
+    
+    def try_claim_vol(self, cargo: Cargo, mule=None, expired: int = None):
+        
+        claim = self.claim_path(cargo)
+        
+        try:
+            if expired is None:
+                pathlib.Path(self.vol_path(cargo)).mkdir(parents=True, exist_ok=True)
+                os.mkdir(claim)
+            else:
+                os.mkdir(os.path.join(claim, '.expired-{}'.format(expired)))
+                os.utime(claim)
+        except (FileExistsError, FileNotFoundError):  # another command claimed it first
+            return False
+        else:
+            return True
+    
+    def touch_vol_claim(self, cargo: Cargo, mule=None):
+        
+        os.utime(self.claim_path(cargo))
+    
+    def release_vol_claim(self, cargo: Cargo, mule=None):
+        
+        shutil.rmtree(self.claim_path(cargo), ignore_errors=True)
+    
+    def list_cached_vols(self):
+        
+        names = os.listdir(self.vols_dir) if os.path.isdir(self.vols_dir) else []
+        return [name for name in names if name.startswith(DockerConst.CACHED_VOL)]
+    
+    def count_vol_refs(self, vol_name: str):
+        
+        refs = 0
+        
+        for name in (os.listdir(self.procs_dir) if os.path.isdir(self.procs_dir) else []):
+            for task_id in self.find_tasks(name):
+                with open(os.path.join(self.procs_dir, name, task_id, 'volumes.json')) as f:
+                    refs += vol_name in json.load(f)
+        
+        return refs
+    
+    def touch_mule(self, mule):
+        
+        pass  # volumes are loaded by this process, so there are no mules
+    
+    def bind_ports(self, name: str, ports: List[str]) -> dict:
+        
+        port_map = {}
+        
+        for port in ports:
+            parts = port.split(':')
+            
+            if len(parts) == 1:
+                port_map[int(parts[0])] = self.free_port()
+            elif len(parts) == 2:
+                port_map[int(parts[1])] = int(parts[0])
+            else:
+                raise NotImplementedError()
+        
+        proc_dir = os.path.join(self.procs_dir, name)
+        pathlib.Path(proc_dir).mkdir(parents=True, exist_ok=True)
+        
+        with open(os.path.join(proc_dir, 'ports.json'), 'w') as f:
+            json.dump(port_map, f)
+        
+        return port_map
+    
+    @staticmethod
+    def free_port():
+        
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(('', 0))
+            return sock.getsockname()[1]
+    
+    def get_node_port(self, svc_name: str):
+        
+        try:
+            with open(os.path.join(self.procs_dir, svc_name, 'ports.json')) as f:
+                ports = list(json.load(f).values())
+        except FileNotFoundError:
+            return None
+        
+        return ports[0] if len(ports) == 1 else None
+    
+    def make_sandbox(self, task_dir: str, mounts: List[str], cargos: List[Cargo]):
+        
+        sandbox = os.path.join(task_dir, 'root')
+        links = {OnBoard.APP_HOME: os.getcwd()}
+        
+        for cargo in cargos:
+            links[cargo.mount_to] = cargo.src if isinstance(cargo, MappedCargo) else self.vol_path(cargo)
+        
+        for mount in mounts:
+            src, dest = mount.split(':')[:2]
+            links[dest] = os.path.abspath(os.path.expanduser(src))
+        
+        for dest in sorted(links):  # parent directories are linked before the paths inside them
+            link = os.path.join(sandbox, dest.lstrip('/'))
+            pathlib.Path(os.path.dirname(link)).mkdir(parents=True, exist_ok=True)
+            os.symlink(links[dest], link)
+        
+        return sandbox
+    
+    def start_task(self, name: str, task_id: str, env_vars: dict, mounts: List[str], cargos: List[Cargo],
+                   port_map: dict, cmd: list, foreground=False):
+        
+        task_dir = os.path.join(self.procs_dir, name, task_id)
+        shutil.rmtree(task_dir, ignore_errors=True)
+        sandbox = self.make_sandbox(task_dir, mounts, cargos)
+        
+        with open(os.path.join(task_dir, 'volumes.json'), 'w') as f:  # counts the users of shared volumes
+            json.dump([cargo.name for cargo in cargos if cargo.cached], f)
+        
+        env = dict(os.environ)
+        env.update({k: str(v) for k, v in env_vars.items()})
+        env.update({EnvVar.PORT_MAPPING.format(tgt): str(src) for tgt, src in port_map.items()})
+        env.update({
+            EnvVar.ON_BOARD: 'Yes',
+            EnvVar.ON_BOARD_ROOT: sandbox,
+            EnvVar.TASK_ID: task_id,
+            'VENV_HOME': env.get('VENV_HOME', sys.prefix)
+        })
+        
+        if cmd and cmd[0] == OnBoard.ENTRYPOINT:  # the image's entrypoint is shipped with the package
+            cmd = ['bash', Package.ENTRYPOINT] + cmd[1:]
+        
+        if foreground:
+            output = self.LOG.file_handle if self.LOG.background else None
+        else:
+            output = open(os.path.join(task_dir, 'output.log'), 'ab')
+        
+        self.LOG.info("Starting process '{}'".format(task_id))
+        
+        try:
+            proc = subprocess.Popen(
+                cmd, cwd=os.path.join(sandbox, OnBoard.APP_HOME.lstrip('/')), env=env, stdin=subprocess.DEVNULL,
+                stdout=output, stderr=None if output is None else subprocess.STDOUT,
+                start_new_session=True  # background tasks outlive this command, like containers do
+            )
+        finally:
+            if not foreground:
+                output.close()
+        
+        with open(os.path.join(task_dir, 'pid'), 'w') as f:
+            f.write(str(proc.pid))
+        
+        return proc
+    
+    def watch_proc(self, proc: subprocess.Popen):
+        
+        try:
+            proc.wait()
+        except (KeyboardInterrupt, InterruptedError):
+            self.interrupted = True
+            self.stop_task(proc.pid)
+    
+    def find_tasks(self, name: str) -> dict:
+        
+        proc_dir, tasks = os.path.join(self.procs_dir, name), {}
+        
+        for task_id in (os.listdir(proc_dir) if os.path.isdir(proc_dir) else []):
+            try:
+                with open(os.path.join(proc_dir, task_id, 'pid')) as f:
+                    pid = int(f.read().strip())
+            except (FileNotFoundError, NotADirectoryError, ValueError):
+                continue
+            
+            if self.is_alive(pid):
+                tasks[task_id] = pid
+        
+        return tasks
+    
+    @staticmethod
+    def is_alive(pid: int):
+        
+        try:
+            if os.waitpid(pid, os.WNOHANG)[0] == pid:  # a child of this process, which has just quit
+                return False
+        except ChildProcessError:
+            pass
+        
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        
+        return True
+    
+    def stop_task(self, pid: int):
+        
+        """Terminates the task's process group, then kills it if it does not quit in time"""
+        
+        deadline = time.time() + (self.timeout or self.compass.DEFAULT_TIMEOUT)
+        
+        for sig in [signal.SIGTERM, signal.SIGKILL]:
+            try:
+                os.killpg(pid, sig)
+            except ProcessLookupError:
+                return True
+            
+            for interval in self.backoff(deadline):
+                if not self.is_alive(pid):
+                    return True
+                
+                time.sleep(interval)
+            
+            deadline = time.time() + 1
+        
+        return not self.is_alive(pid)
+    
+    def make_name_available(self, name):
+        
+        if self.find_tasks(name):
+            self.LOG.warn("Removing old process '{}'".format(name))
+            self.dispose_run(name)
+    
+    def _snapshot_task_ids(self):
+        
+        names = os.listdir(self.procs_dir) if os.path.isdir(self.procs_dir) else []
+        return {name: set(self.find_tasks(name).keys()) for name in names}
+
+
+_shared_captains = {}
+_shared_captains_lock = Lock()
+
+
+def get_shared_captain(section: str = DockerConst.Section.IDE) -> Captain:
+    
+    """Captain kept for the lifetime of the process, for lookups that do not launch anything"""
+    
+    with _shared_captains_lock:
+        if section not in _shared_captains:
+            _shared_captains[section] = get_captain(section=section)
+        
+        return _shared_captains[section]
+
+
 def get_captain(section: str = DockerConst.Section.IDE, **kwargs):
     
     manager_ref = CaptainCompass().tipe
     cls_lookup = {
         DockerConst.Managers.SWARM: SwarmCaptain,
-        DockerConst.Managers.KUBE: KubeCaptain
+        DockerConst.Managers.KUBE: KubeCaptain,
+        DockerConst.Managers.LOCAL: LocalCaptain
     }
     
     try:
-        capitain_cls: Type[SwarmCaptain, KubeCaptain] = cls_lookup[manager_ref.strip().lower()]
+        capitain_cls: Type[SwarmCaptain, KubeCaptain, LocalCaptain] = cls_lookup[manager_ref.strip().lower()]
     except (KeyError, AttributeError):
         raise ResolutionError(
             "Could not resolve container manager by reference '{}'. Options are: {}"
@@ -16,15 +16,19 @@
 
 """Module for handling Docker volumes"""
 
+import hashlib
+import json
 import os
 import pathlib
 import random_name
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List
 
 from noronha.bay.barrel import Barrel, DatasetBarrel, MoversBarrel
-from noronha.bay.compass import MongoCompass, IslandCompass
+from noronha.bay.compass import MongoCompass, IslandCompass, SqliteWarehouseCompass
+from noronha.bay.utils import DownloadPlan
 from noronha.bay.warehouse import get_warehouse
 from noronha.db.ds import Dataset
 from noronha.db.main import SmartBaseDoc
@@ -44,6 +48,11 @@ class Content(ABC):
     def deploy(self, path):
         
         pass
+    
+    @property
+    def fingerprint(self):
+        
+        return hashlib.sha256(str(self.file_name).encode()).hexdigest()
 
 
 class LiteralContent(Content):
@@ -64,6 +73,21 @@ class LiteralContent(Content):
         
         with open(os.path.join(path, self.file_name), 'w') as f:
             f.write(self.file_content)
+    
+    @property
+    def fingerprint(self):
+        
+        return hashlib.sha256('{}:{}'.format(self.file_name, self.file_content).encode()).hexdigest()
+
+
+class MetaContent(LiteralContent):
+    
+    @property
+    def fingerprint(self):
+        
+        dyct = json.loads(self.file_content)
+        dyct.pop('modified', None)  # documents are saved again on every deployment, even if nothing changed
+        return hashlib.sha256('{}:{}'.format(self.file_name, json.dumps(dyct, sort_keys=True)).encode()).hexdigest()
 
 
 class BinaryContent(Content):
@@ -73,41 +97,55 @@ class BinaryContent(Content):
         super().__init__(file_name=file_name)
         self.file_content = file_content
     
+    @property
+    def estimate_mb(self):
+        
+        return int(len(self.file_content)/(1024*1024)) + 1
+    
     def deploy(self, path):
         
         with open(os.path.join(path, self.file_name), 'wb') as f:
             f.write(self.file_content)
+    
+    @property
+    def fingerprint(self):
+        
+        return hashlib.sha256(self.file_name.encode() + b':' + self.file_content).hexdigest()
 
 
 class BarrelContent(Content):
     
-    def __init__(self, barrel: Barrel):
+    def __init__(self, barrel: Barrel, files: List[str] = None):
         
         super().__init__(file_name=None)
         self.barrel = barrel
+        self.files = files
     
     def deploy(self, path):
         
-        self.barrel.deploy(path_to=path)
+        self.barrel.deploy(path_to=path, files=self.files)
     
-    def get_deployables(self, path):
+    def add_to_download_plan(self, plan: DownloadPlan, path):
         
-        return self.barrel.get_deployables(path_to=path)
+        return self.barrel.add_to_download_plan(plan, path_to=path, files=self.files)
     
     @property
     def estimate_mb(self):
         
-        # TODO:
-        #  implement get_estimate_mb in barrel
-        #  infer by listing of repo. if compressed, multiply by 4
-        if self.barrel.schema is None:
-            return 1024
-        else:
-            return sum(fyle.max_mb or 10 for fyle in self.barrel.schema)
+        return self.barrel.estimate_mb(files=self.files)
+    
+    @property
+    def fingerprint(self):
+        
+        manifest = sorted('{}:{}'.format(entry.name, entry.sha256) for entry in self.barrel.manifest or [])
+        files = sorted(self.files or [])
+        return hashlib.sha256('{}:{}:{}'.format(self.barrel.subject, files, manifest).encode()).hexdigest()
 
 
 class Cargo(object):
     
+    cached = False  # whether the volume outlives the container, to be shared by later ones
+    
     def __init__(self, mount_to: str, mode: str, contents: List[Content] = None, require_mb: int = 10,
                  section: str = None, alias: str = None, name: str = None, lightweight=False):
         
@@ -128,6 +166,18 @@ class Cargo(object):
         
         return '{}:{}:{}'.format(self.name, self.mount_to, self.mode)
     
+    @property
+    def fingerprint(self):
+        
+        """Digest of the files that the volume holds, which changes whenever a container should see new files"""
+        
+        digest = hashlib.sha256(self.mount.encode())
+        
+        for c in self.contents:
+            digest.update(c.fingerprint.encode())
+        
+        return digest.hexdigest()
+    
     def deploy(self, path: str = None):
         
         path = path or self.mount_to
@@ -180,6 +230,22 @@ class TimezoneCargo(MappedCargo):
         )
 
 
+class LWStoreCargo(MappedCargo):
+    
+    def __init__(self, alias: str, **kwargs):
+        
+        src = os.path.dirname(SqliteWarehouseCompass().host_path)
+        pathlib.Path(src).mkdir(parents=True, exist_ok=True)
+        super().__init__(
+            src=src,
+            alias='lw-store-{}'.format(alias),
+            mount_to=OnBoard.LW_STORE_DIR,
+            mode='rw',
+            tipe='DirectoryOrCreate',
+            **kwargs
+        )
+
+
 class LogsCargo(Cargo):
     
     def __init__(self, alias: str, **kwargs):
@@ -244,7 +310,7 @@ class MetaCargo(Cargo):
             mount_to=OnBoard.META_DIR,
             mode='ro',
             contents=[
-                LiteralContent(file_name=x[0], file_content=x[1])
+                MetaContent(file_name=x[0], file_content=x[1])
                 for x in [
                     doc.to_file_tuple()
                     for doc in docs
@@ -268,13 +334,29 @@ class MetaCargo(Cargo):
         return self
 
 
+def content_key(doc, files: List[str] = None):
+    
+    """Identifies the files that a volume would hold, so that equal volumes are loaded only once"""
+    
+    if not doc.sha256 or doc.lightweight:
+        return None
+    
+    files = ','.join(sorted(files)) if files else '*'
+    return hashlib.sha256('{}:{}'.format(doc.sha256, files).encode()).hexdigest()[:24]
+
+
 class HeavyCargo(Cargo):
     
-    def __init__(self, barrel: Barrel, **kwargs):
+    def __init__(self, barrel: Barrel, files: List[str] = None, key: str = None, **kwargs):
+        
+        content = BarrelContent(barrel, files=files)
+        
+        if key is not None:  # read-only volume, named after its content
+            kwargs.update(name='{}-{}'.format(DockerConst.CACHED_VOL, key), mode='ro')
         
-        content = BarrelContent(barrel)
         super().__init__(require_mb=content.estimate_mb, **kwargs)
         self.contents: List[BarrelContent] = [content]
+        self.cached = key is not None
     
     def move(self, src_path):
         
@@ -283,14 +365,14 @@ class HeavyCargo(Cargo):
             path_to=self.mount_to
         )
     
-    def get_deployables(self, path):
+    def add_to_download_plan(self, plan: DownloadPlan, path):
         
-        return self.contents[0].get_deployables(path)
+        return self.contents[0].add_to_download_plan(plan, path)
 
 
 class DatasetCargo(HeavyCargo):
     
-    def __init__(self, ds: Dataset, section: str, **kwargs):
+    def __init__(self, ds: Dataset, section: str, files: List[str] = None, cached=False, **kwargs):
         
         assert ds.stored, NhaStorageError(
             """Dataset '{}' is not stored by the framework, so it cannot be mounted in a container"""
@@ -304,6 +386,8 @@ class DatasetCargo(HeavyCargo):
             mount_to=os.path.join(dyr, subdir),
             mode='ro',
             barrel=DatasetBarrel(ds, **kwargs),
+            files=files,
+            key=content_key(ds, files) if cached else None,
             section=section,
             lightweight=ds.lightweight
         )
@@ -311,7 +395,7 @@ class DatasetCargo(HeavyCargo):
 
 class MoversCargo(HeavyCargo):
     
-    def __init__(self, mv: ModelVersion, section: str, local=False, **kwargs):
+    def __init__(self, mv: ModelVersion, section: str, local=False, files: List[str] = None, cached=False, **kwargs):
         
         subdir = mv.get_dir_name()
         dyr = OnBoard.LOCAL_MODEL_DIR if local else OnBoard.SHARED_MODEL_DIR
@@ -320,6 +404,8 @@ class MoversCargo(HeavyCargo):
             mount_to=os.path.join(dyr, subdir),
             mode='rw',
             barrel=MoversBarrel(mv, **kwargs),
+            files=files,
+            key=content_key(mv, files) if cached else None,
             section=section,
             lightweight=mv.lightweight
         )
@@ -334,6 +420,7 @@ class SharedCargo(Cargo):
             mount_to=OnBoard.NHA_HOME,
             contents=[],
             mode='rw',
+            require_mb=sum(cargo.require_mb for cargo in cargos),
             **kwargs
         )
         
@@ -351,9 +438,10 @@ class SharedCargo(Cargo):
         
         self.estimate_mb = sum([c.estimate_mb for c in self.contents])
     
-    def deploy(self, path: str = None, include_heavy_cargos=False):
+    def deploy(self, path: str = None, include_heavy_cargos=False, max_workers: int = 4):
         
         path = path or self.mount_to
+        deployments = []
         
         for subdir, content, tipe, lightweight in zip(self.subdirs, self.contents, self.types, self.lw_flags):
             
@@ -368,11 +456,13 @@ class SharedCargo(Cargo):
             else:
                 pathlib.Path(subpath).mkdir(parents=True, exist_ok=True)
             
-            content.deploy(subpath)
-    
-    def get_deployables(self, path):
+            deployments.append((content, subpath))
         
-        deployables = []
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:  # each content has its own subdir
+            for future in [executor.submit(content.deploy, subpath) for content, subpath in deployments]:
+                future.result()
+    
+    def add_to_download_plan(self, plan: DownloadPlan, path):
         
         for subdir, content, tipe in zip(self.subdirs, self.contents, self.types):
             
@@ -381,6 +471,6 @@ class SharedCargo(Cargo):
             
             assert isinstance(content, BarrelContent), NotImplementedError()
             subpath = os.path.join(path, subdir)
-            deployables += content.get_deployables(subpath)
+            content.add_to_download_plan(plan, subpath)
         
-        return deployables
+        return plan
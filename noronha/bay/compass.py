@@ -24,13 +24,15 @@ to decide how certain configuration parameters should be used (e.g.: Artifactory
 
 import logging
 import multiprocessing
+import os
 import socket
 from abc import ABC, abstractmethod
 
 from noronha.common.annotations import Configured
 from noronha.bay.tchest import TreasureChest
 from noronha.common.utils import is_it_open_sea
-from noronha.common.constants import LoggerConst, DockerConst, WarehouseConst, Perspective, Encoding, WebServerConst, OnlineConst, KubeConst
+from noronha.common.constants import LoggerConst, DockerConst, WarehouseConst, Perspective, Encoding, WebServerConst, OnlineConst, KubeConst,\
+    HostUser, EnvVar, OnBoard
 from noronha.common.conf import *
 from noronha.common.errors import ResolutionError, ConfigurationError, NhaDockerError
 from noronha.common.parser import resolve_log_level
@@ -38,7 +40,7 @@ from noronha.common.parser import resolve_log_level
 
 def find_cont_hostname():
     
-    return socket.gethostname()
+    return os.environ.get(EnvVar.TASK_ID) or socket.gethostname()
 
 
 def find_bridge_ip():
@@ -163,7 +165,15 @@ class CaptainCompass(Compass):
     KEY_HEALTH = 'healthcheck'
     KEYS_RESOURCES = ['limits', 'requests']
     KEY_SVC_TYPE = 'service_type'
+    KEY_MULE_IDLE = 'mule_idle_timeout'
+    KEY_VOL_CONCURRENCY = 'volume_concurrency'
+    KEY_LIVENESS_TTL = 'liveness_ttl'
+    KEY_CACHE_VOLS = 'cache_volumes'
     DEFAULT_TIMEOUT = None
+    DEFAULT_MULE_IDLE = 600  # seconds
+    DEFAULT_VOL_CONCURRENCY = 4
+    DEFAULT_LIVENESS_TTL = 5  # seconds
+    DEFAULT_CACHE_VOLS = True
     DEFAULT_HEALTHCHECK = {
         'enabled': False,
         'start_period': 60,
@@ -182,6 +192,26 @@ class CaptainCompass(Compass):
     def api_timeout(self):
         
         return self.conf.get(self.KEY_TIMEOUT, self.DEFAULT_TIMEOUT)
+    
+    @property
+    def mule_idle_timeout(self):
+        
+        return self.conf.get(self.KEY_MULE_IDLE, self.DEFAULT_MULE_IDLE) or 0
+    
+    @property
+    def vol_concurrency(self):
+        
+        return max(self.conf.get(self.KEY_VOL_CONCURRENCY, self.DEFAULT_VOL_CONCURRENCY) or 1, 1)
+    
+    @property
+    def liveness_ttl(self):
+        
+        return self.conf.get(self.KEY_LIVENESS_TTL, self.DEFAULT_LIVENESS_TTL)
+    
+    @property
+    def cache_vols(self):
+        
+        return self.conf.get(self.KEY_CACHE_VOLS, self.DEFAULT_CACHE_VOLS)
 
     def get_resource_profile(self, ref_to_profile: str):
         
@@ -348,11 +378,44 @@ class KubeCompass(CaptainCompass):
         return svc_opts[prof_svc.lower()]
 
 
+class LocalCompass(CaptainCompass):
+    
+    KEY_ROOT = 'root_dir'
+    DEFAULT_ROOT = HostUser.LOCAL_MANAGER
+    DEFAULT_TIMEOUT = 20
+    
+    @property
+    def root_dir(self):
+        
+        return os.path.expanduser(self.conf.get(self.KEY_ROOT, self.DEFAULT_ROOT))
+    
+    def get_namespace(self):
+        
+        raise NotImplementedError("Container manager 'local' does not apply namespace isolation")
+    
+    def get_nfs_server(self):
+        
+        raise NotImplementedError("Container manager 'local' does not take a NFS server")
+    
+    def get_stg_cls(self, section: str):
+        
+        raise NotImplementedError("Container manager 'local' does not take a storage class")
+    
+    def get_node(self):
+        
+        return 'localhost'
+    
+    def get_svc_type(self, resource_profile: dict) -> str:
+        
+        raise NotImplementedError("Container manager 'local' does not take service_type configuration")
+
+
 def get_captain_compass():
     
     return {
         DockerConst.Managers.SWARM: SwarmCompass,
-        DockerConst.Managers.KUBE: KubeCompass
+        DockerConst.Managers.KUBE: KubeCompass,
+        DockerConst.Managers.LOCAL: LocalCompass
     }.get(CaptainCompass().tipe)()
 
 
@@ -508,6 +571,8 @@ class IslandCompass(ABC, TreasureCompass):
                     return self.service_name
                 else:
                     return self.captain.get_node()
+            elif self.captain.tipe == DockerConst.Managers.LOCAL:
+                return self.DEFAULT_HOST
             else:
                 raise NotImplementedError("Unrecognized container manager: {}".format(self.captain.tipe))
         else:
@@ -529,6 +594,8 @@ class IslandCompass(ABC, TreasureCompass):
                     return self.ORIGINAL_PORT
                 else:
                     return configured
+            elif self.captain.tipe == DockerConst.Managers.LOCAL:
+                return configured
             else:
                 raise NotImplementedError("Unrecognized container manager: {}".format(self.captain.tipe))
         else:
@@ -620,12 +687,19 @@ class MongoCompass(IslandCompass):
 class WarehouseCompass(IslandCompass):
     
     KEY_TIPE = 'type'
+    KEY_RETRIES = 'retries'
+    DEFAULT_RETRIES = 2
     
     @property
     def tipe(self):
         
         return self.conf[self.KEY_TIPE]
     
+    @property
+    def retries(self):
+        
+        return self.conf.get(self.KEY_RETRIES, self.DEFAULT_RETRIES)
+    
     @abstractmethod
     def get_store(self):
         
@@ -639,6 +713,10 @@ class FSWarehouseCompass(WarehouseCompass):
     
     KEY_REPO = 'repository'
     DEFAULT_REPO = None
+    KEY_LISTING_TTL = 'listing_ttl'
+    DEFAULT_LISTING_TTL = 30  # seconds
+    KEY_DOWNLOAD_CONCURRENCY = 'download_concurrency'
+    DEFAULT_DOWNLOAD_CONCURRENCY = 4
     ORIGINAL_PORT = 8081
     
     def __init__(self, **kwargs):
@@ -659,6 +737,16 @@ class FSWarehouseCompass(WarehouseCompass):
         
         return self.conf.get(self.KEY_REPO, self.DEFAULT_REPO)
     
+    @property
+    def listing_ttl(self):
+        
+        return self.conf.get(self.KEY_LISTING_TTL, self.DEFAULT_LISTING_TTL)
+    
+    @property
+    def download_concurrency(self):
+        
+        return self.conf.get(self.KEY_DOWNLOAD_CONCURRENCY, self.DEFAULT_DOWNLOAD_CONCURRENCY)
+    
     @property
     def address(self):
         
@@ -669,6 +757,39 @@ class FSWarehouseCompass(WarehouseCompass):
         )
 
 
+class CompressionCompass(Compass):
+    
+    conf = FS_WarehouseConf
+    
+    KEY_COMPRESSION = 'compression'
+    KEY_CODEC = 'codec'
+    DEFAULT_CODEC = WarehouseConst.Codecs.GZ
+    KEY_LEVEL = 'level'
+    KEY_THREADS = 'threads'
+    DEFAULT_THREADS = 0
+    
+    @property
+    def compression(self):
+        
+        return self.conf.get(self.KEY_COMPRESSION) or {}
+    
+    @property
+    def codec(self):
+        
+        return self.compression.get(self.KEY_CODEC) or self.DEFAULT_CODEC
+    
+    @property
+    def level(self):
+        
+        return self.compression.get(self.KEY_LEVEL)
+    
+    @property
+    def threads(self):
+        
+        threads = self.compression.get(self.KEY_THREADS) or self.DEFAULT_THREADS  # may be null in the conf file
+        return threads if threads > 0 else multiprocessing.cpu_count()
+
+
 class NexusCompass(FSWarehouseCompass):
     
     alias = 'nexus'
@@ -700,6 +821,8 @@ class LWWarehouseCompass(WarehouseCompass):
     DEFAULT_REPLICATION = 1
     KEY_TIME_TO_LEAVE = 'time_to_leave'
     DEFAULT_TIME_TO_LEAVE = 600
+    KEY_CHUNK_KB = 'chunk_kb'
+    DEFAULT_CHUNK_KB = 512
     
     def get_store(self):
         
@@ -733,6 +856,11 @@ class LWWarehouseCompass(WarehouseCompass):
         else:
             return self.conf.get(self.KEY_REPLICATION, self.DEFAULT_REPLICATION)
 
+    @property
+    def chunk_size(self):
+
+        return self.conf.get(self.KEY_CHUNK_KB, self.DEFAULT_CHUNK_KB)*1024
+
 
 class CassWarehouseCompass(LWWarehouseCompass):
     
@@ -741,6 +869,42 @@ class CassWarehouseCompass(LWWarehouseCompass):
     
     ORIGINAL_PORT = 9042
     DEFAULT_PORT = 9042
+    KEY_CONCURRENCY = 'concurrency'
+    DEFAULT_CONCURRENCY = 16
+
+    @property
+    def concurrency(self):
+
+        return self.conf.get(self.KEY_CONCURRENCY, self.DEFAULT_CONCURRENCY)
+
+
+class SqliteWarehouseCompass(LWWarehouseCompass):
+
+    alias = 'sqlite'
+    file_manager_type = WarehouseConst.Types.SQLITE
+
+    KEY_PATH = 'path'
+    DEFAULT_DIR = os.path.join(HostUser.NHA, 'lightweight')
+    KEY_BUSY_TIMEOUT = 'busy_timeout'
+    DEFAULT_BUSY_TIMEOUT = 30  # seconds waiting for another writer to release the database
+
+    @property
+    def host_path(self):
+
+        return self.conf.get(self.KEY_PATH) or os.path.join(self.DEFAULT_DIR, '{}.sqlite'.format(self.keyspace))
+
+    @property
+    def path(self):
+
+        if am_i_on_board():  # the host directory is mounted into every managed container
+            return os.path.join(OnBoard.LW_STORE_DIR, os.path.basename(self.host_path))
+        else:
+            return self.host_path
+
+    @property
+    def busy_timeout(self):
+
+        return self.conf.get(self.KEY_BUSY_TIMEOUT, self.DEFAULT_BUSY_TIMEOUT)
 
 
 class WebAppCompass(Compass):
@@ -791,7 +955,9 @@ class WebServerCompass(Compass):
     @property
     def port(self):
 
-        return self.conf.get(self.KEY_PORT, self.DEFAULT_PORT)
+        port = self.conf.get(self.KEY_PORT, self.DEFAULT_PORT)
+        mapped = os.environ.get(EnvVar.PORT_MAPPING.format(port))  # local processes bind host ports directly
+        return port if mapped is None else int(mapped)
 
     @property
     def enable_debug(self):
@@ -892,6 +1058,8 @@ class DeploymentCompass:
                 return self.service_name
             else:
                 return self.captain_compass.get_node()
+        elif self.captain_compass.tipe == DockerConst.Managers.LOCAL:
+            return self.LOCALHOST
 
     @property
     def port(self):
@@ -906,6 +1074,8 @@ class DeploymentCompass:
                 return self.ORIGINAL_PORT
             else:
                 return self.depl.host_port
+        elif self.captain_compass.tipe == DockerConst.Managers.LOCAL:
+            return self.depl.host_port  # every task shares the host's network
 
     def get_endpoints(self) -> list:
 
@@ -915,6 +1085,8 @@ class DeploymentCompass:
             endpoints = self._get_kube_endpoints()
         elif self.captain_compass.tipe == DockerConst.Managers.SWARM:
             endpoints = self._get_swarm_endpoints()
+        elif self.captain_compass.tipe == DockerConst.Managers.LOCAL:
+            endpoints = [self.host] if self.port is not None else []
 
         return ['http://{}:{}'.format(endpoint, self.port) for endpoint in endpoints]
 
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+# Copyright Noronha Development Team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for packing files into compressed archives and unpacking them
+
+Archives are always written and read as streams, so that packing can be pipelined
+with the upload and unpacking can be pipelined with the download
+"""
+
+import gzip
+import tarfile
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from noronha.bay.compass import CompressionCompass
+from noronha.common.constants import WarehouseConst
+from noronha.common.errors import ResolutionError
+
+
+class FrameWriter(object):
+    
+    """Compresses blocks in parallel and writes them as independent frames, in their original order"""
+    
+    BLOCK_SIZE = 4*1024*1024
+    
+    def __init__(self, fileobj, compress, threads: int):
+        
+        self.fileobj = fileobj
+        self.compress = compress
+        self.max_pending = 2*threads
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.pending = deque()
+        self.buffer = bytearray()
+    
+    def _submit(self, block: bytes):
+        
+        self.pending.append(self.executor.submit(self.compress, block))
+        
+        while len(self.pending) > self.max_pending:
+            self._flush_one()
+    
+    def _flush_one(self):
+        
+        self.fileobj.write(self.pending.popleft().result())
+    
+    def write(self, data):
+        
+        self.buffer.extend(data)
+        
+        while len(self.buffer) >= self.BLOCK_SIZE:
+            self._submit(bytes(self.buffer[:self.BLOCK_SIZE]))
+            del self.buffer[:self.BLOCK_SIZE]
+        
+        return len(data)
+    
+    def close(self):
+        
+        try:
+            if self.buffer:
+                self._submit(bytes(self.buffer))
+                self.buffer = bytearray()
+            
+            while self.pending:
+                self._flush_one()
+        finally:
+            self.executor.shutdown(wait=True)
+
+
+class Codec(ABC):
+    
+    alias: str = None
+    extension: str = None
+    package: str = None  # apk package providing the command line tool, if not built into the mule
+    DEFAULT_LEVEL: int = None
+    
+    def __init__(self, level: int = None, threads: int = 1):
+        
+        self.level = self.DEFAULT_LEVEL if level is None else level
+        self.threads = threads
+    
+    def archive_name(self, name: str):
+        
+        return '{}.{}'.format(name, self.extension)
+    
+    @abstractmethod
+    def writer(self, fileobj):
+        
+        pass
+    
+    @abstractmethod
+    def reader(self, fileobj):
+        
+        pass
+    
+    def get_stream_decompress_cmd(self):
+        
+        raise NotImplementedError()
+    
+    def get_stream_extract_cmd(self, path: str):
+        
+        """Shell pipeline stage that extracts an archive read from stdin, as it is being downloaded"""
+        
+        return '{} | tar -xf - -C {}'.format(self.get_stream_decompress_cmd(), path)
+    
+    def pack(self, fileobj, files: List[Tuple[str, str]], wrap=None):
+        
+        writer = self.writer(fileobj)
+        
+        try:
+            with tarfile.open(fileobj=writer, mode='w|') as tar:
+                for path, arcname in files:
+                    if wrap is None:
+                        tar.add(path, arcname=arcname)
+                    else:  # lets the caller observe each file's bytes as they are packed
+                        with open(path, 'rb') as f:
+                            tar.addfile(tar.gettarinfo(path, arcname=arcname), wrap(arcname, f))
+        finally:
+            writer.close()
+    
+    def unpack(self, fileobj, path: str, members=None):
+        
+        reader = self.reader(fileobj)
+        
+        try:
+            with tarfile.open(fileobj=reader, mode='r|') as tar:
+                if members is None:
+                    tar.extractall(path)
+                else:  # members are still read in sequence, but only the matching ones are written
+                    for member in tar:
+                        if members(member.name):
+                            tar.extract(member, path)
+        finally:
+            reader.close()
+
+
+class GzipCodec(Codec):
+    
+    alias = WarehouseConst.Codecs.GZ
+    extension = 'tar.gz'
+    DEFAULT_LEVEL = 6
+    
+    def writer(self, fileobj):
+        
+        if self.threads > 1:  # concatenated gzip members are still a valid gzip file
+            return FrameWriter(
+                fileobj,
+                compress=lambda block: gzip.compress(block, compresslevel=self.level),
+                threads=self.threads
+            )
+        else:
+            return gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=self.level)
+    
+    def reader(self, fileobj):
+        
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    
+    def get_stream_extract_cmd(self, path: str):
+        
+        return 'tar -xzf - -C {}'.format(path)
+
+
+class ZstdCodec(Codec):
+    
+    alias = WarehouseConst.Codecs.ZSTD
+    extension = 'tar.zst'
+    package = 'zstd'
+    DEFAULT_LEVEL = 3
+    
+    def writer(self, fileobj):
+        
+        import zstandard  # lazy import
+        compressor = zstandard.ZstdCompressor(level=self.level, threads=self.threads)
+        return compressor.stream_writer(fileobj, closefd=False)
+    
+    def reader(self, fileobj):
+        
+        import zstandard  # lazy import
+        return zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=False)
+    
+    def get_stream_decompress_cmd(self):
+        
+        return 'zstd -d -c'
+
+
+class Lz4Codec(Codec):
+    
+    alias = WarehouseConst.Codecs.LZ4
+    extension = 'tar.lz4'
+    package = 'lz4'
+    DEFAULT_LEVEL = 0
+    
+    def writer(self, fileobj):
+        
+        import lz4.frame  # lazy import
+        return FrameWriter(
+            fileobj,
+            compress=lambda block: lz4.frame.compress(block, compression_level=self.level),
+            threads=self.threads
+        )
+    
+    def reader(self, fileobj):
+        
+        import lz4.frame  # lazy import
+        return lz4.frame.LZ4FrameFile(fileobj, mode='rb')  # reads through concatenated frames
+    
+    def get_stream_decompress_cmd(self):
+        
+        return 'lz4 -d -c'
+
+
+def get_codec(alias: str = None) -> Codec:
+    
+    compass = CompressionCompass()
+    alias = (alias or compass.codec).strip().lower()
+    
+    cls_lookup = {
+        GzipCodec.alias: GzipCodec,
+        ZstdCodec.alias: ZstdCodec,
+        Lz4Codec.alias: Lz4Codec
+    }
+    
+    try:
+        codec_cls = cls_lookup[alias]
+    except KeyError:
+        raise ResolutionError(
+            "Could not resolve compression codec by reference '{}'. Options are: {}"
+            .format(alias, list(cls_lookup.keys()))
+        )
+    else:
+        return codec_cls(level=compass.level, threads=compass.threads)
@@ -22,10 +22,10 @@ from typing import List
 
 from noronha.bay.captain import get_captain, Captain
 from noronha.bay.cargo import Cargo, DatasetCargo, MetaCargo, ConfCargo, LogsCargo, SharedCargo, MoversCargo,\
-    TimezoneCargo
-from noronha.bay.compass import DockerCompass
+    TimezoneCargo, LWStoreCargo
+from noronha.bay.compass import DockerCompass, LWWarehouseCompass
 from noronha.bay.shipyard import ImageSpec
-from noronha.common.constants import DockerConst, EnvVar
+from noronha.common.constants import DockerConst, EnvVar, WarehouseConst
 from noronha.common.logging import Logged
 from noronha.common.parser import join_dicts
 from noronha.db.proj import Project
@@ -42,7 +42,7 @@ class Expedition(Logged, ABC):
     
     def __init__(self, img_spec: ImageSpec = None, proj: Project = None, tag: str = DockerConst.LATEST,
                  movers: List[ModelVersion] = None, datasets: List[Dataset] = None, docs: List[SmartBaseDoc] = None,
-                 **kwargs):
+                 file_filters: dict = None, **kwargs):
         
         Logged.__init__(self, log=kwargs.get('log'))
         self.docker_compass = DockerCompass()
@@ -53,6 +53,7 @@ class Expedition(Logged, ABC):
         self.docs = docs or []
         self.movers = movers or []
         self.datasets = datasets or []
+        self.file_filters = file_filters or {}  # file name patterns by primary key of dataset or model version
         self.docs += self.movers
         self.docs += self.datasets
         
@@ -109,24 +110,37 @@ class Expedition(Logged, ABC):
         conf_cargo = ConfCargo(**kwargs)
         meta_cargo = MetaCargo(**kwargs, docs=self.docs)
         
+        cached = self.captain.compass.cache_vols
+        
         ds_cargos = [
-            DatasetCargo(ds, section=self.section, log=self.LOG)
+            DatasetCargo(ds, section=self.section, files=self.file_filters.get(ds.get_pk()), cached=cached,
+                         log=self.LOG)
             for ds in self.datasets
         ]
         
         mv_cargos = [
-            MoversCargo(mv, section=self.section, log=self.LOG)
+            MoversCargo(mv, section=self.section, files=self.file_filters.get(mv.get_pk()), cached=cached,
+                        log=self.LOG)
             for mv in self.movers
         ]
         
+        # shared volumes are mounted by themselves, inside the directory of the expedition's own volume
+        heavy_cargos = ds_cargos + mv_cargos
+        lw_compass = LWWarehouseCompass()
+        
+        if lw_compass.enabled and lw_compass.tipe.strip().lower() == WarehouseConst.Types.SQLITE:
+            store_cargos = [LWStoreCargo(**kwargs)]  # the lightweight store is a file on the host
+        else:
+            store_cargos = []
+        
         return [
             LogsCargo(**kwargs),
             TimezoneCargo(**kwargs),
             SharedCargo(
                 **kwargs,
-                cargos=[conf_cargo, meta_cargo] + ds_cargos + mv_cargos
+                cargos=[conf_cargo, meta_cargo] + [c for c in heavy_cargos if not c.cached]
             )
-        ]
+        ] + [c for c in heavy_cargos if c.cached] + store_cargos
     
     @abstractmethod
     def make_alias(self):
@@ -61,6 +61,11 @@ class Island(LongExpedition):
                 "There is no point in setting up the plugin '{}' because it's configured in 'foreign mode'"
                 .format(self.alias)
             )
+            
+            assert self.captain.compass.tipe != DockerConst.Managers.LOCAL, MisusageError(
+                "Plugin '{}' cannot be set up by container manager '{}'. Configure it in 'foreign mode' instead"
+                .format(self.alias, DockerConst.Managers.LOCAL)
+            )
         
         if not skip_build:
             self.builder.build()
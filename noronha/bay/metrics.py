@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# Copyright Noronha Development Team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for measuring file transfers between Noronha and its file managers
+
+Each warehouse operation becomes one record, which is appended as a JSON line to a dedicated
+log file and kept in memory, so that a summary can be shown at the end of a command
+"""
+
+import json
+import logging
+import pathlib
+from collections import OrderedDict
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from threading import Lock
+
+from noronha.bay.compass import LoggerCompass
+from noronha.common.constants import DateFmt
+
+
+class TransferMetrics(object):
+    
+    SINK_NAME = 'transfers'
+    
+    def __init__(self):
+        
+        self.records = []
+        self._lock = Lock()  # warehouse operations may run in several threads at once
+        self._sink = None
+    
+    @property
+    def sink(self):
+        
+        if self._sink is None:
+            compass = LoggerCompass(custom_conf={LoggerCompass.KEY_NAME: self.SINK_NAME})
+            pathlib.Path(compass.log_file_dir).mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(**compass.file_handler_kwargs)
+            sink = logging.getLogger('noronha.{}'.format(self.SINK_NAME))
+            sink.setLevel(logging.INFO)
+            sink.addHandler(handler)
+            sink.propagate = False
+            self._sink = sink
+        
+        return self._sink
+    
+    def record(self, operation: str, section: str, backend: str, path: str, n_bytes: int, seconds: float,
+               retries: int = 0, error: Exception = None):
+        
+        rec = OrderedDict(
+            timestamp=datetime.now().strftime(DateFmt.READABLE),
+            operation=operation,
+            section=section,
+            backend=backend,
+            path=path,
+            bytes=n_bytes,
+            seconds=round(seconds, 3),
+            mb_per_sec=self.throughput(n_bytes, seconds),
+            retries=retries,
+            succeeded=error is None,
+            error=None if error is None else repr(error)
+        )
+        
+        with self._lock:
+            self.records.append(rec)
+        
+        try:
+            self.sink.info(json.dumps(rec))
+        except Exception:  # metrics must never break a transfer
+            pass
+        
+        return rec
+    
+    @staticmethod
+    def throughput(n_bytes: int, seconds: float):
+        
+        if not n_bytes or seconds <= 0:
+            return None
+        else:
+            return round(n_bytes/(1024*1024)/seconds, 2)
+    
+    def summary(self):
+        
+        groups = OrderedDict()
+        
+        with self._lock:
+            records = list(self.records)
+        
+        for rec in records:
+            key = '{}.{}.{}'.format(rec['backend'], rec['section'], rec['operation'])
+            group = groups.setdefault(key, dict(count=0, failed=0, retries=0, bytes=0, seconds=0.0))
+            group['count'] += 1
+            group['failed'] += 0 if rec['succeeded'] else 1
+            group['retries'] += rec['retries']
+            group['bytes'] += rec['bytes'] or 0
+            group['seconds'] += rec['seconds']
+        
+        for group in groups.values():
+            group['mb_per_sec'] = self.throughput(group['bytes'], group['seconds'])
+            group['seconds'] = round(group['seconds'], 3)
+        
+        return dict(groups)
+    
+    def reset(self):
+        
+        with self._lock:
+            self.records = []
+
+
+METRICS = TransferMetrics()
@@ -16,6 +16,7 @@
 
 """Module for handling Docker images"""
 
+import hashlib
 import json
 from abc import ABC, abstractmethod
 
@@ -33,7 +34,7 @@ from noronha.db.proj import Project
 class ImageSpec(object):
     
     def __init__(self, registry: str = None, section: str = None, image: str = None, tag: str = None,
-                 pushable: bool = False):
+                 pushable: bool = False, image_id: str = None):
         
         assert image is not None
         self.registry = registry or ''
@@ -41,6 +42,7 @@ class ImageSpec(object):
         self.image = image
         self.tag = tag or DockerConst.LATEST
         self.pushable = pushable
+        self.image_id = image_id  # tells apart images that were built under the same tag, if known
     
     @classmethod
     def from_proj(cls, proj: Project, tag: str = DockerConst.LATEST):
@@ -64,7 +66,8 @@ class ImageSpec(object):
             section=DockerConst.Section.PROJ,
             image=bvers.proj.name,
             tag=bvers.tag,
-            pushable=True if configured_registry else False
+            pushable=True if configured_registry else False,
+            image_id=bvers.docker_id
         )
     
     @classmethod
@@ -117,6 +120,10 @@ class RepoHandler(ABC):
     def build(self, nocache: bool = False):
         
         raise NotImplementedError()
+    
+    def fingerprint(self):
+        
+        return self.repo.fingerprint()
 
 
 class DockerTagger(RepoHandler):
@@ -143,8 +150,23 @@ class DockerTagger(RepoHandler):
         
         return self.image['Id']
     
+    def retag(self, docker_id: str):
+        
+        """Tags an image that was built from the same context before, instead of building it again"""
+        
+        try:
+            self.image = self.docker.inspect_image(docker_id)
+        except Exception:  # the image was removed since
+            return None
+        
+        LOG.info("Build context of {} is unchanged. Reusing image {}".format(self.img_spec.target, docker_id))
+        self.tag_image()
+        self.push_image()
+        return self.image_id
+    
     def tag_image(self):
         
+        self.img_spec.image_id = self.image_id
         self.docker.tag(
             image=self.image_id,
             repository=self.img_spec.repo,
@@ -169,6 +191,42 @@ class DockerTagger(RepoHandler):
 
 class LocalBuilder(DockerTagger):
     
+    def fingerprint(self):
+        
+        context = self.repo.fingerprint()
+        
+        if context is None:
+            return None
+        
+        # a base image may change under the same tag, which changes the image built on top of it
+        bases = ['{}={}'.format(ref, self.resolve_image(ref)) for ref in self.base_images()]
+        return hashlib.sha256(json.dumps([FrameworkConst.FW_VERSION, context, bases]).encode()).hexdigest()
+    
+    def base_images(self):
+        
+        refs, stages = [], set()
+        
+        for line in (self.repo.read_file('Dockerfile') or '').splitlines():
+            words = [w for w in line.split() if not w.startswith('--')]  # e.g.: --platform
+            
+            if len(words) < 2 or words[0].upper() != 'FROM':
+                continue
+            
+            if words[1] not in stages and words[1] != 'scratch':
+                refs.append(words[1])
+            
+            if len(words) >= 4 and words[2].upper() == 'AS':
+                stages.add(words[3])
+        
+        return refs
+    
+    def resolve_image(self, ref: str):
+        
+        try:
+            return self.docker.inspect_image(ref)['Id']
+        except Exception:  # not pulled yet, so the build is going to pull it
+            return None
+    
     def build(self, nocache: bool = False):
         
         work_path = None
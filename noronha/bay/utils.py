@@ -14,14 +14,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import io
 import os
 import pathlib
 import random_name
+import shlex
 from shutil import rmtree
 from collections import namedtuple
+from typing import List
+from threading import Thread
 
 from noronha.common.constants import Paths, Encoding, Regex
-from noronha.db.utils import FileDoc
+from noronha.common.errors import NhaStorageError
+from noronha.db.utils import FileDoc, ManifestEntry
 
 
 class StoreHierarchy(object):
@@ -54,7 +60,12 @@ class StoreHierarchy(object):
         ])
 
 
+DownloadSource = namedtuple('DownloadSource', ['url', 'user', 'pswd', 'check_certificate'])
+
+
 class FileSpec(FileDoc):
+    
+    DIGEST_CHUNK_SIZE = 1024*1024
 
     def __init__(self, alias: str = None, *args, **kwargs):
         
@@ -87,6 +98,11 @@ class FileSpec(FileDoc):
             ' BLOB' if include_type else ''
         )
     
+    @property
+    def is_stream(self):
+        
+        return hasattr(self.content, 'read')
+    
     def get_bytes(self):
 
         if self.content is None:
@@ -95,15 +111,132 @@ class FileSpec(FileDoc):
             return self.content
         else:
             return self.content.encode(Encoding.DEFAULT)
+
+    def iter_chunks(self, chunk_size: int):
+
+        if self.content is None:
+            with open(self.path_from, 'rb') as f:
+                yield from self._iter_stream(f, chunk_size)
+        elif self.is_stream:
+            yield from self._iter_stream(self.content, chunk_size)
+        else:
+            bites = memoryview(self.get_bytes())
+
+            for offset in range(0, max(len(bites), 1), chunk_size):
+                yield bites[offset:offset + chunk_size]
+
+    @staticmethod
+    def _iter_stream(stream, chunk_size: int):
+        
+        chunk = stream.read(chunk_size)
+        yield chunk  # empty files still yield one (empty) chunk
+        
+        while chunk:
+            chunk = stream.read(chunk_size)
+            
+            if chunk:
+                yield chunk
     
-    def get_size_mb(self):
+    def make_manifest_entry(self, hashed=True):
+        
+        if not hashed:  # hash is filled in later, while the file is uploaded
+            return ManifestEntry(name=self.name, size=self.get_size(), sha256=None)
+        
+        sha, size = hashlib.sha256(), 0
+        
+        for chunk in self.iter_chunks(self.DIGEST_CHUNK_SIZE):
+            sha.update(chunk)
+            size += len(chunk)
+        
+        return ManifestEntry(name=self.name, size=size, sha256=sha.hexdigest())
+    
+    def open_reader(self, on_overflow=None):
         
         if self.content is None:
-            n_bites = os.path.getsize(self.path_from)
+            fileobj, size = open(self.path_from, 'rb'), os.path.getsize(self.path_from)
+        else:
+            bites = self.get_bytes()
+            fileobj, size = io.BytesIO(bites), len(bites)
+        
+        return HashingReader(fileobj, max_bytes=self.max_mb*1024*1024, on_overflow=on_overflow, size=size)
+    
+    def get_size(self):
+        
+        if self.content is None:
+            return os.path.getsize(self.path_from)
+        elif self.is_stream:  # only known once the stream has been consumed
+            return getattr(self.content, 'n_bytes', 0)
+        else:
+            return len(self.get_bytes())
+    
+    def get_size_mb(self):
+        
+        return int(self.get_size()/(1024*1024))
+
+
+class ManifestDiff(object):
+    
+    def __init__(self, old: List[ManifestEntry] = None, new: List[ManifestEntry] = None, whole=False):
+        
+        old = {e.name: e for e in old or []}
+        new = {e.name: e for e in new or []}
+        self.manifest = list(new.values())
+        self.added = [name for name in new if name not in old]
+        self.changed = [name for name in new if name in old and new[name].sha256 != old[name].sha256]
+        self.removed = [name for name in old if name not in new]
+        self.unchanged = [name for name in new if name in old and name not in self.changed]
+        self.whole = whole  # a single archive is re-uploaded as a whole if anything changed
+        self.archive_size = None
+        self.codec = None  # alias of the codec that packed the stored archive, if any
+    
+    @property
+    def _sizes(self):
+        
+        return {entry.name: entry.size for entry in self.manifest}
+    
+    @property
+    def is_empty(self):
+        
+        return not (self.added or self.changed or self.removed)
+    
+    @property
+    def uploads(self):
+        
+        if self.whole and not self.is_empty:
+            return list(self._sizes.keys())
         else:
-            n_bites = len(self.content)
+            return self.added + self.changed
+    
+    @property
+    def upload_bytes(self):
+        
+        return sum(self._sizes[name] for name in self.uploads)
+    
+    @property
+    def digest(self):
+        
+        """Content hash of the whole file set, independent of codecs and upload order"""
+        
+        if any(entry.sha256 is None for entry in self.manifest):
+            return None
         
-        return int(n_bites/(1024*1024))
+        sha = hashlib.sha256()
+        
+        for entry in sorted(self.manifest, key=lambda e: e.name):
+            sha.update('{}\0{}\n'.format(entry.name, entry.sha256).encode(Encoding.DEFAULT))
+        
+        return sha.hexdigest()
+    
+    def as_dict(self):
+        
+        return dict(
+            added=self.added,
+            changed=self.changed,
+            removed=self.removed,
+            unchanged=self.unchanged,
+            upload_bytes=self.upload_bytes,
+            upload_mb=round(self.upload_bytes/(1024*1024), 2)
+        )
 
 
 class Workpath(str):
@@ -150,3 +283,342 @@ class Workpath(str):
         
         for file_name, file_content in files.items():
             self.deploy_text_file(name=file_name, content=file_content)
+
+
+class StreamPipe(object):
+    
+    """Runs a producer in a background thread and exposes what it writes as a readable stream"""
+    
+    BLOCK_SIZE = 64*1024
+    
+    def __init__(self, producer, max_bytes: int = None):
+        
+        self.producer = producer
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.error = None
+        read_fd, write_fd = os.pipe()
+        self._reader = os.fdopen(read_fd, 'rb')
+        self._writer = os.fdopen(write_fd, 'wb')
+        self._thread = Thread(target=self._produce, daemon=True)
+    
+    def __enter__(self):
+        
+        self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, *_):
+        
+        self._reader.close()  # a producer that is still writing gets a broken pipe
+        self._thread.join()
+        
+        if exc_type is None:
+            self._raise_for_error()
+    
+    def __iter__(self):
+        
+        while True:
+            data = self.read(self.BLOCK_SIZE)
+            
+            if data:
+                yield data
+            else:
+                break
+    
+    def _produce(self):
+        
+        try:
+            self.producer(self._writer)
+        except Exception as e:
+            self.error = e
+        finally:
+            try:
+                self._writer.close()
+            except OSError:
+                pass
+    
+    def _raise_for_error(self):
+        
+        if self.error is not None:
+            raise NhaStorageError("Failed to produce stream") from self.error
+    
+    @property
+    def overflown(self):
+        
+        return self.max_bytes is not None and self.n_bytes > self.max_bytes
+    
+    def read(self, size: int = -1):
+        
+        data = self._reader.read(size)
+        
+        if not data:
+            self._thread.join()
+            self._raise_for_error()  # a failed producer must not look like a complete stream
+        
+        self.n_bytes += len(data)
+        
+        if self.overflown:
+            raise NhaStorageError("Stream exceeded the limit of {} bytes".format(self.max_bytes))
+        
+        return data
+
+
+class HashingReader(object):
+    
+    """Readable stream that hashes and counts what goes through it, aborting once it exceeds a max size"""
+    
+    BLOCK_SIZE = 64*1024
+    
+    def __init__(self, fileobj, max_bytes: int = None, on_overflow=None, size: int = None):
+        
+        self.fileobj = fileobj
+        self.max_bytes = max_bytes
+        self.on_overflow = on_overflow
+        self.size = size  # expected size, if known beforehand
+        self.sha = hashlib.sha256()
+        self.n_bytes = 0
+    
+    def __iter__(self):  # HTTP clients that do not read file-like objects iterate over the body instead
+        
+        while True:
+            data = self.read(self.BLOCK_SIZE)
+            
+            if data:
+                yield data
+            else:
+                break
+    
+    def __len__(self):
+        
+        """Bytes left to read, so that HTTP clients send a Content-Length instead of a chunked body"""
+        
+        if self.size is None:
+            raise TypeError("Size of stream is unknown")
+        
+        return max(self.size - self.n_bytes, 0)
+    
+    @property
+    def sha256(self):
+        
+        return self.sha.hexdigest()
+    
+    def read(self, size: int = -1):
+        
+        data = self.fileobj.read(size)
+        self.sha.update(data)
+        self.n_bytes += len(data)
+        
+        if self.max_bytes is not None and self.n_bytes > self.max_bytes:
+            if callable(self.on_overflow):
+                self.on_overflow(self.n_bytes)
+            
+            raise NhaStorageError("Stream exceeded the limit of {} bytes".format(self.max_bytes))
+        
+        return data
+    
+    def rewind(self):
+        
+        self.fileobj.seek(0)
+        self.sha = hashlib.sha256()
+        self.n_bytes = 0
+    
+    def close(self):
+        
+        self.fileobj.close()
+
+
+class IterStream(object):
+    
+    """Readable stream over an iterable of byte chunks"""
+    
+    def __init__(self, chunks):
+        
+        self.chunks = iter(chunks)
+        self.buffer = bytearray()
+    
+    def read(self, size: int = -1):
+        
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer.extend(next(self.chunks))
+            except StopIteration:
+                break
+        
+        size = len(self.buffer) if size < 0 else size
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+    
+    def close(self):
+        
+        self.chunks = iter(())
+        self.buffer = bytearray()
+
+
+class DownloadPlan(object):
+    
+    """Shell script that downloads files in parallel inside a container
+    
+    Each download is retried and resumed after failures, then checked against the hash in its manifest.
+    Archives are extracted while they are downloaded, after which their extracted files are checked.
+    The rendered script holds credentials and grows with the number of files, so it must be fed to the shell
+    through stdin (e.g.: sh -s), never passed as an argument.
+    """
+    
+    SUCCESS_MARK = 'NHA_DOWNLOAD_PLAN_OK'
+    
+    LIB = """
+set -e
+(set -o pipefail) 2> /dev/null && set -o pipefail  # not every sh has it
+
+nha_retry() {
+    n=0
+    until "$@"; do
+        n=$((n+1))
+        [ $n -le $NHA_RETRIES ] || return 1
+        sleep $n
+    done
+}
+
+nha_curl() {
+    curl -sSfL --connect-timeout 30 ${NHA_AUTH:+-K "$NHA_AUTH"} $NHA_CURL_OPTS "$@"
+}
+
+nha_fetch() {  # url, destination, expected sha256 (may be empty)
+    nha_curl -C - -o "$2.part" "$1" || {
+        [ $? -ne 33 ] || rm -f "$2.part"  # server cannot resume, so start over
+        return 1
+    }
+    if [ -n "$3" ] && ! echo "$3  $2.part" | sha256sum -c - > /dev/null 2>&1; then
+        echo "Checksum mismatch: $2" >&2
+        rm -f "$2.part"
+        return 1
+    fi
+    mv -f "$2.part" "$2"
+}
+
+nha_verify() {  # checksum list, in the format of sha256sum
+    sha256sum -c "$1" > /dev/null || { echo "Checksum mismatch after extracting to $2" >&2; return 1; }
+}
+"""
+    
+    def __init__(self, concurrency: int = 4, retries: int = 2):
+        
+        self.concurrency = max(concurrency, 1)
+        self.retries = retries
+        self.jobs = []  # (expected size, commands, checksums of extracted files)
+        self.packages = set()
+        self.credentials = {}  # {(user, password): index of the curl config file that holds them}
+    
+    def __len__(self):
+        
+        return len(self.jobs)
+    
+    def _curl_opts(self, source: DownloadSource):
+        
+        opts = ['NHA_CURL_OPTS={}'.format('' if source.check_certificate else '--insecure'), 'NHA_AUTH=']
+        
+        # credentials go to a curl config file, instead of curl's command line. Each source points to its own
+        # credentials, since sources on the same host may belong to different users
+        if source.user is not None:
+            index = self.credentials.setdefault((source.user, source.pswd or ''), len(self.credentials))
+            opts[1] = 'NHA_AUTH="$W/auth-{:04d}"'.format(index)
+        
+        return ' '.join(opts)
+    
+    @staticmethod
+    def _curl_config_value(value: str):
+        
+        escaped = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+        return '"{}"'.format(escaped)
+    
+    def add_file(self, source: DownloadSource, path_to: str, sha256: str = None, size: int = None, msg: str = None):
+        
+        self.jobs.append((size or 0, [
+            'echo {}'.format(shlex.quote(msg or 'Injecting file: {}'.format(os.path.basename(path_to)))),
+            self._curl_opts(source),
+            'mkdir -p {}'.format(shlex.quote(os.path.dirname(path_to))),
+            'nha_retry nha_fetch {} {} {} || {{ echo {} >&2; exit 1; }}'.format(
+                shlex.quote(source.url),
+                shlex.quote(path_to),
+                shlex.quote(sha256 or ''),
+                shlex.quote('Failed to download {}'.format(path_to))
+            )
+        ], None))
+    
+    def add_archive(self, source: DownloadSource, path_to: str, codec, manifest: List[ManifestEntry] = None,
+                    size: int = None, msg: str = None):
+        
+        if codec.package is not None:
+            self.packages.add(codec.package)
+        
+        cmds = [
+            'echo {}'.format(shlex.quote(msg or 'Extracting {} to {}'.format(os.path.basename(source.url), path_to))),
+            self._curl_opts(source),
+            'mkdir -p {}'.format(shlex.quote(path_to)),
+            'nha_pull() {{ nha_curl {} | {}; }}'.format(
+                shlex.quote(source.url),
+                codec.get_stream_extract_cmd(shlex.quote(path_to))
+            ),
+            'nha_retry nha_pull || {{ echo {} >&2; exit 1; }}'.format(
+                shlex.quote('Failed to download and extract {}'.format(source.url))
+            )
+        ]
+        
+        if manifest and all(entry.sha256 for entry in manifest):
+            sums = '\n'.join(
+                '{}  {}'.format(entry.sha256, os.path.join(path_to, entry.name))
+                for entry in manifest
+            )
+            cmds.append('nha_verify "${{0%.sh}}.sha256" {}'.format(shlex.quote(path_to)))
+        else:
+            sums = None
+        
+        self.jobs.append((size or sum(entry.size for entry in manifest or []), cmds, sums))
+    
+    def _heredoc(self, path: str, content: str):
+        
+        return 'cat > {} <<\'NHA_EOF\'\n{}\nNHA_EOF'.format(path, content.strip('\n'))
+    
+    def render(self):
+        
+        script = [
+            'set -e',
+            'W=$(mktemp -d)',  # private to the current user, so credentials are not exposed
+            'export W NHA_RETRIES={}'.format(int(self.retries)),
+            'trap \'rm -rf "$W"\' EXIT',
+            'mkdir "$W/jobs"'
+        ]
+        
+        if self.packages:
+            script.append('apk add --no-cache {} > /dev/null'.format(' '.join(sorted(self.packages))))
+        
+        for (user, pswd), index in sorted(self.credentials.items(), key=lambda item: item[1]):
+            script.append(self._heredoc(
+                '"$W/auth-{:04d}"'.format(index),
+                'user = {}'.format(self._curl_config_value('{}:{}'.format(user, pswd)))
+            ))
+        
+        script.append(self._heredoc('"$W/lib.sh"', self.LIB))
+        
+        # largest downloads start first, so the smaller ones fill in around them
+        for i, (_, cmds, sums) in enumerate(sorted(self.jobs, key=lambda job: -job[0])):
+            job = '"$W/jobs/{:06d}'.format(i)
+            script.append(self._heredoc(job + '.sh"', '\n'.join(['. "$W/lib.sh"'] + cmds)))
+            
+            if sums is not None:
+                script.append(self._heredoc(job + '.sha256"', sums))
+        
+        script += [
+            'ls "$W"/jobs/*.sh | xargs -n 1 -P {} sh'.format(self.concurrency),
+            'echo {}'.format(self.SUCCESS_MARK)
+        ]
+        
+        return '\n'.join(script) + '\n'
+    
+    def check(self, output: str):
+        
+        if self.SUCCESS_MARK not in output:
+            raise NhaStorageError("Failed to download files:\n{}".format(output.strip()))
+        
+        return output.replace(self.SUCCESS_MARK, '').strip()
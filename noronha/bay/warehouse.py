@@ -21,32 +21,181 @@ Objects handled:
 - Notebook output files (pdf) in Artifactory
 - Dataset packages
 """
+import asyncio
+import functools
+import inspect
+import itertools
+import json
+import pathlib
+import sqlite3
+import threading
+import time
 import traceback
 import sys
 import os
+import requests
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from artifactory import ArtifactoryPath
-from cassandra import InvalidRequest
-from cassandra.cluster import Cluster
+from cassandra import InvalidRequest, OperationTimedOut, Unavailable, ReadTimeout, WriteTimeout
+from cassandra.cluster import Cluster, NoHostAvailable
+from cassandra.concurrent import execute_concurrent_with_args
 from cassandra.policies import RoundRobinPolicy
 from nexuscli import nexus_client
-from typing import Type, List
+from typing import Type, List, Tuple
 from urllib3 import disable_warnings
 from urllib3.exceptions import InsecureRequestWarning
 
 from noronha.bay.compass import FSWarehouseCompass, ArtifCompass, NexusCompass, LWWarehouseCompass, CassWarehouseCompass,\
-                                WarehouseCompass
-from noronha.bay.utils import Workpath, FileSpec, StoreHierarchy
+                                SqliteWarehouseCompass, WarehouseCompass
+from noronha.bay.metrics import METRICS
+from noronha.bay.utils import Workpath, FileSpec, StoreHierarchy, IterStream, DownloadSource
 from noronha.common.annotations import Configured
 from noronha.common.conf import LazyConf
 from noronha.common.constants import Config, Perspective, Flag
 from noronha.common.errors import ResolutionError, NhaStorageError, MisusageError, ConfigurationError
 from noronha.common.logging import Logged
+from noronha.common.utils import run_blocking
+
+
+class TransferCall(object):
+    
+    """Bookkeeping of a single warehouse operation, including its retries"""
+    
+    RETRY_DELAY = 0.5  # seconds, doubled after each attempt
+    
+    def __init__(self, warehouse, operation: str, arguments: dict):
+        
+        self.warehouse = warehouse
+        self.operation = operation
+        self.arguments = arguments
+        self.retries = 0
+        self.start = time.time()
+    
+    @property
+    def path(self):
+        
+        if isinstance(self.arguments.get('hierarchy'), StoreHierarchy):
+            return self.arguments['hierarchy'].join_as_path(self.arguments.get('file_name', ''))
+        else:
+            return self.arguments.get('path')
+    
+    @property
+    def streams(self):
+        
+        return [f.content for f in self.arguments.get('file_schema') or [] if f.is_stream]
+    
+    @property
+    def retryable(self):
+        
+        return all(hasattr(stream, 'rewind') for stream in self.streams)  # a consumed pipe cannot be sent again
+    
+    def should_retry(self, exc: Exception):
+        
+        if self.retries < self.warehouse.compass.retries and self.retryable and self.warehouse.is_transient(exc):
+            self.retries += 1
+            
+            for stream in self.streams:
+                stream.rewind()
+            
+            self.warehouse.LOG.warn("Retrying {} of '{}' after error: {}".format(self.operation, self.path, exc))
+            return True
+        else:
+            return False
+    
+    @property
+    def delay(self):
+        
+        return self.RETRY_DELAY*2**(self.retries - 1)
+    
+    def count_bytes(self):
+        
+        file_schema = self.arguments.get('file_schema') or []
+        
+        if self.operation == 'upload':
+            return sum(f.get_size() for f in file_schema)
+        elif self.operation == 'download' and self.arguments.get('path_to'):
+            path_to = self.arguments['path_to']
+            names = [f.name for f in file_schema] or os.listdir(path_to)
+            paths = [os.path.join(path_to, name) for name in names]
+            return sum(os.path.getsize(path) for path in paths if os.path.isfile(path))
+        else:
+            return 0
+    
+    def finish(self, error: Exception = None):
+        
+        try:
+            n_bytes = self.count_bytes()
+        except Exception:
+            n_bytes = 0
+        
+        METRICS.record(
+            operation=self.operation,
+            section=self.warehouse.section,
+            backend=self.warehouse.compass.alias,
+            path=self.path,
+            n_bytes=n_bytes,
+            seconds=time.time() - self.start,
+            retries=self.retries,
+            error=error
+        )
+
+
+def instrumented(operation: str):
+    
+    """Measures a warehouse operation and retries it on transient errors"""
+    
+    def decorator(func):
+        
+        signature = inspect.signature(func)
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(self, *args, **kwargs):
+                call = TransferCall(self, operation, signature.bind(self, *args, **kwargs).arguments)
+                
+                while True:
+                    try:
+                        result = await func(self, *args, **kwargs)
+                    except Exception as e:
+                        if call.should_retry(e):
+                            await asyncio.sleep(call.delay)
+                            continue
+                        
+                        call.finish(error=e)
+                        raise e
+                    else:
+                        call.finish()
+                        return result
+        else:
+            @functools.wraps(func)
+            def wrapper(self, *args, **kwargs):
+                call = TransferCall(self, operation, signature.bind(self, *args, **kwargs).arguments)
+                
+                while True:
+                    try:
+                        result = func(self, *args, **kwargs)
+                    except Exception as e:
+                        if call.should_retry(e):
+                            time.sleep(call.delay)
+                            continue
+                        
+                        call.finish(error=e)
+                        raise e
+                    else:
+                        call.finish()
+                        return result
+        
+        return wrapper
+    
+    return decorator
 
 
 class Warehouse(ABC, Configured, Logged):
     
     compass_cls = WarehouseCompass
+    
+    TRANSIENT_EXC = (ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout)
 
     def __init__(self, section: str, log=None):
         
@@ -59,14 +208,32 @@ class Warehouse(ABC, Configured, Logged):
     def connect(self):
         
         pass
+    
+    def is_transient(self, exc: Exception):
+        
+        seen = set()
+        
+        while exc is not None and id(exc) not in seen:  # errors are often wrapped in a NhaStorageError
+            if isinstance(exc, self.TRANSIENT_EXC):
+                return True
+            
+            seen.add(id(exc))
+            exc = exc.__cause__ or exc.__context__
+        
+        return False
 
     @abstractmethod
     def delete(self, hierarchy: StoreHierarchy, ignore=False):
         
         pass
+    
+    @abstractmethod
+    def delete_files(self, hierarchy: StoreHierarchy, file_names: List[str]):
+        
+        pass
 
     @abstractmethod
-    def get_download_cmd(self, path_from, path_to, on_board_perspective=True):
+    def get_download_source(self, path_from, on_board_perspective=True) -> DownloadSource:
         
         pass
     
@@ -75,6 +242,16 @@ class Warehouse(ABC, Configured, Logged):
         
         pass
     
+    @abstractmethod
+    def lyst_files(self, hierarchy: StoreHierarchy) -> List[Tuple[str, int]]:
+        
+        pass
+    
+    @abstractmethod
+    def lyst_hierarchies(self) -> List[StoreHierarchy]:
+        
+        pass
+    
     @abstractmethod
     def store_files(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec]):
         
@@ -84,6 +261,27 @@ class Warehouse(ABC, Configured, Logged):
     def deploy_files(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec], path_to: str):
         
         pass
+    
+    @abstractmethod
+    def open_file(self, hierarchy: StoreHierarchy, file_name: str):
+        
+        pass
+    
+    async def store_files_async(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec]):
+        
+        return await run_blocking(self.store_files, hierarchy=hierarchy, file_schema=file_schema)
+    
+    async def deploy_files_async(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec], path_to: str):
+        
+        return await run_blocking(self.deploy_files, hierarchy=hierarchy, file_schema=file_schema, path_to=path_to)
+    
+    async def delete_async(self, hierarchy: StoreHierarchy, ignore=False):
+        
+        return await run_blocking(self.delete, hierarchy=hierarchy, ignore=ignore)
+    
+    async def lyst_async(self, path):
+        
+        return await run_blocking(self.lyst, path)
 
 
 class FileStoreWarehouse(Warehouse, ABC):
@@ -91,6 +289,10 @@ class FileStoreWarehouse(Warehouse, ABC):
     conf = LazyConf(namespace=Config.Namespace.FS_WAREHOUSE)
     compass_cls = FSWarehouseCompass
     
+    LISTING_PAGE_SIZE = 1000
+    _listings = {}  # shared by all instances: {(backend, section, path): (expiration, [(name, size)])}
+    _listings_lock = threading.Lock()
+    
     def __init__(self, **kwargs):
         
         super().__init__(**kwargs)
@@ -127,19 +329,88 @@ class FileStoreWarehouse(Warehouse, ABC):
 
         pass
     
+    @abstractmethod
+    def upload_stream(self, path_to, stream):
+        
+        pass
+    
+    @abstractmethod
+    def download_stream(self, path_from):
+        
+        pass
+    
+    @abstractmethod
+    def iter_files(self, path):
+        
+        """Yields name and size of each file directly under the path, fetching them page by page"""
+        
+        pass
+    
+    @property
+    def http_kwargs(self):
+        
+        return dict(
+            auth=(self.compass.user, self.compass.pswd),
+            verify=self.compass.check_certificate
+        )
+    
+    def _listing_key(self, hierarchy: StoreHierarchy):
+        
+        return self.compass.alias, self.section, hierarchy.join_as_path()
+    
+    @instrumented('list')
+    def lyst(self, path):
+        
+        return [name for name, _ in self.iter_files(path)]
+    
+    def lyst_files(self, hierarchy: StoreHierarchy):
+        
+        key = self._listing_key(hierarchy)
+        
+        with self._listings_lock:
+            expiration, files = self._listings.get(key, (0, None))
+        
+        if files is not None and expiration > time.time():
+            return files
+        
+        files = self._lyst_files(hierarchy)
+        
+        with self._listings_lock:
+            self._listings[key] = (time.time() + self.compass.listing_ttl, files)
+        
+        return files
+    
+    @instrumented('list')
+    def _lyst_files(self, hierarchy: StoreHierarchy):
+        
+        return list(self.iter_files(hierarchy.join_as_path()))
+    
+    def forget_listing(self, hierarchy: StoreHierarchy):
+        
+        with self._listings_lock:
+            self._listings.pop(self._listing_key(hierarchy), None)
+    
     def make_local_file(self, basename, content):
         work = Workpath.get_tmp()
         work.deploy_text_file(name=basename, content=content)
         path_from = work.join(basename)
         return path_from
 
+    @instrumented('upload')
     def store_files(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec]):
         
+        self.forget_listing(hierarchy)
+        
         for file_spec in file_schema:
             self.LOG.info("Uploading file: {}".format(file_spec.name))
             path_to = hierarchy.join_as_path(file_spec.name)
-            self.upload(path_to, **file_spec.kwargs)
+            
+            if file_spec.is_stream:
+                self.upload_stream(path_to, file_spec.content)
+            else:
+                self.upload(path_to, **file_spec.kwargs)
 
+    @instrumented('download')
     def deploy_files(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec], path_to: str):
         
         for file_spec in file_schema:
@@ -154,6 +425,26 @@ class FileStoreWarehouse(Warehouse, ABC):
                     raise e
                 else:
                     self.LOG.info('Ignoring absent file: {}'.format(file_spec.name))
+    
+    @instrumented('download')
+    def open_file(self, hierarchy: StoreHierarchy, file_name: str):
+        
+        self.LOG.info('Streaming file: {}'.format(file_name))
+        return self.download_stream(hierarchy.join_as_path(file_name))
+    
+    async def store_files_async(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec]):
+        
+        await asyncio.gather(*[  # one request per file, bounded by the event loop's executor
+            run_blocking(self.store_files, hierarchy=hierarchy, file_schema=[file_spec])
+            for file_spec in file_schema
+        ])
+    
+    async def deploy_files_async(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec], path_to: str):
+        
+        await asyncio.gather(*[
+            run_blocking(self.deploy_files, hierarchy=hierarchy, file_schema=[file_spec], path_to=path_to)
+            for file_spec in file_schema
+        ])
 
 
 class ArtifWarehouse(FileStoreWarehouse):
@@ -205,9 +496,26 @@ class ArtifWarehouse(FileStoreWarehouse):
                     out.write(src.read())
         except Exception as e:
             raise NhaStorageError("Download failed. Check if the remote artifact exists in the repository") from e
+    
+    def upload_stream(self, path_to, stream):
+        
+        try:
+            self.format_artif_path(path_to).deploy(stream)
+        except Exception as e:
+            raise NhaStorageError("Upload failed. Check if the artifact´s path is correct") from e
+    
+    def download_stream(self, path_from):
+        
+        try:
+            return self.format_artif_path(path_from).open()
+        except Exception as e:
+            raise NhaStorageError("Download failed. Check if the remote artifact exists in the repository") from e
 
+    @instrumented('delete')
     def delete(self, hierarchy: StoreHierarchy, ignore=False):
         
+        self.forget_listing(hierarchy)
+        
         path = hierarchy.join_as_path()
         uri = self.format_artif_path(path)
         
@@ -227,32 +535,83 @@ class ArtifWarehouse(FileStoreWarehouse):
             else:
                 raise NhaStorageError(message) from e
     
-    def get_download_cmd(self, path_from, path_to, on_board_perspective=True):
+    @instrumented('delete')
+    def delete_files(self, hierarchy: StoreHierarchy, file_names: List[str]):
+        
+        self.forget_listing(hierarchy)
+        
+        for file_name in file_names:
+            self.LOG.info("Removing file: {}".format(file_name))
+            
+            try:
+                self.format_artif_path(hierarchy.join_as_path(file_name)).unlink()
+            except FileNotFoundError:
+                self.LOG.warn("File {} was already absent".format(file_name))
+    
+    def get_download_source(self, path_from, on_board_perspective=True):
         
         if on_board_perspective:
             compass = self.compass_cls(perspective=Perspective.ON_BOARD)
         else:
             compass = self.compass
-
-        curl = "curl {security} -O -u {user}:{pswd} {url}".format(
-            security='' if compass.check_certificate else '--insecure',
+        
+        return DownloadSource(
+            url=str(self.format_artif_path(path_from)),
             user=compass.user,
             pswd=compass.pswd,
-            url=self.format_artif_path(path_from)
+            check_certificate=compass.check_certificate
         )
-
-        move = "mkdir -p {dir} && mv {file} {path_to}".format(
-            dir=os.path.dirname(path_to),
-            file=os.path.basename(path_to),
-            path_to=os.path.dirname(path_to)
-        )
-
-        return ' && '.join([curl, move])
     
-    def lyst(self, path):
-
-        path = self.format_artif_path(path)
-        return [x.name for x in path.iterdir() if not x.is_dir()]
+    def _aql(self, query: str):
+        
+        try:
+            response = requests.post(
+                os.path.join(self.address, 'artifactory', 'api', 'search', 'aql'),
+                data=query,
+                headers={'Content-Type': 'text/plain'},
+                **self.http_kwargs
+            )
+            response.raise_for_status()
+            return response.json().get('results', [])
+        except Exception as e:
+            raise NhaStorageError("Listing from Artifactory failed") from e
+    
+    def iter_files(self, path):
+        
+        criteria = json.dumps({
+            'repo': self.repo,
+            'path': os.path.join(self.section, path).rstrip('/'),
+            'type': 'file'
+        })
+        offset = 0
+        
+        while True:  # one query per page, instead of one request per file
+            page = self._aql(
+                'items.find({criteria}).include("name", "size").sort({{"$asc": ["name"]}}).offset({offset}).limit({limit})'
+                .format(criteria=criteria, offset=offset, limit=self.LISTING_PAGE_SIZE)
+            )
+            
+            for item in page:
+                yield item['name'], item.get('size')
+            
+            if len(page) < self.LISTING_PAGE_SIZE:
+                break
+            
+            offset += self.LISTING_PAGE_SIZE
+    
+    @instrumented('list')
+    def lyst_hierarchies(self):
+        
+        root = self.client.joinpath(self.section)
+        
+        if not root.exists():
+            return []
+        
+        return [
+            StoreHierarchy(parent=parent.name, child=child.name)
+            for parent in root.iterdir() if parent.is_dir()
+            for child in parent.iterdir() if child.is_dir()
+        ]
 
 
 class NexusWarehouse(FileStoreWarehouse):
@@ -311,8 +670,28 @@ class NexusWarehouse(FileStoreWarehouse):
         except Exception as e:
             raise NhaStorageError("Download failed. Check if the remote artifact exists in the repository") from e
     
+    def upload_stream(self, path_to, stream):
+        
+        try:
+            response = requests.put(self.format_nexus_path(path_to), data=stream, **self.http_kwargs)
+            response.raise_for_status()
+        except Exception as e:
+            raise NhaStorageError("Upload failed. Check if the artifact´s path is correct") from e
+    
+    def download_stream(self, path_from):
+        
+        try:
+            response = requests.get(self.format_nexus_path(path_from), stream=True, **self.http_kwargs)
+            response.raise_for_status()
+            return response.raw
+        except Exception as e:
+            raise NhaStorageError("Download failed. Check if the remote artifact exists in the repository") from e
+    
+    @instrumented('delete')
     def delete(self, hierarchy: StoreHierarchy, ignore=False):
         
+        self.forget_listing(hierarchy)
+        
         path = hierarchy.join_as_path()
         uri = os.path.join(self.repo, self.section, path)  # TODO use format_nexus_path function
         del_count = self.client.delete(uri)
@@ -328,32 +707,70 @@ class NexusWarehouse(FileStoreWarehouse):
         else:
             return True
     
-    def get_download_cmd(self, path_from, path_to, on_board_perspective=True):
+    @instrumented('delete')
+    def delete_files(self, hierarchy: StoreHierarchy, file_names: List[str]):
+        
+        self.forget_listing(hierarchy)
+        
+        for file_name in file_names:
+            self.LOG.info("Removing file: {}".format(file_name))
+            uri = os.path.join(self.repo, self.section, hierarchy.join_as_path(file_name))
+            
+            if self.client.delete(uri) == 0:
+                self.LOG.warn("File {} was already absent".format(file_name))
+    
+    def get_download_source(self, path_from, on_board_perspective=True):
         
         if on_board_perspective:
             compass = self.compass_cls(perspective=Perspective.ON_BOARD)
         else:
             compass = self.compass
         
-        curl = "curl {security} -O -u {user}:{pswd} {url}".format(
-            security='' if compass.check_certificate else '--insecure',
+        return DownloadSource(
+            url=str(self.format_nexus_path(path_from)),
             user=compass.user,
             pswd=compass.pswd,
-            url=self.format_nexus_path(path_from)
+            check_certificate=compass.check_certificate
         )
+    
+    def iter_files(self, path):
         
-        move = "mkdir -p {dir} && mv {file} {path_to}".format(
-            dir=os.path.dirname(path_to),
-            file=os.path.basename(path_to),
-            path_to=os.path.dirname(path_to)
-        )
+        url = os.path.join(self.address, 'service', 'rest', 'v1', 'search', 'assets')
+        params = dict(repository=self.repo, group='/' + os.path.join(self.section, path).strip('/'))
         
-        return ' && '.join([curl, move])
+        while True:  # pages are chained by a continuation token
+            try:
+                response = requests.get(url, params=params, **self.http_kwargs)
+                response.raise_for_status()
+                body = response.json()
+            except Exception as e:
+                raise NhaStorageError("Listing from Nexus failed") from e
+            
+            for item in body.get('items', []):
+                yield os.path.basename(item['path']), item.get('fileSize')
+            
+            if not body.get('continuationToken'):
+                break
+            
+            params['continuationToken'] = body['continuationToken']
     
-    def lyst(self, path):
+    @instrumented('list')
+    def lyst_hierarchies(self):
+        
+        found = set()
         
-        path = self.format_nexus_path(path)
-        return self.client.list(path)  # TODO: format list items in order to get only the file names
+        for path in self.client.list(os.path.join(self.repo, self.section)):
+            parts = path.strip('/').split('/')  # e.g.: [repo, section, parent, child, file]
+            
+            if self.section not in parts:
+                continue
+            
+            idx = parts.index(self.section)
+            
+            if len(parts) > idx + 3:
+                found.add((parts[idx + 1], parts[idx + 2]))
+        
+        return [StoreHierarchy(parent=parent, child=child) for parent, child in sorted(found)]
 
 
 class LWWarehouse(Warehouse, ABC):
@@ -401,12 +818,20 @@ class LWWarehouse(Warehouse, ABC):
     
     def _table_depending_wrapper(self, func):
         
-        def wrapper(*args, **kwargs):
-            try:
+        if asyncio.iscoroutinefunction(func):
+            async def wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except self.NO_TABLE_EXC:
+                    self.create_table(**kwargs)
+                return await func(*args, **kwargs)
+        else:
+            def wrapper(*args, **kwargs):
+                try:
+                    return func(*args, **kwargs)
+                except self.NO_TABLE_EXC:
+                    self.create_table(**kwargs)
                 return func(*args, **kwargs)
-            except self.NO_TABLE_EXC:
-                self.create_table(**kwargs)
-            return func(*args, **kwargs)
         
         return wrapper
     
@@ -426,8 +851,12 @@ class LWWarehouse(Warehouse, ABC):
         raise MisusageError(
             "Lightweight store does not support models/datasets without a strict file schema definition"
         )
+    
+    def lyst_files(self, hierarchy: StoreHierarchy):
+        
+        return self.lyst(hierarchy.join_as_path())
 
-    def get_download_cmd(self, path_from, path_to, on_board_perspective=True):
+    def get_download_source(self, path_from, on_board_perspective=True):
         
         raise MisusageError(
             "Lightweight store does not support indirect deployment of models/datasets"
@@ -459,9 +888,19 @@ class CassWarehouse(LWWarehouse):
     
     compass_cls = CassWarehouseCompass
     
+    TRANSIENT_EXC = Warehouse.TRANSIENT_EXC + (OperationTimedOut, Unavailable, ReadTimeout, WriteTimeout, NoHostAvailable)
     NO_KEYSP_EXC = InvalidRequest
     NO_TABLE_EXC = InvalidRequest
     
+    TABLE_NAME = 'file_chunk'
+    LEGACY_TABLE_NAME = LWWarehouse.TABLE_NAME  # one blob per file, kept readable for older versions
+    
+    def __init__(self, **kwargs):
+        
+        self.prepared = {}
+        super().__init__(**kwargs)
+        self.compass: CassWarehouseCompass = self.compass
+    
     def connect(self):
         
         self.client = Cluster(
@@ -493,15 +932,16 @@ class CassWarehouse(LWWarehouse):
         
         self.client.execute(stmt)
     
-    def create_table(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec], *_, **__):
+    def create_table(self, *_, **__):
 
         stmt = """
-            CREATE TABLE {keysp}.{table} (
+            CREATE TABLE IF NOT EXISTS {keysp}.{table} (
                 id_model VARCHAR,
                 id_mover VARCHAR,
                 id_file VARCHAR,
-                file_content BLOB,
-                PRIMARY KEY(id_model, id_mover, id_file)
+                id_chunk INT,
+                chunk BLOB,
+                PRIMARY KEY((id_model, id_mover), id_file, id_chunk)
             )
         """.format(
             keysp=self.keyspace,
@@ -510,100 +950,454 @@ class CassWarehouse(LWWarehouse):
         
         self.client.execute(stmt)
     
-    def delete(self, hierarchy: StoreHierarchy, ignore=False):
-
-        deleted = True
-
-        ids_stmt = """
-            SELECT * FROM {keysp}.{table}
-            WHERE 
-                id_model='{_id_model}'
-            AND id_mover='{_id_mover}'
-        """.format(
-            keysp=self.keyspace,
-            table=self.TABLE_NAME,
-            _id_model=hierarchy.parent,
-            _id_mover=hierarchy.child
+    def prepare(self, stmt: str, table: str = None):
+        
+        stmt = stmt.format(keysp=self.keyspace, table=table or self.TABLE_NAME)
+        
+        if stmt not in self.prepared:
+            self.prepared[stmt] = self.client.prepare(stmt)
+        
+        return self.prepared[stmt]
+    
+    def _has_legacy_table(self):
+        
+        keysp = self.client.cluster.metadata.keyspaces.get(self.keyspace)
+        return keysp is not None and self.LEGACY_TABLE_NAME in keysp.tables
+    
+    def _find_legacy_files(self, hierarchy: StoreHierarchy):
+        
+        try:
+            stmt = self.prepare(
+                "SELECT id_file FROM {keysp}.{table} WHERE id_model=? AND id_mover=?",
+                table=self.LEGACY_TABLE_NAME
+            )
+            return [row.id_file for row in self.client.execute(stmt, (hierarchy.parent, hierarchy.child))]
+        except InvalidRequest:  # legacy table was never created
+            return []
+    
+    def _delete_legacy(self, hierarchy: StoreHierarchy):
+        
+        files = self._find_legacy_files(hierarchy)
+        
+        if len(files) == 0:
+            return False
+        
+        self.LOG.debug("Removing files {} from Cassandra".format(", ".join(files)))
+        stmt = self.prepare(
+            "DELETE FROM {keysp}.{table} WHERE id_model=? AND id_mover=? AND id_file IN ?",
+            table=self.LEGACY_TABLE_NAME
         )
-
-        files = [row.id_file for row in self.client.execute(ids_stmt).current_rows]
-
-        if len(files) == 0 and not ignore:
+        self.client.execute(stmt, (hierarchy.parent, hierarchy.child, files))
+        return True
+    
+    @table_dependent
+    @instrumented('delete')
+    def delete(self, hierarchy: StoreHierarchy, ignore=False):
+        
+        params = (hierarchy.parent, hierarchy.child)
+        find_stmt = self.prepare("SELECT id_file FROM {keysp}.{table} WHERE id_model=? AND id_mover=? LIMIT 1")
+        found = len(self.client.execute(find_stmt, params).current_rows) > 0
+        
+        if found:
+            self.LOG.debug("Removing chunks of '{}' from Cassandra".format(hierarchy.join_as_path()))
+            del_stmt = self.prepare("DELETE FROM {keysp}.{table} WHERE id_model=? AND id_mover=?")
+            self.client.execute(del_stmt, params)
+        
+        found = self._delete_legacy(hierarchy) or found
+        
+        if not found and not ignore:
             self._raise_not_found(hierarchy)
-        elif len(files) == 0 and ignore:
-            deleted = False
-        else:
-            self.LOG.debug("Removing files {} from Cassandra".format(", ".join(files)))
         
-        stmt = """
-            DELETE FROM {keysp}.{table}
-            WHERE
-                id_model='{_id_model}'
-            AND id_mover='{_id_mover}'
-            AND id_file IN ('{_id_file}')
-        """.format(
-            keysp=self.keyspace,
-            table=self.TABLE_NAME,
-            _id_model=hierarchy.parent,
-            _id_mover=hierarchy.child,
-            _id_file="','".join(files) if len(files) > 1 else files[0]
-        )
+        return found
+    
+    @table_dependent
+    @instrumented('list')
+    def lyst_hierarchies(self):
         
-        self.client.execute(stmt)
-
-        return deleted
-
+        stmt = self.prepare("SELECT DISTINCT id_model, id_mover FROM {keysp}.{table}")
+        found = {(row.id_model, row.id_mover) for row in self.client.execute(stmt)}
+        
+        if self._has_legacy_table():  # id_mover is a clustering column there, so it's listed per model
+            models_stmt = self.prepare("SELECT DISTINCT id_model FROM {keysp}.{table}", table=self.LEGACY_TABLE_NAME)
+            movers_stmt = self.prepare(
+                "SELECT id_mover FROM {keysp}.{table} WHERE id_model=?",
+                table=self.LEGACY_TABLE_NAME
+            )
+            
+            for model_row in self.client.execute(models_stmt):
+                found.update(
+                    (model_row.id_model, row.id_mover)
+                    for row in self.client.execute(movers_stmt, (model_row.id_model,))
+                )
+        
+        return [StoreHierarchy(parent=parent, child=child) for parent, child in sorted(found)]
+    
     @table_dependent
+    @instrumented('delete')
+    def delete_files(self, hierarchy: StoreHierarchy, file_names: List[str]):
+        
+        self.LOG.debug("Removing files {} from Cassandra".format(", ".join(file_names)))
+        params = (hierarchy.parent, hierarchy.child)
+        stmt = self.prepare("DELETE FROM {keysp}.{table} WHERE id_model=? AND id_mover=? AND id_file=?")
+        
+        for file_name in file_names:
+            self.client.execute(stmt, params + (file_name,))
+        
+        try:
+            legacy_stmt = self.prepare(
+                "DELETE FROM {keysp}.{table} WHERE id_model=? AND id_mover=? AND id_file IN ?",
+                table=self.LEGACY_TABLE_NAME
+            )
+            self.client.execute(legacy_stmt, params + (file_names,))
+        except InvalidRequest:  # legacy table was never created
+            pass
+    
+    @table_dependent
+    @instrumented('upload')
     def store_files(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec]):
         
-        fields = []
-        values = []
-        stmt = "BEGIN BATCH "
+        params = (hierarchy.parent, hierarchy.child)
+        clear_stmt = self.prepare("DELETE FROM {keysp}.{table} WHERE id_model=? AND id_mover=? AND id_file=?")
+        insert_stmt = self.prepare(
+            "INSERT INTO {keysp}.{table} (id_model, id_mover, id_file, id_chunk, chunk) VALUES (?, ?, ?, ?, ?)"
+        )
         
         for file_spec in file_schema:
-
-            fields.append(file_spec.name)
-            values.append(memoryview(file_spec.get_bytes()))
-
-            stmt += """
-                INSERT INTO {keysp}.{table} (id_model, id_mover, id_file, file_content) 
-                VALUES ('{_id_model}', '{_id_mover}', '{_id_file}', %s); 
-            """.format(
-                keysp=self.keyspace,
-                table=self.TABLE_NAME,
-                _id_model=hierarchy.parent,
-                _id_mover=hierarchy.child,
-                _id_file=file_spec.name
+            self.LOG.debug("Storing as chunks: {}".format(file_spec.name))
+            self.client.execute(clear_stmt, params + (file_spec.name,))  # drop leftovers of a previous upload
+            
+            chunks = (
+                params + (file_spec.name, index, chunk)
+                for index, chunk in enumerate(file_spec.iter_chunks(self.compass.chunk_size))
+            )
+            
+            results = execute_concurrent_with_args(
+                self.client,
+                insert_stmt,
+                chunks,
+                concurrency=self.compass.concurrency,
+                raise_on_first_error=True,
+                results_generator=True
             )
-        stmt += " APPLY BATCH;"
-        self.LOG.debug("Storing as blobs: {}".format(fields))
-        self.client.execute(stmt, values)
+            
+            for _ in results:  # consuming the generator, so that chunks are read lazily
+                pass
+    
+    def execute_async(self, stmt, params=None):
+        
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        
+        def set_result(rows):
+            
+            if not future.done():
+                future.set_result(rows)
+        
+        def set_exception(exc):
+            
+            if not future.done():
+                future.set_exception(exc)
+        
+        response = self.client.execute_async(stmt, params)
+        response.add_callbacks(  # driver callbacks run on the driver's own threads
+            callback=lambda rows: loop.call_soon_threadsafe(set_result, rows),
+            errback=lambda exc: loop.call_soon_threadsafe(set_exception, exc)
+        )
+        return future
     
     @table_dependent
-    def deploy_files(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec], path_to: str):
-
-        stmt = """
-            SELECT * FROM {keysp}.{table}
-            WHERE 
-                id_model='{_id_model}'
-            AND id_mover='{_id_mover}'
-        """.format(
-            keysp=self.keyspace,
-            table=self.TABLE_NAME,
-            _id_model=hierarchy.parent,
-            _id_mover=hierarchy.child
+    @instrumented('upload')
+    async def store_files_async(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec]):
+        
+        params = (hierarchy.parent, hierarchy.child)
+        clear_stmt = self.prepare("DELETE FROM {keysp}.{table} WHERE id_model=? AND id_mover=? AND id_file=?")
+        insert_stmt = self.prepare(
+            "INSERT INTO {keysp}.{table} (id_model, id_mover, id_file, id_chunk, chunk) VALUES (?, ?, ?, ?, ?)"
+        )
+        semaphore = asyncio.Semaphore(self.compass.concurrency)
+        
+        async def insert(chunk_params):
+            
+            async with semaphore:
+                await self.execute_async(insert_stmt, chunk_params)
+        
+        for file_spec in file_schema:
+            self.LOG.debug("Storing as chunks: {}".format(file_spec.name))
+            await self.execute_async(clear_stmt, params + (file_spec.name,))
+            pending = set()
+            
+            for index, chunk in enumerate(file_spec.iter_chunks(self.compass.chunk_size)):
+                pending.add(asyncio.ensure_future(insert(params + (file_spec.name, index, chunk))))
+                
+                if len(pending) >= self.compass.concurrency:  # keeps a bounded number of chunks in memory
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    
+                    for task in done:
+                        task.result()  # raising errors, if any
+            
+            await asyncio.gather(*pending)
+    
+    @table_dependent
+    @instrumented('delete')
+    async def delete_async(self, hierarchy: StoreHierarchy, ignore=False):
+        
+        params = (hierarchy.parent, hierarchy.child)
+        find_stmt = self.prepare("SELECT id_file FROM {keysp}.{table} WHERE id_model=? AND id_mover=? LIMIT 1")
+        found = len(await self.execute_async(find_stmt, params) or []) > 0  # first page of rows
+        
+        if found:
+            self.LOG.debug("Removing chunks of '{}' from Cassandra".format(hierarchy.join_as_path()))
+            del_stmt = self.prepare("DELETE FROM {keysp}.{table} WHERE id_model=? AND id_mover=?")
+            await self.execute_async(del_stmt, params)
+        
+        found = await run_blocking(self._delete_legacy, hierarchy) or found
+        
+        if not found and not ignore:
+            self._raise_not_found(hierarchy)
+        
+        return found
+    
+    def _deploy_legacy(self, hierarchy: StoreHierarchy, path_to: str, file_names: List[str] = None):
+        
+        legacy_files = [f for f in self._find_legacy_files(hierarchy) if file_names is None or f in file_names]
+        
+        if len(legacy_files) == 0:
+            return False
+        
+        stmt = self.prepare(
+            "SELECT id_file, file_content FROM {keysp}.{table} WHERE id_model=? AND id_mover=? AND id_file IN ?",
+            table=self.LEGACY_TABLE_NAME
         )
+        stmt = stmt.bind((hierarchy.parent, hierarchy.child, legacy_files))
+        stmt.fetch_size = 1
+        
+        for row in self.client.execute(stmt):
+            self.LOG.debug('Deploying file: {}'.format(row.id_file))
+            
+            with open(os.path.join(path_to, row.id_file), 'wb') as f:
+                f.write(row.file_content)
+        
+        return True
+    
+    @table_dependent
+    @instrumented('download')
+    def deploy_files(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec], path_to: str):
+        
+        file_names = None if not file_schema else [f.name for f in file_schema]
+        
+        if file_names is None:
+            stmt = self.prepare("SELECT id_file, chunk FROM {keysp}.{table} WHERE id_model=? AND id_mover=?")
+            stmt = stmt.bind((hierarchy.parent, hierarchy.child))
+        else:  # only the requested files are read from the partition
+            stmt = self.prepare(
+                "SELECT id_file, chunk FROM {keysp}.{table} WHERE id_model=? AND id_mover=? AND id_file IN ?"
+            )
+            stmt = stmt.bind((hierarchy.parent, hierarchy.child, file_names))
+        
+        stmt.fetch_size = self.compass.concurrency  # bounds the number of chunks held in memory
+        current_file, out = None, None
+        
+        try:
+            for row in self.client.execute(stmt):  # pages are fetched as the iteration goes on
+                if row.id_file != current_file:
+                    if out is not None:
+                        out.close()
+                    
+                    self.LOG.debug('Deploying file: {}'.format(row.id_file))
+                    current_file = row.id_file
+                    out = open(os.path.join(path_to, current_file), 'wb')
+                
+                out.write(row.chunk or b'')
+        finally:
+            if out is not None:
+                out.close()
+        
+        if current_file is None and not self._deploy_legacy(hierarchy, path_to, file_names):
+            self._raise_not_found(hierarchy)
+    
+    @table_dependent
+    @instrumented('download')
+    def open_file(self, hierarchy: StoreHierarchy, file_name: str):
+        
+        params = (hierarchy.parent, hierarchy.child, file_name)
+        stmt = self.prepare("SELECT chunk FROM {keysp}.{table} WHERE id_model=? AND id_mover=? AND id_file=?")
+        stmt = stmt.bind(params)
+        stmt.fetch_size = self.compass.concurrency
+        rows = iter(self.client.execute(stmt))
+        first = next(rows, None)
+        
+        if first is not None:
+            return IterStream(row.chunk or b'' for row in itertools.chain([first], rows))
+        
+        if file_name in self._find_legacy_files(hierarchy):
+            stmt = self.prepare(
+                "SELECT file_content FROM {keysp}.{table} WHERE id_model=? AND id_mover=? AND id_file=?",
+                table=self.LEGACY_TABLE_NAME
+            )
+            return IterStream([self.client.execute(stmt, params).one().file_content])
+        
+        self._raise_not_found(hierarchy)
 
-        rows = self.client.execute(stmt).current_rows
 
-        if len(rows) == 0:
+class SqliteWarehouse(LWWarehouse):
+    
+    """Lightweight store on an embedded SQLite file, meant for single-node installs"""
+    
+    compass_cls = SqliteWarehouseCompass
+    
+    NO_KEYSP_EXC = sqlite3.OperationalError
+    NO_TABLE_EXC = sqlite3.OperationalError
+    
+    TABLE_NAME = 'file_chunk'  # files are split in rows of chunk_kb, since incremental blob I/O needs Python 3.11
+    
+    def __init__(self, **kwargs):
+        
+        self.local = threading.local()  # sqlite connections must not be shared between threads
+        super().__init__(**kwargs)
+        self.compass: SqliteWarehouseCompass = self.compass
+    
+    @property
+    def connection(self):
+        
+        conn = getattr(self.local, 'conn', None)
+        
+        if conn is None:
+            conn = sqlite3.connect(self.compass.path, timeout=self.compass.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")  # readers are never blocked by a writer
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        
+        return conn
+    
+    def connect(self):
+        
+        self.create_keyspace()
+        self.client = self.connection
+        self.create_table()
+    
+    def create_keyspace(self):
+        
+        pathlib.Path(os.path.dirname(self.compass.path)).mkdir(parents=True, exist_ok=True)
+    
+    def create_table(self, *_, **__):
+        
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id_model TEXT NOT NULL,
+                id_mover TEXT NOT NULL,
+                id_file TEXT NOT NULL,
+                id_chunk INTEGER NOT NULL,
+                content BLOB NOT NULL,
+                PRIMARY KEY (id_model, id_mover, id_file, id_chunk)
+            )
+        """.format(table=self.TABLE_NAME))
+    
+    @contextmanager
+    def transaction(self):
+        
+        conn = self.connection
+        conn.execute("BEGIN IMMEDIATE")
+        
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+    
+    def _find_files(self, hierarchy: StoreHierarchy, file_names: List[str] = None):
+        
+        stmt = "SELECT DISTINCT id_file FROM {table} WHERE id_model=? AND id_mover=?".format(table=self.TABLE_NAME)
+        rows = self.connection.execute(stmt, (hierarchy.parent, hierarchy.child)).fetchall()
+        return [id_file for id_file, in rows if file_names is None or id_file in file_names]
+    
+    def _iter_chunks(self, hierarchy: StoreHierarchy, file_name: str):
+        
+        """Fetches one chunk per query, so that memory usage stays bounded and any thread can consume it"""
+        
+        stmt = "SELECT content FROM {table} WHERE id_model=? AND id_mover=? AND id_file=? AND id_chunk=?".format(
+            table=self.TABLE_NAME)
+        id_chunk = 0
+        
+        while True:
+            row = self.connection.execute(stmt, (hierarchy.parent, hierarchy.child, file_name, id_chunk)).fetchone()
+            
+            if row is None:
+                break
+            
+            yield row[0]
+            id_chunk += 1
+    
+    @instrumented('delete')
+    def delete(self, hierarchy: StoreHierarchy, ignore=False):
+        
+        with self.transaction() as conn:
+            stmt = "DELETE FROM {table} WHERE id_model=? AND id_mover=?".format(table=self.TABLE_NAME)
+            found = conn.execute(stmt, (hierarchy.parent, hierarchy.child)).rowcount > 0
+        
+        if not found and not ignore:
             self._raise_not_found(hierarchy)
-
-        for row in rows:
-            self.LOG.debug('Deploying file: {}'.format(row.id_file))
-            write_path = os.path.join(path_to, row.id_file)
-            bites = row.file_content
-            open(write_path, 'wb').write(bites)
+        
+        return found
+    
+    @instrumented('list')
+    def lyst_hierarchies(self):
+        
+        stmt = "SELECT DISTINCT id_model, id_mover FROM {table} ORDER BY id_model, id_mover".format(table=self.TABLE_NAME)
+        return [StoreHierarchy(parent=parent, child=child) for parent, child in self.connection.execute(stmt)]
+    
+    @instrumented('delete')
+    def delete_files(self, hierarchy: StoreHierarchy, file_names: List[str]):
+        
+        self.LOG.debug("Removing files {} from SQLite".format(", ".join(file_names)))
+        
+        with self.transaction() as conn:
+            stmt = "DELETE FROM {table} WHERE id_model=? AND id_mover=? AND id_file=?".format(table=self.TABLE_NAME)
+            conn.executemany(stmt, [(hierarchy.parent, hierarchy.child, name) for name in file_names])
+    
+    @instrumented('upload')
+    def store_files(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec]):
+        
+        clear = "DELETE FROM {table} WHERE id_model=? AND id_mover=? AND id_file=?".format(table=self.TABLE_NAME)
+        insert = """
+            INSERT INTO {table} (id_model, id_mover, id_file, id_chunk, content)
+            VALUES (?, ?, ?, ?, ?)
+        """.format(table=self.TABLE_NAME)
+        
+        for file_spec in file_schema:
+            self.LOG.debug("Storing in chunks: {}".format(file_spec.name))
+            params = (hierarchy.parent, hierarchy.child, file_spec.name)
+            
+            with self.transaction() as conn:  # readers keep seeing the previous version until the file is complete
+                conn.execute(clear, params)
+                
+                for id_chunk, chunk in enumerate(file_spec.iter_chunks(self.compass.chunk_size)):
+                    conn.execute(insert, params + (id_chunk, bytes(chunk)))
+    
+    @instrumented('download')
+    def deploy_files(self, hierarchy: StoreHierarchy, file_schema: List[FileSpec], path_to: str):
+        
+        file_names = None if not file_schema else [f.name for f in file_schema]
+        found = self._find_files(hierarchy, file_names)
+        
+        if len(found) == 0:
+            self._raise_not_found(hierarchy)
+        
+        for id_file in found:
+            self.LOG.debug('Deploying file: {}'.format(id_file))
+            
+            with open(os.path.join(path_to, id_file), 'wb') as out:
+                for chunk in self._iter_chunks(hierarchy, id_file):
+                    out.write(chunk)
+    
+    @instrumented('download')
+    def open_file(self, hierarchy: StoreHierarchy, file_name: str):
+        
+        if len(self._find_files(hierarchy, [file_name])) == 0:
+            self._raise_not_found(hierarchy)
+        
+        return IterStream(self._iter_chunks(hierarchy, file_name))
 
 
 def get_warehouse(lightweight=False, **kwargs) -> Warehouse:
@@ -613,7 +1407,7 @@ def get_warehouse(lightweight=False, **kwargs) -> Warehouse:
     
     cls_lookup = {
         'std': {'artif': ArtifWarehouse, 'nexus': NexusWarehouse},
-        'lw': {'cass': CassWarehouse}
+        'lw': {'cass': CassWarehouse, 'sqlite': SqliteWarehouse}
     }.get('lw' if lightweight else 'std')
     
     try:
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# Copyright Noronha Development Team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import click
+
+from noronha.api.bulk import BulkAPI as API
+from noronha.cli.handler import CMD
+from noronha.common.constants import WarehouseConst
+
+
+@click.group()
+def bulk():
+    
+    """Storage operations over many datasets and model versions at once"""
+
+
+@click.command()
+@click.option(
+    '--dataset', '--ds', 'datasets', multiple=True, help=
+    """Reference to a dataset, optionally followed by file patterns. Use * as name for all datasets of a model. """
+    """Syntax: <model_name>:<dataset_name>[:<pattern>,...]. Example: iris-clf:*:*.csv"""
+)
+@click.option(
+    '--movers', '--mv', 'movers', multiple=True, help=
+    """Reference to a model version, optionally followed by file patterns. Use * as name for all versions of a model. """
+    """Syntax: <model_name>:<version_name>[:<pattern>,...]. Example: word2vec:en-us-v1"""
+)
+@click.option(
+    '--path', '-p',
+    help="Directory under which each dataset or model version gets its own directory (default: current working directory)"
+)
+@click.option(
+    '--concurrency', '-c', default=WarehouseConst.BULK_CONCURRENCY, type=int,
+    help="Max number of datasets and model versions handled at once (default: {})".format(WarehouseConst.BULK_CONCURRENCY)
+)
+def deploy(datasets, movers, **kwargs):
+    
+    """Download the files of many datasets and model versions"""
+    
+    CMD.run(API, 'deploy', datasets=list(datasets), movers=list(movers), **kwargs)
+
+
+@click.command()
+@click.option(
+    '--dataset', '--ds', 'datasets', multiple=True, help=
+    """Reference to a dataset. Use * as name for all datasets of a model. """
+    """Syntax: <model_name>:<dataset_name>. Example: iris-clf:*"""
+)
+@click.option(
+    '--movers', '--mv', 'movers', multiple=True, help=
+    """Reference to a model version. Use * as name for all versions of a model. """
+    """Syntax: <model_name>:<version_name>. Example: word2vec:en-us-v1"""
+)
+@click.option(
+    '--concurrency', '-c', default=WarehouseConst.BULK_CONCURRENCY, type=int,
+    help="Max number of datasets and model versions handled at once (default: {})".format(WarehouseConst.BULK_CONCURRENCY)
+)
+def rm(datasets, movers, **kwargs):
+    
+    """Remove many datasets and model versions along with their files"""
+    
+    CMD.run(API, 'rm', datasets=list(datasets), movers=list(movers), **kwargs)
+
+
+commands = [deploy, rm]
+
+for cmd in commands:
+    bulk.add_command(cmd)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# Copyright Noronha Development Team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import click
+
+from noronha.api.gc import GarbageCollectorAPI as API
+from noronha.cli.handler import CMD
+from noronha.common.constants import WarehouseConst
+
+
+@click.group()
+def gc():
+    
+    """Garbage collection of stored datasets, model versions and shared volumes"""
+
+
+@click.command()
+@click.option('--model', '-m', help="Only apply retention to this model (default: all models)")
+@click.option(
+    '--keep-last', '-k', default=WarehouseConst.GC_KEEP_LAST, type=int,
+    help="Number of most recent versions kept per model (default: {})".format(WarehouseConst.GC_KEEP_LAST)
+)
+@click.option('--datasets', '--ds', default=False, is_flag=True, help="Flag: also apply retention to datasets")
+@click.option('--dry-run', default=False, is_flag=True, help="Flag: only show what would be removed")
+@click.option(
+    '--concurrency', '-c', default=WarehouseConst.BULK_CONCURRENCY, type=int,
+    help="Max number of purges running at once (default: {})".format(WarehouseConst.BULK_CONCURRENCY)
+)
+@click.option(
+    '--batch-size', default=WarehouseConst.GC_BATCH_SIZE, type=int,
+    help="Records removed from the database at once (default: {})".format(WarehouseConst.GC_BATCH_SIZE)
+)
+def retention(**kwargs):
+    
+    """Remove old model versions (and datasets), except the ones still referenced"""
+    
+    CMD.run(API, 'retention', **kwargs)
+
+
+@click.command()
+@click.option('--dry-run', default=False, is_flag=True, help="Flag: only show which orphaned files would be removed")
+@click.option(
+    '--concurrency', '-c', default=WarehouseConst.BULK_CONCURRENCY, type=int,
+    help="Max number of deletions running at once (default: {})".format(WarehouseConst.BULK_CONCURRENCY)
+)
+def orphans(**kwargs):
+    
+    """Remove stored files that no longer belong to any dataset or model version"""
+    
+    CMD.run(API, 'orphans', **kwargs)
+
+
+@click.command()
+@click.option('--dry-run', default=False, is_flag=True, help="Flag: only show which shared volumes would be removed")
+@click.option(
+    '--concurrency', '-c', default=WarehouseConst.BULK_CONCURRENCY, type=int,
+    help="Max number of removals running at once (default: {})".format(WarehouseConst.BULK_CONCURRENCY)
+)
+def volumes(**kwargs):
+    
+    """Remove shared dataset and model volumes that are not mounted by any container"""
+    
+    CMD.run(API, 'volumes', **kwargs)
+
+
+commands = [retention, orphans, volumes]
+
+for cmd in commands:
+    gc.add_command(cmd)
@@ -19,6 +19,7 @@ from types import GeneratorType
 
 from noronha.api.main import NoronhaAPI
 from noronha.api.utils import ProjResolver
+from noronha.bay.metrics import METRICS
 from noronha.common.annotations import Interactive
 from noronha.common.constants import Flag
 from noronha.common.errors import PrettyError
@@ -56,6 +57,9 @@ class CommandHandler(Interactive):
             code = 1
             cls.show_exception(e)
         finally:
+            if LOG.debug_mode and len(METRICS.records) > 0:
+                LOG.profile(dict(transfers=METRICS.summary()))
+            
             if LOG.debug_mode and error is not None:
                 raise error
             else:
@@ -18,9 +18,11 @@ import click
 import pkg_resources
 
 from noronha.api.island import IslandAPI
+from noronha.cli.bulk import bulk
 from noronha.cli.bvers import bvers
 from noronha.cli.depl import depl
 from noronha.cli.ds import ds
+from noronha.cli.gc import gc
 from noronha.cli.handler import CommandHandler as CMD
 from noronha.cli.isle import isle
 from noronha.cli.model import model
@@ -83,9 +85,11 @@ def get_me_started(**kwargs):
 
 
 commands = [
+    bulk,
     bvers,
     depl,
     ds,
+    gc,
     isle,
     model,
     note,
@@ -85,7 +85,7 @@ def _list(_filter, expand, **kwargs):
 )
 @click.option(
     '--compress', '-c', 'compressed', default=False, is_flag=True,
-    help="Flag: compress all model files to a single tar.gz archive"
+    help="Flag: compress all model files to a single archive (codec set in file_store.compression)"
 )
 @click.option('--skip-upload', default=False, is_flag=True, help="Flag: don't upload any files, just record metadata")
 @click.option('--lightweight', '--lw', 'lightweight', default=False, is_flag=True, help="Flag: use lightweight storage")
@@ -121,7 +121,11 @@ def new(details, path=None, **kwargs):
 )
 @click.option(
     '--compress', '-c', 'compressed', default=False, is_flag=True,
-    help="Flag: compress all model files to a single tar.gz archive"
+    help="Flag: compress all model files to a single archive (codec set in file_store.compression)"
+)
+@click.option(
+    '--dry-run', default=False, is_flag=True,
+    help="Flag: only show which files would be uploaded or removed and how many bytes would move"
 )
 def update(details, path=None, **kwargs):
     
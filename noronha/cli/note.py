@@ -49,13 +49,13 @@ from noronha.common.parser import kv_list_to_dict
 )
 @click.option(
     '--dataset', '--ds', 'datasets',  multiple=True, help=
-    """Reference to a dataset to be mounted on the IDE's container. """
-    """Syntax: <model_name>:<dataset_name>. Example: iris-clf:iris-data-v0"""
+    """Reference to a dataset to be mounted on the IDE's container, optionally followed by file patterns. """
+    """Syntax: <model_name>:<dataset_name>[:<pattern>,...]. Example: iris-clf:iris-data-v0:*.csv"""
 )
 @click.option(
     '--movers', '--mv', 'movers',  multiple=True, help=
     """Reference to a model version to be mounted on the IDE's container. """
-    """Syntax: <model_name>:<version_name>. Example: word2vec:en-us-v1"""
+    """Syntax: <model_name>:<version_name>[:<pattern>,...]. Example: word2vec:en-us-v1"""
 )
 @click.option(
     '--resource-profile', '--rp', 'resource_profile', help=
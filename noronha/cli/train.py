@@ -98,13 +98,13 @@ def _list(_filter, expand, **kwargs):
 )
 @click.option(
     '--dataset', '--ds', 'datasets',  multiple=True, help=
-    """Reference to a dataset to be mounted on the training container. """
-    """Syntax: <model_name>:<dataset_name>. Example: iris-clf:iris-data-v0"""
+    """Reference to a dataset to be mounted on the training container, optionally followed by file patterns. """
+    """Syntax: <model_name>:<dataset_name>[:<pattern>,...]. Example: iris-clf:iris-data-v0:*.csv"""
 )
 @click.option(
     '--pretrained', 'movers',  multiple=True, help=
     """Reference to a model version that will be used as a pre-trained model during this training. """
-    """Syntax: <model_name>:<version_name>. Example: word2vec:en-us-v1"""
+    """Syntax: <model_name>:<version_name>[:<pattern>,...]. Example: word2vec:en-us-v1"""
 )
 @click.option(
     '--resource-profile', '--rp', 'resource_profile', help=
@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import random
 import sys
 import time
 from abc import ABC, abstractmethod
@@ -171,22 +172,75 @@ class Relaxed(object):
 
 class Patient(object):
     
-    def __init__(self, timeout: int):
+    BACKOFF_START = 0.1  # seconds before the first retry
+    BACKOFF_MAX = 2  # longest interval between retries, in seconds
+    
+    def __init__(self, timeout: int = None, min_attempts: int = 1):
+        
+        """Retries the methods marked as patient until they succeed
         
+        :param timeout: Seconds during which a failing method is retried. None means that there is no deadline,
+            so the method is retried until it succeeds. Zero means that the method is not retried at all.
+        :param min_attempts: Number of times a failing method is called even if the deadline has passed,
+            which is meant for methods whose single call may take longer than the timeout by itself.
+        """
+        
+        assert timeout is None or timeout >= 0, MisusageError("Timeout must not be negative: {}".format(timeout))
+        assert min_attempts >= 1, MisusageError("At least one attempt is required: {}".format(min_attempts))
         self.timeout = timeout
+        self.min_attempts = min_attempts
+    
+    def deadline(self):
+        
+        """Moment after which nothing else is retried, or None if there is no deadline"""
+        
+        return None if self.timeout is None else time.time() + self.timeout
+    
+    def waiting_msg(self, doing: str):
+        
+        if self.timeout is None:
+            return "Waiting {}".format(doing)
+        else:
+            return "Waiting up to {} seconds {}".format(self.timeout, doing)
+    
+    def backoff(self, deadline: float = None):
+        
+        """Yields exponentially growing sleep intervals with jitter, until the deadline is reached (never if None)"""
+        
+        delay = self.BACKOFF_START
+        
+        while True:
+            remaining = None if deadline is None else deadline - time.time()
+            
+            if remaining is None:
+                yield delay*random.uniform(0.5, 1)
+            elif remaining > 0:
+                yield min(delay*random.uniform(0.5, 1), remaining)
+            else:
+                return
+            
+            delay = min(delay*2, self.BACKOFF_MAX)
     
     def _patience_wrapper(self, func):
         
         def wrapper(*args, **kwargs):
-            for attempt in range(self.timeout):
+            intervals = self.backoff(deadline=self.deadline())
+            attempts = 0
+            
+            while True:
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    attempt += 1
-                    if attempt < self.timeout:
-                        if attempt == 1 and isinstance(e, PatientError):
+                    attempts += 1
+                    interval = next(intervals, None)
+                    
+                    if interval is None and attempts < self.min_attempts:  # the deadline has passed
+                        interval = self.BACKOFF_START
+                    
+                    if interval is not None:
+                        if attempts == 1 and isinstance(e, PatientError):
                             e.wait_callback()
-                        time.sleep(1)
+                        time.sleep(interval)
                     else:
                         if isinstance(e, PatientError):
                             e.raise_callback()
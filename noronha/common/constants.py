@@ -101,7 +101,7 @@ class DBConst(object):
     MAX_DESC_LEN = 512
     MAX_REPO_LEN = 512
     MAX_EXPAND_DEPTH = 4
-    MAX_MB_LW_FILE = 10  # max megabytes for a model or dataset file to be considered lightweight
+    MAX_MB_LW_FILE = 256  # max megabytes for a model or dataset file to be considered lightweight
 
 
 class IslandConst(object):
@@ -114,6 +114,13 @@ class IslandConst(object):
     ROUTER = 'router'
     CASS = 'cass'
     ESSENTIAL = [ARTIF, MONGO]
+    DEPENDENCIES = {  # plugins that must be running before each plugin is launched
+        ARTIF: [],
+        NEXUS: [],
+        MONGO: [],
+        CASS: [],
+        ROUTER: [MONGO]
+    }
 
 
 class WarehouseConst(object):
@@ -122,6 +129,9 @@ class WarehouseConst(object):
     
     MAX_FILE_NAME_LEN = 64
     MAX_FILE_SIZE_MB = 2048
+    BULK_CONCURRENCY = 8  # default number of barrel operations running at once in bulk commands
+    GC_KEEP_LAST = 5  # default number of most recent model versions (or datasets) kept per model
+    GC_BATCH_SIZE = 50  # records deleted from the database at once during garbage collection
     
     class Types(object):
         
@@ -130,6 +140,7 @@ class WarehouseConst(object):
         ARTIF = IslandConst.ARTIF
         NEXUS = IslandConst.NEXUS
         CASS = IslandConst.CASS
+        SQLITE = 'sqlite'
     
     class Section(object):
         
@@ -138,6 +149,15 @@ class WarehouseConst(object):
         MODELS = 'models'
         NOTES = 'notebooks'
         DATASETS = 'datasets'
+    
+    class Codecs(object):
+        
+        """Compression codecs for packing files into a single archive"""
+        
+        GZ = 'gz'
+        ZSTD = 'zstd'
+        LZ4 = 'lz4'
+        LEGACY = GZ  # versions compressed before codecs were recorded
 
 
 class EnvVar(object):
@@ -147,6 +167,9 @@ class EnvVar(object):
     ON_BOARD = 'AM_I_ON_BOARD'
     OPEN_SEA = 'IS_IT_OPEN_SEA'
     CONTAINER_PURPOSE = 'CONTAINER_PURPOSE'
+    ON_BOARD_ROOT = 'NHA_ON_BOARD_ROOT'  # directory that stands for the container's filesystem root
+    TASK_ID = 'NHA_TASK_ID'  # overrides the hostname as the identifier of a task
+    PORT_MAPPING = 'NHA_PORT_{}'  # host port to be bound instead of the given container port
 
 
 class DateFmt(object):
@@ -213,16 +236,18 @@ class OnBoard(object):
     
     """Paths and files inside a managed container"""
     
-    NHA_HOME = '/nha'
+    ROOT = os.environ.get(EnvVar.ON_BOARD_ROOT, '/')  # only set when running as a local process
+    NHA_HOME = os.path.join(ROOT, 'nha')
     SHARED_DATA_DIR = os.path.join(NHA_HOME, 'data')
     SHARED_MODEL_DIR = os.path.join(NHA_HOME, 'model')
     META_DIR = os.path.join(NHA_HOME, 'meta')
     CONF_DIR = os.path.join(NHA_HOME, 'conf')
-    LOCAL_DATA_DIR = os.path.join('/data')
-    LOCAL_MODEL_DIR = os.path.join('/model')
-    APP_HOME = '/app'
-    LOG_DIR = '/logs'
-    ENTRYPOINT = '/entrypoint.sh'
+    LOCAL_DATA_DIR = os.path.join(ROOT, 'data')
+    LOCAL_MODEL_DIR = os.path.join(ROOT, 'model')
+    APP_HOME = os.path.join(ROOT, 'app')
+    LOG_DIR = os.path.join(ROOT, 'logs')
+    LW_STORE_DIR = os.path.join(ROOT, 'lightweight')  # host directory of the embedded lightweight store
+    ENTRYPOINT = os.path.join(ROOT, 'entrypoint.sh')
     
     class Meta(object):
         
@@ -272,6 +297,7 @@ class Package(object):
     SETUP = os.path.join(BASE, 'setup.py')
     RESOURCES = os.path.join(BASE, 'resources')
     CONF = os.path.join(RESOURCES, Config.FILE)
+    ENTRYPOINT = os.path.join(RESOURCES, 'entrypoint.sh')
     SH = os.path.join(RESOURCES, 'sh')
     ISLE = os.path.join(RESOURCES, 'isle')  # source files for creating plugins
     TESTS = os.path.join(RESOURCES, 'tests')
@@ -286,6 +312,8 @@ class HostUser(object):
     NHA = os.path.join(HOME, '.nha')
     LOG_DIR = os.path.join(NHA, 'logs')
     CONF = os.path.join(NHA, Config.FILE)
+    LOCAL_MANAGER = os.path.join(NHA, 'local')  # volumes and processes of the local container manager
+    GIT_MIRRORS = os.path.join(NHA, 'git')  # shallow mirrors of the repositories that images are built from
 
 
 class LoggerConst(object):
@@ -327,7 +355,13 @@ class DockerConst(object):
     HANG_CMD = ['tail', '-F', Paths.DEVNULL]
     MULE_CMD = HANG_CMD
     MULE_IMG = 'appropriate/curl:{}'.format(LATEST)
+    MULE_POOL = 'nha-pool'  # alias of the long-lived mules that are reused by volume operations
+    MULE_CLOCK = '/tmp/.nha-mule-clock'  # touched whenever a mule is used, so that idle mules can quit
     STG_MOUNT = '/staging'
+    CACHED_VOL = 'nha-cached'  # prefix of read-only volumes that are named after their contents and shared
+    VOL_SEAL = '.nha-sealed'  # written into a shared volume once it is completely loaded
+    VOL_CLAIM = '.nha-claimed'  # created atomically by the only command that loads a shared volume
+    VOL_CLAIM_TTL = 60  # seconds after which a claim that is no longer refreshed is taken over
     
     class BuildSource(object):
         
@@ -340,6 +374,7 @@ class DockerConst(object):
         
         KUBE = 'kube'
         SWARM = 'swarm'
+        LOCAL = 'local'
     
     class Section(object):
         
@@ -361,6 +396,20 @@ class KubeConst(object):
 
     ALL_SVC_TYPES = [CLUSTER_IP, NODE_PORT, LOAD_BALANCER]
 
+    SPEC_HASH = 'noronha/spec-hash'  # annotation with a digest of the deployment that was last applied
+    CONTENTS_HASH = 'noronha/contents-hash'  # annotation with a digest of the files in the pods' volumes
+    IMAGE_ID = 'noronha/image-id'
+
+    class Phase(object):
+
+        """Pod phases, as reported by the Kubernetes API"""
+
+        PENDING = 'Pending'
+        RUNNING = 'Running'
+        SUCCEEDED = 'Succeeded'
+        FAILED = 'Failed'
+        END_PHASES = [SUCCEEDED, FAILED]
+
 
 class WebServerConst(object):
 
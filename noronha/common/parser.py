@@ -79,6 +79,17 @@ def cape_list(lyst: List[str], max_chars: int = 100):
     return lyst[:max_chars] + suffix
 
 
+def split_file_filter(ref: str, n_parts: int = 2):
+    
+    # e.g.: 'iris-clf:iris-data-v0:*.csv,meta.json' -> ('iris-clf:iris-data-v0', ['*.csv', 'meta.json'])
+    parts = ref.split(':', n_parts)
+    
+    if len(parts) > n_parts and parts[n_parts]:
+        return ':'.join(parts[:n_parts]), parts[n_parts].split(',')
+    else:
+        return ':'.join(parts[:n_parts]), None
+
+
 def kv_list_to_dict(x: list):
     
     return dict([
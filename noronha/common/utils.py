@@ -14,6 +14,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import functools
 import os
 import shutil
 
@@ -33,6 +35,12 @@ def is_it_open_sea():
     return os.environ.get(EnvVar.OPEN_SEA, False)
 
 
+async def run_blocking(func, *args, **kwargs):
+    
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
 class FsHelper(object):
 
     def __init__(self, path: str):
@@ -43,6 +43,7 @@ class EmbeddedBuildVersion(SmartEmbeddedDoc):
     proj = EmbeddedDocumentField(EmbeddedProject, default=None)
     docker_id = StringField()
     git_version = StringField()
+    fingerprint = StringField()
     built_at = DateTimeField()
 
 
@@ -56,6 +57,7 @@ class BuildVersion(SmartDoc):
     proj = ReferenceField(Project, required=True, reverse_delete_rule=CASCADE)
     docker_id = StringField(required=True)
     git_version = StringField()
+    fingerprint = StringField(default=None)  # digest of the build context, base images and framework version
     built_at = DateTimeField(required=True)
     built_from = StringField(required=True)
     
@@ -58,10 +58,16 @@ class Deployment(SmartDoc):
     
     def clean_tasks(self):
         
-        from noronha.bay.captain import get_captain  # lazy import
+        from noronha.bay.captain import get_shared_captain  # lazy import
         
         task_ids = self.tasks.keys()
-        alive_tasks = get_captain(section=DockerConst.Section.DEPL).list_cont_or_pod_ids()
+        
+        if len(task_ids) == 0:
+            return
+        
+        alive_tasks = get_shared_captain(section=DockerConst.Section.DEPL).list_task_ids(
+            '{}-{}-{}'.format(DockerConst.Section.DEPL, self.proj.name, self.name)
+        )
         
         for task_id in list(task_ids):
             if self.tasks[task_id]['state'] in Task.State.END_STATES or task_id not in alive_tasks:
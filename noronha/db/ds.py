@@ -22,6 +22,7 @@ from mongoengine.fields import *
 
 from noronha.db.main import SmartDoc, SmartEmbeddedDoc
 from noronha.db.model import Model, EmbeddedModel
+from noronha.db.utils import ManifestEntry
 from noronha.common.constants import DBConst, OnBoard
 
 
@@ -38,8 +39,12 @@ class EmbeddedDataset(SmartEmbeddedDoc):
     model = EmbeddedDocumentField(EmbeddedModel, default=None)
     stored = BooleanField(default=True)
     compressed = BooleanField(default=False)
+    codec = StringField(default=None)
     details = DictField(default={})
     lightweight = BooleanField(default=False)
+    manifest = ListField(EmbeddedDocumentField(ManifestEntry), default=[])
+    archive_size = LongField(default=None)  # bytes
+    sha256 = StringField(default=None)  # digest of the manifest, for verification and deduplication
 
 
 class Dataset(SmartDoc, ProtoDataset):
@@ -52,5 +57,9 @@ class Dataset(SmartDoc, ProtoDataset):
     model = ReferenceField(Model, required=True, reverse_delete_rule=CASCADE)
     stored = BooleanField(default=True)
     compressed = BooleanField(default=False)
+    codec = StringField(default=None)
     details = DictField(default={})
     lightweight = BooleanField(default=False)
+    manifest = ListField(EmbeddedDocumentField(ManifestEntry), default=[])
+    archive_size = LongField(default=None)  # bytes
+    sha256 = StringField(default=None)  # digest of the manifest, for verification and deduplication
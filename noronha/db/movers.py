@@ -18,13 +18,15 @@
 """
 
 from mongoengine import CASCADE
-from mongoengine.fields import StringField, DictField, ReferenceField, EmbeddedDocumentField, BooleanField
+from mongoengine.fields import StringField, DictField, ReferenceField, EmbeddedDocumentField, BooleanField, ListField, \
+    LongField
 
 from noronha.common.constants import DBConst, OnBoard
 from noronha.db.main import SmartDoc, SmartEmbeddedDoc
 from noronha.db.ds import EmbeddedDataset
 from noronha.db.model import Model, EmbeddedModel
 from noronha.db.train import EmbeddedTraining
+from noronha.db.utils import ManifestEntry
 
 
 class ProtoModelVersion(object):
@@ -48,9 +50,13 @@ class EmbeddedModelVersion(SmartEmbeddedDoc):
     train = EmbeddedDocumentField(EmbeddedTraining, default=None)
     ds = EmbeddedDocumentField(EmbeddedDataset, default=None)
     compressed = BooleanField(default=False)
+    codec = StringField(default=None)
     details = DictField(default={})
     pretrained = StringField(default=None)
     lightweight = BooleanField(default=False)
+    manifest = ListField(EmbeddedDocumentField(ManifestEntry), default=[])
+    archive_size = LongField(default=None)  # bytes
+    sha256 = StringField(default=None)  # digest of the manifest, for verification and deduplication
 
 
 class ModelVersion(SmartDoc):
@@ -68,9 +74,13 @@ class ModelVersion(SmartDoc):
     train = EmbeddedDocumentField(EmbeddedTraining, default=None)
     ds = EmbeddedDocumentField(EmbeddedDataset, default=None)
     compressed = BooleanField(default=False)
+    codec = StringField(default=None)
     details = DictField(default={})
     pretrained = EmbeddedDocumentField(EmbeddedModelVersion, default=None)
     lightweight = BooleanField(default=False)
+    manifest = ListField(EmbeddedDocumentField(ManifestEntry), default=[])
+    archive_size = LongField(default=None)  # bytes
+    sha256 = StringField(default=None)  # digest of the manifest, for verification and deduplication
     
     def to_embedded(self):
         
@@ -19,7 +19,7 @@
 
 from datetime import datetime
 from mongoengine import EmbeddedDocument
-from mongoengine.fields import StringField, BooleanField, FloatField, DateTimeField, IntField
+from mongoengine.fields import StringField, BooleanField, FloatField, DateTimeField, IntField, LongField
 
 from noronha.common.constants import WarehouseConst, DBConst, Task
 from noronha.db.main import PrettyDoc
@@ -38,6 +38,13 @@ class FileDoc(SimpleDoc):
     max_mb = IntField(default=WarehouseConst.MAX_FILE_SIZE_MB)
 
 
+class ManifestEntry(SimpleDoc):
+    
+    name = StringField(required=True)  # no length limit, since files stored without a schema are named freely
+    size = LongField(default=0)  # bytes
+    sha256 = StringField()
+
+
 class TaskDoc(SimpleDoc):
     
     state = StringField(default=Task.State.WAITING)
@@ -15,15 +15,17 @@
 # limitations under the License.
 
 # same environment variables as in the base image's Dockerfile
-export NHA_HOME=/nha
+# (local processes stand for the container's filesystem root with a directory)
+ROOT=${NHA_ON_BOARD_ROOT%/}
+export NHA_HOME=${ROOT}/nha
 export SHARED_MODEL_DIR=${NHA_HOME}/model
-export LOCAL_MODEL_DIR=/model
+export LOCAL_MODEL_DIR=${ROOT}/model
 export SHARED_DATA_DIR=${NHA_HOME}/data
-export LOCAL_DATA_DIR=/data
-export LOG_DIR=/logs
-export APP_HOME=/app
-export CONDA_HOME=/etc/miniconda
-export CONDA_VENV=py3_default
+export LOCAL_DATA_DIR=${ROOT}/data
+export LOG_DIR=${ROOT}/logs
+export APP_HOME=${ROOT}/app
+export CONDA_HOME=${CONDA_HOME:-/etc/miniconda}
+export CONDA_VENV=${CONDA_VENV:-py3_default}
 
 
 # script's arguments parsing
@@ -58,16 +60,18 @@ done
 DEBUG=${DEBUG:-False}
 PARAMS=${PARAMS:-"{}"}
 
-VENV_HOME="${CONDA_HOME}/envs/${CONDA_VENV}"
+VENV_HOME=${VENV_HOME:-"${CONDA_HOME}/envs/${CONDA_VENV}"}
 IPYNB_CKPT_DIR=".ipynb_checkpoints"
 
-# retrieving the model, if a model was shared
-mkdir -p ${LOCAL_MODEL_DIR}
-cp -r ${SHARED_MODEL_DIR}/* ${LOCAL_MODEL_DIR}/ 2>/dev/null
+# retrieving the models and datasets that were shared, by linking their files instead of copying them
+mkdir -p ${LOCAL_MODEL_DIR} ${LOCAL_DATA_DIR}
 
-# retrieving the dataset, if a dataset was shared
-mkdir -p ${LOCAL_DATA_DIR}
-cp -r ${SHARED_DATA_DIR}/* ${LOCAL_DATA_DIR}/ 2>/dev/null
+if ! ${VENV_HOME}/bin/python -m noronha.tools.staging \
+    ${SHARED_MODEL_DIR} ${LOCAL_MODEL_DIR} \
+    ${SHARED_DATA_DIR} ${LOCAL_DATA_DIR} ; then
+    cp -r ${SHARED_MODEL_DIR}/* ${LOCAL_MODEL_DIR}/ 2>/dev/null
+    cp -r ${SHARED_DATA_DIR}/* ${LOCAL_DATA_DIR}/ 2>/dev/null
+fi
 
 # if no notebook path was provided, just open the notebook IDE
 if [[ "${NOTEBOOK_PATH}" == "" ]] ; then
@@ -77,7 +81,7 @@ if [[ "${NOTEBOOK_PATH}" == "" ]] ; then
     echo "c.NotebookApp.password = u''" >> ${JUPYTER_CONF}
     mkdir -p ${IPYNB_CKPT_DIR}
     chmod 777 ${IPYNB_CKPT_DIR}
-    ${VENV_HOME}/bin/jupyter notebook --allow-root --ip "0.0.0.0"
+    ${VENV_HOME}/bin/jupyter notebook --allow-root --ip "0.0.0.0" --port "${NHA_PORT_8888:-8888}"
     rm -rf ${IPYNB_CKPT_DIR}
 else
     script=${script}"import os; "
@@ -31,7 +31,7 @@ class NotebookRunner(Patient):
 
     def __init__(self, debug=False):
         
-        super().__init__(timeout=3)
+        super().__init__(timeout=3, min_attempts=3)
         self.debug = debug
         self.proj = Project.load()
         self.proc_mon = load_proc_monitor()
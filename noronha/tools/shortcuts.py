@@ -24,6 +24,7 @@ from noronha.db.ds import Dataset
 from noronha.db.train import Training
 from noronha.db.movers import ModelVersion
 from noronha.db.proj import Project
+from noronha.tools.staging import materialize, unstage
 
 
 def get_purpose():
@@ -212,18 +213,21 @@ def train_meta() -> Training:
     return Training.load(OnBoard.META_DIR)
 
 
-def _require_asset(doc_cls, barrel_cls, obj_name: str, tgt_path: str, model: str = None):
+def _require_asset(doc_cls, barrel_cls, obj_name: str, tgt_path: str, model: str = None, files: list = None):
     
     model = model or Project.load().model
     doc: [Dataset, ModelVersion] = doc_cls.find_one(name=obj_name, model=model)
     dyr = os.path.join(tgt_path, doc.get_dir_name())
     os.makedirs(dyr, exist_ok=True)
-    barrel_cls(doc).deploy(dyr)
+    barrel = barrel_cls(doc)
+    # files staged from a shared volume are replaced by the downloaded ones, which is every file in an archive
+    unstage(dyr, patterns=None if barrel.compressed else files)
+    barrel.deploy(dyr, files=files)
     MetaCargo(docs=[doc], section=get_purpose()).deploy()
     return dyr
 
 
-def require_dataset(dataset: str, model: str = None) -> str:
+def require_dataset(dataset: str, model: str = None, files: list = None) -> str:
 
     """Utility for deploying a dataset on demand
 
@@ -235,6 +239,8 @@ def require_dataset(dataset: str, model: str = None) -> str:
     :param dataset: Name of the dataset.
     :param model: Name of the model to which the dataset belongs.
            If your project only uses one model, this parameter may be left out.
+    :param files: List of file names or glob patterns (e.g.: ['*.csv']).
+           If specified, only the matching files are deployed.
     
     :returns: Path to the directory where the dataset files were deployed.
     
@@ -246,11 +252,12 @@ def require_dataset(dataset: str, model: str = None) -> str:
         barrel_cls=DatasetBarrel,
         obj_name=dataset,
         tgt_path=OnBoard.LOCAL_DATA_DIR,
-        model=model
+        model=model,
+        files=files
     )
 
 
-def require_movers(version: str, model: str = None) -> str:
+def require_movers(version: str, model: str = None, files: list = None) -> str:
     
     """Utility for deploying a model version on demand
 
@@ -262,6 +269,8 @@ def require_movers(version: str, model: str = None) -> str:
     :param version: Name of the model version.
     :param model: Name of the model to which the version belongs.
            If your project only uses one model, this parameter may be left out.
+    :param files: List of file names or glob patterns (e.g.: ['*.pkl']).
+           If specified, only the matching files are deployed.
     
     :returns: Path to the directory where the model files were deployed.
     
@@ -273,5 +282,22 @@ def require_movers(version: str, model: str = None) -> str:
         barrel_cls=MoversBarrel,
         obj_name=version,
         tgt_path=OnBoard.LOCAL_MODEL_DIR,
-        model=model
+        model=model,
+        files=files
     )
+
+
+def writable_path(path: str) -> str:
+    
+    """Utility for modifying a dataset or model file in place
+    
+    When Noronha starts a container, the files of the mounted datasets and model versions
+    are linked to their shared copies instead of being copied, so they may not be modifiable in place.
+    This function makes a private copy of the given file (or of all files under the given directory).
+    
+    :param path: Path to a file or directory, as returned by **data_path** or **model_path**.
+    
+    :returns: The same path, which can now be opened for writing.
+    """
+    
+    return materialize(path)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+# Copyright Noronha Development Team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for staging the shared datasets and model versions into the container's local directories
+
+Files are linked instead of copied, so that starting a container takes no extra time or disk space
+regardless of the size of its assets. A private copy of a file is only made when it's going to be modified
+"""
+
+import fnmatch
+import os
+import shutil
+import sys
+
+from noronha.common.constants import DockerConst
+
+FICLONE = 0x40049409  # ioctl for sharing the blocks of a file until either copy is modified (btrfs, xfs)
+
+
+def _is_read_only(path: str):
+    
+    return bool(os.statvfs(path).f_flag & os.ST_RDONLY)
+
+
+def _reflink(src: str, dest: str):
+    
+    import fcntl  # lazy import
+    
+    with open(src, 'rb') as s, open(dest, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dest)
+            return False
+    
+    shutil.copystat(src, dest)
+    return True
+
+
+def _link(src: str, dest: str, same_dev: bool, private: bool):
+    
+    if same_dev and private:  # the container's own volume, which may be modified through the link
+        try:
+            os.link(src, dest)
+            return
+        except OSError:
+            pass
+    elif same_dev:  # copy-on-write clone, so that the shared file stays untouched
+        if _reflink(src, dest):
+            return
+    
+    os.symlink(src, dest)
+
+
+def _is_shared(path: str):
+    
+    """Whether a regular file is linked from somewhere else, so that writing to it would modify the source"""
+    
+    return os.path.islink(path) or (os.path.isfile(path) and os.stat(path).st_nlink > 1)
+
+
+def stage(src_dir: str, dest_dir: str):
+    
+    if not os.path.isdir(src_dir):
+        return 0
+    
+    count, sealed = 0, []
+    
+    # directories may be symlinks to volumes (e.g.: under the local container manager), so they are followed
+    for root, dirs, files in os.walk(src_dir, followlinks=True):
+        dirs[:] = [d for d in dirs if d != DockerConst.VOL_CLAIM]
+        rel_dir = os.path.relpath(root, src_dir)
+        tgt_dir = os.path.normpath(os.path.join(dest_dir, rel_dir))
+        os.makedirs(tgt_dir, exist_ok=True)  # directories are real, so that new files stay in the container
+        same_dev = os.stat(root).st_dev == os.stat(tgt_dir).st_dev  # volumes may be mounted inside one another
+        
+        if DockerConst.VOL_SEAL in files:  # cached volume, shared by other containers
+            sealed.append(root)
+        
+        shared = any(root == s or root.startswith(s + os.sep) for s in sealed)
+        private = not shared and not _is_read_only(root)
+        
+        for name in files:
+            tgt = os.path.join(tgt_dir, name)
+            
+            if name == DockerConst.VOL_SEAL or os.path.lexists(tgt):
+                continue
+            
+            _link(os.path.join(root, name), tgt, same_dev, private)
+            count += 1
+    
+    return count
+
+
+def unstage(path: str, patterns: list = None):
+    
+    """Removes staged links, so that files can be written to their paths without touching the shared copies
+    
+    If patterns are given, only the files whose paths relative to the given directory match them are removed
+    """
+    
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            rel_path = os.path.relpath(file_path, path)
+            
+            if patterns is not None and not any(fnmatch.fnmatch(rel_path, p) for p in patterns):
+                continue
+            elif _is_shared(file_path):
+                os.remove(file_path)
+    
+    return path
+
+
+def materialize(path: str):
+    
+    """Replaces staged links with private copies, so that the files can be modified in place"""
+    
+    if os.path.isdir(path) and not os.path.islink(path):
+        for root, _, files in os.walk(path):
+            for name in files:
+                materialize(os.path.join(root, name))
+    elif _is_shared(path):  # hard links are broken as well, since writing to them modifies the source
+        src = os.path.realpath(path)
+        tmp = '{}.nha-tmp'.format(path)
+        
+        if not _reflink(src, tmp):
+            shutil.copy2(src, tmp)
+        
+        os.replace(tmp, path)
+    
+    return path
+
+
+if __name__ == '__main__':
+    
+    for _src, _dest in zip(sys.argv[1::2], sys.argv[2::2]):
+        stage(_src, _dest)